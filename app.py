@@ -11,6 +11,9 @@ from routes.project_monthly_tracker import project_monthly_tracker_bp
 from routes.user_monthly_tracker import user_monthly_tracker_bp
 from routes.api_log_list import api_log_list_bp
 from routes.password_reset import password_reset_bp
+from routes.work_calendar import work_calendar_bp
+from utils.db_router import note_request_write
+from utils.http_cache import compress_response
 
 from flask_cors import CORS
 import os
@@ -26,8 +29,8 @@ CORS(app, resources={
             "http://localhost:5173"   # if using Vite
         ],
         "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-        "allow_headers": ["Content-Type", "Authorization", "X-Requested-With"],
-        "expose_headers": ["Content-Range", "X-Content-Range"],
+        "allow_headers": ["Content-Type", "Authorization", "X-Requested-With", "If-None-Match"],
+        "expose_headers": ["Content-Range", "X-Content-Range", "ETag"],
         "supports_credentials": True,
         "max_age": 3600
     }
@@ -48,6 +51,12 @@ app.register_blueprint(project_monthly_tracker_bp,url_prefix=f"/project_monthly_
 app.register_blueprint(user_monthly_tracker_bp,url_prefix=f"/user_monthly_tracker")
 app.register_blueprint(api_log_list_bp, url_prefix="/api_log_list")
 app.register_blueprint(password_reset_bp, url_prefix="/password_reset")
+app.register_blueprint(work_calendar_bp, url_prefix="/work_calendar")
+
+# read-your-writes for replica routing (utils/db_router.py)
+app.after_request(note_request_write)
+# compression of non-api_response bodies (utils/http_cache.py)
+app.after_request(compress_response)
 
 print("\n==== REGISTERED ROUTES ====")
 for r in app.url_map.iter_rules():
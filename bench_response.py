@@ -0,0 +1,108 @@
+# bench_response.py - api_response serializer benchmark (flask.jsonify vs orjson)
+#
+#   python bench_response.py [rows] [repeat]
+#
+# Payloads mimic /tracker/view and /user/list rows as mysql.connector returns them
+# (Decimal, datetime, str, None). Needs flask (+ orjson for the fast path); no DB.
+import gzip
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from flask import Flask, jsonify
+
+from utils import response as resp
+
+
+def tracker_rows(n: int) -> list[dict]:
+    base = datetime(2026, 1, 1, 9, 0, 0)
+    return [
+        {
+            "tracker_id": i,
+            "project_id": 10 + i % 40,
+            "task_id": 100 + i % 300,
+            "user_id": 1000 + i % 250,
+            "production": Decimal(f"{(i % 97) * 1.25:.2f}"),
+            "actual_target": Decimal("40.00"),
+            "tenure_target": Decimal(f"{30 + i % 10}.00"),
+            "billable_hours": Decimal(f"{(i % 97) * 1.25 / (30 + i % 10):.4f}"),
+            "tracker_file": f"PRJ{i % 40}_TASK{i % 300}_USER{i % 250}_{i}.xlsx" if i % 3 else None,
+            "is_active": 1,
+            "date_time": (base + timedelta(minutes=17 * i)).strftime("%Y-%m-%d %H:%M:%S"),
+            "created_date": base + timedelta(minutes=17 * i),
+            "updated_date": base + timedelta(minutes=17 * i + 5),
+            "user_name": f"User {i % 250}",
+            "project_name": f"Project {i % 40}",
+            "task_name": f"Task {i % 300}",
+            "team_name": f"Team {i % 12}",
+            "file_status": "done" if i % 3 else None,
+            "file_row_count": i % 500 if i % 3 else None,
+        }
+        for i in range(n)
+    ]
+
+
+def user_rows(n: int) -> list[dict]:
+    return [
+        {
+            "user_id": i,
+            "user_name": f"User {i}",
+            "user_email": f"user{i}@example.com",
+            "user_number": f"98{i:08d}",
+            "role_id": 1 + i % 5,
+            "role_name": ["admin", "agent", "qa", "manager", "super admin"][i % 5],
+            "team_id": i % 12,
+            "user_tenure": Decimal("0.85"),
+            "project_manager_id": "[1, 2]",
+            "profile_picture": f"/uploads/profile_pictures/user_{i}.jpg",
+            "created_date": datetime(2025, 6, 1) + timedelta(days=i % 300),
+            "is_active": 1,
+        }
+        for i in range(n)
+    ]
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    app = Flask(__name__)
+    payloads = {
+        f"tracker/view ({rows} rows)": {"status": 200, "message": "ok", "data": {"trackers": tracker_rows(rows)}},
+        f"user/list ({rows // 4} rows)": {"status": 200, "message": "ok", "data": user_rows(rows // 4)},
+    }
+
+    with app.test_request_context():
+        for name, payload in payloads.items():
+            flask_body = jsonify(payload).get_data()
+            print(f"\n{name}: {len(flask_body) / 1024:.0f} KiB")
+            print(f"  flask.jsonify     {timed(lambda: jsonify(payload).get_data(), repeat):8.1f} ms")
+
+            if resp.orjson is None:
+                print("  orjson            not installed")
+            else:
+                fast_body = resp.dumps_fast(payload)
+                same = "same output" if app.json.loads(fast_body) == app.json.loads(flask_body) else "OUTPUT DIFFERS"
+                print(f"  orjson            {timed(lambda: resp.dumps_fast(payload), repeat):8.1f} ms  ({same})")
+
+            gz = gzip.compress(flask_body, compresslevel=resp.RESPONSE_GZIP_LEVEL)
+            print(f"  + gzip level {resp.RESPONSE_GZIP_LEVEL}    {timed(lambda: gzip.compress(flask_body, compresslevel=resp.RESPONSE_GZIP_LEVEL), repeat):8.1f} ms"
+                  f"  ({len(gz) / 1024:.0f} KiB)")
+            if resp.brotli is not None:
+                br = resp.brotli.compress(flask_body, quality=resp.RESPONSE_BROTLI_QUALITY)
+                print(f"  + brotli q{resp.RESPONSE_BROTLI_QUALITY}       {timed(lambda: resp.brotli.compress(flask_body, quality=resp.RESPONSE_BROTLI_QUALITY), repeat):8.1f} ms"
+                      f"  ({len(br) / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,3 @@
-import mysql.connector
 import os, uuid
 from dotenv import load_dotenv
 
@@ -32,6 +31,14 @@ RESET_FRONTEND_URL = os.getenv("RESET_FRONTEND_URL", "https://tfshrms.cloud/")
 if not RESET_SECRET_KEY:
     raise RuntimeError("RESET_SECRET_KEY is missing from .env file")
 
+# Signed login token (utils/auth_token.py); its own key, never the reset key
+AUTH_SECRET_KEY = os.getenv("AUTH_SECRET_KEY")
+if not AUTH_SECRET_KEY:
+    raise RuntimeError("AUTH_SECRET_KEY is missing from .env file")
+AUTH_TOKEN_TTL_SECONDS = int(os.getenv("AUTH_TOKEN_TTL_SECONDS", str(12 * 60 * 60)))
+# bump to invalidate every issued login token (e.g. after a role / hierarchy change)
+AUTH_TOKEN_SCOPE_VERSION = int(os.getenv("AUTH_TOKEN_SCOPE_VERSION", "1"))
+
 # Check if encryption key exists and is valid
 ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY")
 if not ENCRYPTION_KEY:
@@ -45,7 +52,11 @@ else:
         print(f"⚠️  Invalid ENCRYPTION_KEY format: {e}")
         print("A new key will be generated. Please update your .env file.")
 
-def get_db_connection():
+def get_db_connection(read_only=None):
+    """
+    Primary connection by default. Inside a @read_only_route view (or with read_only=True)
+    the read replica is used when configured and caught up (utils/db_router.py).
+    """
     # Validate database environment variables
     db_host = os.getenv("DB_HOST")
     db_user = os.getenv("DB_USERNAME")
@@ -58,13 +69,9 @@ def get_db_connection():
         if not db_name: print("   - DB_DATABASE")
         print("Please check your .env file.")
     
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),  # Use env var or default to 'localhost'
-        port=int(os.getenv("DB_PORT")),  # Use env var or default to 3306
-        user=os.getenv("DB_USERNAME"),  # Use env var or default to 'root'
-        password=os.getenv("DB_PASSWORD"),  # Use env var or default to empty string
-        database=os.getenv("DB_DATABASE"),  # Use env var or default to 'tfs_hrms'
-    )
+    from utils.db_router import get_connection
+
+    return get_connection(read_only)
 
     print("DB USER:", os.getenv("DB_USERNAME"))
     print("DB PASS:", os.getenv("DB_PASSWORD"))
@@ -0,0 +1,5 @@
+-- bcrypt hash used for login verification.
+-- user_password (Fernet) is kept for the admin password reveal;
+-- the hash is filled in transparently on each user's next successful login.
+ALTER TABLE tfs_user
+    ADD COLUMN user_password_hash VARCHAR(100) NULL AFTER user_password;
@@ -0,0 +1,66 @@
+-- One row per (project, user, role) so project visibility is an indexed join
+-- instead of parsing project_team_id / asst_project_manager_id / project_qa_id.
+-- Kept in sync by /project/create and /project/update.
+CREATE TABLE IF NOT EXISTS project_member (
+    project_id  INT NOT NULL,
+    user_id     INT NOT NULL,
+    member_role VARCHAR(20) NOT NULL,  -- manager | asst_manager | qa | team
+    PRIMARY KEY (project_id, user_id, member_role),
+    KEY idx_project_member_user (user_id, member_role, project_id)
+);
+
+-- Backfill from the existing columns (MySQL 8 JSON_TABLE). Values come in every legacy form
+-- multi_id_match_sql accepted: 78 / 78,81 / [78] / ["78","81"]. Brackets, quotes and
+-- spaces are stripped, a clean id list is wrapped as a JSON array, anything else is skipped.
+
+INSERT IGNORE INTO project_member (project_id, user_id, member_role)
+SELECT p.project_id, j.uid, 'manager'
+FROM (
+    SELECT project_id,
+           REPLACE(REPLACE(REPLACE(REPLACE(CAST(project_manager_id AS CHAR), '[', ''), ']', ''), '"', ''), ' ', '') AS ids
+    FROM project
+) p,
+     JSON_TABLE(
+         CONCAT('[', IF(p.ids REGEXP '^[0-9]+(,[0-9]+)*$', p.ids, ''), ']'),
+         '$[*]' COLUMNS (uid INT PATH '$')
+     ) j
+WHERE j.uid IS NOT NULL;
+
+INSERT IGNORE INTO project_member (project_id, user_id, member_role)
+SELECT p.project_id, j.uid, 'asst_manager'
+FROM (
+    SELECT project_id,
+           REPLACE(REPLACE(REPLACE(REPLACE(CAST(asst_project_manager_id AS CHAR), '[', ''), ']', ''), '"', ''), ' ', '') AS ids
+    FROM project
+) p,
+     JSON_TABLE(
+         CONCAT('[', IF(p.ids REGEXP '^[0-9]+(,[0-9]+)*$', p.ids, ''), ']'),
+         '$[*]' COLUMNS (uid INT PATH '$')
+     ) j
+WHERE j.uid IS NOT NULL;
+
+INSERT IGNORE INTO project_member (project_id, user_id, member_role)
+SELECT p.project_id, j.uid, 'qa'
+FROM (
+    SELECT project_id,
+           REPLACE(REPLACE(REPLACE(REPLACE(CAST(project_qa_id AS CHAR), '[', ''), ']', ''), '"', ''), ' ', '') AS ids
+    FROM project
+) p,
+     JSON_TABLE(
+         CONCAT('[', IF(p.ids REGEXP '^[0-9]+(,[0-9]+)*$', p.ids, ''), ']'),
+         '$[*]' COLUMNS (uid INT PATH '$')
+     ) j
+WHERE j.uid IS NOT NULL;
+
+INSERT IGNORE INTO project_member (project_id, user_id, member_role)
+SELECT p.project_id, j.uid, 'team'
+FROM (
+    SELECT project_id,
+           REPLACE(REPLACE(REPLACE(REPLACE(CAST(project_team_id AS CHAR), '[', ''), ']', ''), '"', ''), ' ', '') AS ids
+    FROM project
+) p,
+     JSON_TABLE(
+         CONCAT('[', IF(p.ids REGEXP '^[0-9]+(,[0-9]+)*$', p.ids, ''), ']'),
+         '$[*]' COLUMNS (uid INT PATH '$')
+     ) j
+WHERE j.uid IS NOT NULL;
@@ -0,0 +1,29 @@
+-- One row per project attachment (replaces parsing project.project_pprt JSON on reads).
+-- project.project_pprt is still written for older clients.
+CREATE TABLE IF NOT EXISTS project_file (
+    project_file_id INT AUTO_INCREMENT PRIMARY KEY,
+    project_id      INT NOT NULL,
+    file_name       VARCHAR(255) NOT NULL,
+    original_name   VARCHAR(255) NULL,
+    file_size       BIGINT NULL,
+    sha256          CHAR(64) NULL,
+    mime_type       VARCHAR(100) NULL,
+    is_active       TINYINT NOT NULL DEFAULT 1,
+    created_date    VARCHAR(19) NOT NULL,
+    KEY idx_project_file_project (project_id, is_active)
+);
+
+-- Backfill existing JSON arrays (size/hash unknown for legacy files)
+INSERT INTO project_file (project_id, file_name, is_active, created_date)
+SELECT p.project_id, j.fname, 1, COALESCE(p.updated_date, p.created_date)
+FROM project p,
+     JSON_TABLE(p.project_pprt, '$[*]' COLUMNS (fname VARCHAR(255) PATH '$')) j
+WHERE p.is_active = 1 AND JSON_VALID(p.project_pprt) AND j.fname IS NOT NULL;
+
+-- Legacy rows storing a single plain filename
+INSERT INTO project_file (project_id, file_name, is_active, created_date)
+SELECT p.project_id, p.project_pprt, 1, COALESCE(p.updated_date, p.created_date)
+FROM project p
+WHERE p.is_active = 1
+  AND p.project_pprt IS NOT NULL AND p.project_pprt <> ''
+  AND p.project_pprt NOT LIKE '[%';
@@ -0,0 +1,26 @@
+-- Task pickers filter by project; index the common predicate.
+CREATE INDEX idx_task_project_active ON task (project_id, is_active);
+
+-- One row per (task, user) so "tasks for this agent" is an indexed lookup
+-- instead of FIND_IN_SET over task.task_team_id. Kept in sync by /task/add and /task/update.
+CREATE TABLE IF NOT EXISTS task_team (
+    task_id INT NOT NULL,
+    user_id INT NOT NULL,
+    PRIMARY KEY (task_id, user_id),
+    KEY idx_task_team_user (user_id, task_id)
+);
+
+-- Backfill: JSON arrays and legacy CSV (78 / 78,81 / [78] / ["78","81"]). Brackets, quotes and
+-- spaces are stripped, a clean id list is wrapped as a JSON array, anything else is skipped.
+INSERT IGNORE INTO task_team (task_id, user_id)
+SELECT t.task_id, j.uid
+FROM (
+    SELECT task_id,
+           REPLACE(REPLACE(REPLACE(REPLACE(CAST(task_team_id AS CHAR), '[', ''), ']', ''), '"', ''), ' ', '') AS ids
+    FROM task
+) t,
+     JSON_TABLE(
+         CONCAT('[', IF(t.ids REGEXP '^[0-9]+(,[0-9]+)*$', t.ids, ''), ']'),
+         '$[*]' COLUMNS (uid INT PATH '$')
+     ) j
+WHERE j.uid IS NOT NULL;
@@ -0,0 +1,11 @@
+-- Client-supplied idempotency keys for /tracker/add.
+-- A retry with the same (user_id, idempotency_key) returns the original tracker_id
+-- instead of inserting a duplicate row. Rows older than the TTL are purged by the app.
+CREATE TABLE IF NOT EXISTS tracker_idempotency (
+    user_id INT NOT NULL,
+    idempotency_key VARCHAR(64) NOT NULL,
+    tracker_id INT NULL,
+    created_date DATETIME NOT NULL,
+    PRIMARY KEY (user_id, idempotency_key),
+    KEY idx_tracker_idempotency_created (created_date)
+);
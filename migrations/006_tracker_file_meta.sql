@@ -0,0 +1,16 @@
+-- Results of background inspection of uploaded tracker files (row counts, checksum).
+-- One row per (tracker, file name); a replaced file gets its own row, and /tracker/view
+-- joins on the tracker's current file so stale results are never shown.
+CREATE TABLE IF NOT EXISTS tracker_file_meta (
+    tracker_id INT NOT NULL,
+    tracker_file VARCHAR(255) NOT NULL,
+    file_type VARCHAR(10) NULL,
+    file_size BIGINT NULL,
+    sha256 CHAR(64) NULL,
+    row_count INT NULL,
+    sheet_count INT NULL,
+    status VARCHAR(10) NOT NULL,          -- done | skipped | failed
+    error VARCHAR(255) NULL,
+    processed_date DATETIME NOT NULL,
+    PRIMARY KEY (tracker_id, tracker_file)
+);
@@ -0,0 +1,21 @@
+-- One active target per (user, month) enforced by the database so bulk writes can use
+-- INSERT ... ON DUPLICATE KEY UPDATE. Soft-deleted rows (is_active=0) get active_key NULL
+-- and are ignored by the unique key, so history is kept.
+
+-- keep only the newest active row per (user, month)
+UPDATE user_monthly_tracker umt
+JOIN (
+    SELECT user_id, month_year, MAX(user_monthly_tracker_id) AS keep_id
+    FROM user_monthly_tracker
+    WHERE is_active = 1
+    GROUP BY user_id, month_year
+    HAVING COUNT(*) > 1
+) d ON d.user_id = umt.user_id AND d.month_year = umt.month_year
+SET umt.is_active = 0
+WHERE umt.is_active = 1 AND umt.user_monthly_tracker_id <> d.keep_id;
+
+-- month_year is MONYYYY; a bounded VARCHAR so it can be part of an index
+ALTER TABLE user_monthly_tracker
+    MODIFY month_year VARCHAR(10),
+    ADD COLUMN active_key TINYINT AS (IF(is_active = 1, 1, NULL)) STORED,
+    ADD UNIQUE KEY uq_umt_user_month_active (user_id, month_year, active_key);
@@ -0,0 +1,8 @@
+-- project_name search in /project_monthly_tracker/list:
+--   FULLTEXT for word-prefix search (MATCH ... AGAINST ('+term*' IN BOOLEAN MODE))
+--   prefix index for short terms (LIKE 'ab%')
+CREATE INDEX idx_project_name ON project (project_name(100));
+CREATE FULLTEXT INDEX ft_project_name ON project (project_name);
+
+-- list filters + keyset order
+CREATE INDEX idx_pmt_active_id ON project_monthly_tracker (is_active, project_monthly_tracker_id);
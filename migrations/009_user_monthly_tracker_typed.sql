@@ -0,0 +1,49 @@
+-- user_monthly_tracker: numeric columns instead of TEXT + integer month key.
+-- Reads no longer CAST per row and month joins compare yyyymm (e.g. 202601) on an index.
+
+-- values that are not numbers would fail the column change, and a month_year that is not
+-- MONYYYY gets no yyyymm: keep the original rows in a quarantine table first, then fix them.
+-- LIKE copies the generated active_key and the unique key from 007; in the quarantine table
+-- active_key becomes a plain column (so umt.* can be inserted) and duplicates are allowed.
+CREATE TABLE IF NOT EXISTS user_monthly_tracker_quarantine LIKE user_monthly_tracker;
+ALTER TABLE user_monthly_tracker_quarantine
+    DROP INDEX uq_umt_user_month_active,
+    MODIFY active_key TINYINT NULL,
+    ADD COLUMN quarantined_date DATETIME NULL DEFAULT CURRENT_TIMESTAMP;
+
+INSERT INTO user_monthly_tracker_quarantine
+SELECT umt.*, NOW()
+FROM user_monthly_tracker umt
+WHERE umt.monthly_target IS NULL OR TRIM(umt.monthly_target) NOT REGEXP '^-?[0-9]+(\\.[0-9]+)?$'
+   OR umt.working_days IS NULL OR TRIM(umt.working_days) NOT REGEXP '^[0-9]+$'
+   OR umt.month_year IS NULL
+   OR UPPER(TRIM(umt.month_year)) NOT REGEXP '^(JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)[0-9]{4}$';
+
+UPDATE user_monthly_tracker
+SET monthly_target = '0'
+WHERE monthly_target IS NULL OR TRIM(monthly_target) NOT REGEXP '^-?[0-9]+(\\.[0-9]+)?$';
+
+UPDATE user_monthly_tracker
+SET working_days = '0'
+WHERE working_days IS NULL OR TRIM(working_days) NOT REGEXP '^[0-9]+$';
+
+ALTER TABLE user_monthly_tracker
+    MODIFY monthly_target DECIMAL(10,2) NOT NULL DEFAULT 0,
+    MODIFY working_days INT NOT NULL DEFAULT 0,
+    ADD COLUMN yyyymm INT UNSIGNED NULL AFTER month_year;
+
+-- unparseable months stay NULL (and inactive): the rows are in the quarantine table
+UPDATE user_monthly_tracker
+SET month_year = UPPER(TRIM(month_year)),
+    yyyymm = CAST(DATE_FORMAT(STR_TO_DATE(CONCAT('01-', TRIM(month_year)), '%d-%b%Y'), '%Y%m') AS UNSIGNED)
+WHERE UPPER(TRIM(month_year)) REGEXP '^(JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)[0-9]{4}$';
+
+UPDATE user_monthly_tracker
+SET is_active = 0
+WHERE yyyymm IS NULL AND is_active = 1;
+
+-- one active row per (user, yyyymm); replaces the month_year key from 007
+ALTER TABLE user_monthly_tracker
+    DROP INDEX uq_umt_user_month_active,
+    ADD UNIQUE KEY uq_umt_user_yyyymm_active (user_id, yyyymm, active_key),
+    ADD KEY idx_umt_yyyymm_active (yyyymm, is_active);
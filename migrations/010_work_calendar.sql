@@ -0,0 +1,29 @@
+-- Work calendar used for pending_days / daily_required_hours (utils/work_calendar.py).
+
+-- Holidays: team_id NULL = company-wide
+CREATE TABLE IF NOT EXISTS work_holiday (
+    holiday_id INT AUTO_INCREMENT PRIMARY KEY,
+    holiday_date DATE NOT NULL,
+    team_id INT NULL,
+    holiday_name VARCHAR(100) NULL,
+    is_active TINYINT NOT NULL DEFAULT 1,
+    created_date DATETIME NOT NULL,
+    KEY idx_work_holiday_date (holiday_date, team_id)
+);
+
+-- Optional per-team weekend override, e.g. '4,5' (Monday=0). Default: WORK_WEEKEND_DAYS env / Sat+Sun
+CREATE TABLE IF NOT EXISTS team_work_week (
+    team_id INT PRIMARY KEY,
+    weekend_days VARCHAR(20) NOT NULL
+);
+
+-- Approved leave days per user
+CREATE TABLE IF NOT EXISTS user_leave (
+    user_leave_id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    leave_date DATE NOT NULL,
+    is_active TINYINT NOT NULL DEFAULT 1,
+    created_date DATETIME NOT NULL,
+    UNIQUE KEY uq_user_leave (user_id, leave_date),
+    KEY idx_user_leave_date (leave_date)
+);
@@ -0,0 +1,18 @@
+-- Background recalculation of task_work_tracker.tenure_target / billable_hours after a
+-- user's tenure changes (utils/tenure_recalc.py). Rows are processed in tracker_id order
+-- in small committed chunks; last_tracker_id is the resume point.
+CREATE TABLE IF NOT EXISTS tenure_recalc_job (
+    job_id INT NOT NULL AUTO_INCREMENT,
+    user_id INT NOT NULL,
+    user_tenure DECIMAL(10,4) NOT NULL,
+    status VARCHAR(12) NOT NULL,          -- pending | running | done | failed | superseded
+    total_rows INT NOT NULL DEFAULT 0,
+    processed_rows INT NOT NULL DEFAULT 0,
+    last_tracker_id INT NOT NULL DEFAULT 0,
+    error VARCHAR(255) NULL,
+    created_date DATETIME NOT NULL,
+    updated_date DATETIME NOT NULL,
+    PRIMARY KEY (job_id),
+    KEY idx_trj_user_status (user_id, status),
+    KEY idx_trj_status_updated (status, updated_date)
+);
@@ -0,0 +1,20 @@
+-- Write counters behind the list endpoints' ETags (utils/http_cache.py).
+-- One row per data set; writers bump it (INSERT ... ON DUPLICATE KEY UPDATE version=version+1)
+-- inside their own transaction right before the commit, and
+-- conditional GETs read the rows they depend on by primary key instead of scanning tables.
+CREATE TABLE IF NOT EXISTS data_version (
+    name VARCHAR(64) NOT NULL,
+    version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    updated_date DATETIME NOT NULL,
+    PRIMARY KEY (name)
+);
+
+INSERT IGNORE INTO data_version (name, version, updated_date) VALUES
+    ('tfs_user', 0, NOW()),
+    ('project', 0, NOW()),
+    ('task', 0, NOW()),
+    ('task_work_tracker', 0, NOW()),
+    ('tracker_file_meta', 0, NOW()),
+    ('user_monthly_tracker', 0, NOW()),
+    ('project_monthly_tracker', 0, NOW()),
+    ('work_calendar', 0, NOW());
@@ -1,6 +1,8 @@
 from flask import Blueprint, request
 from config import get_db_connection
 from utils.response import api_response
+from utils.db import stream
+from utils.db_router import read_only_route
 from datetime import datetime
 
 def get_action_description(api_name):
@@ -20,22 +22,21 @@ def get_action_description(api_name):
 api_log_list_bp = Blueprint("api_log_list", __name__)
 
 @api_log_list_bp.route("/logs", methods=["POST"])
+@read_only_route
 def get_api_logs():
     conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("""
+        logs = []
+        for log in stream(conn, """
             SELECT l.*, u.user_name
             FROM api_call_logs l
             LEFT JOIN tfs_user u ON l.user_id = u.user_id
             ORDER BY l.timestamp DESC
-        """)
-        logs = cursor.fetchall()
-        for log in logs:
+        """, row="dict"):
+            logs.append(log)
             log["action"] = f"{log.get('user_name', 'Unknown User')} {get_action_description(log['api_name'])} at {log['timestamp']} from {log.get('device_type', '')} ({log.get('device_id', '')})"
         return api_response(200, "API logs fetched successfully", logs)
     except Exception as e:
         return api_response(500, f"Failed to fetch logs: {str(e)}")
     finally:
-        cursor.close()
         conn.close()
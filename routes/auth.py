@@ -4,6 +4,8 @@ from config import get_db_connection, BASE_UPLOAD_URL, UPLOAD_SUBDIRS
 
 from utils.response import api_response
 
+from utils.api_log_utils import log_api_call
+
 from datetime import datetime
 
 from utils.validators import (
@@ -20,7 +22,29 @@ from utils.validators import (
 
 from utils.validators import validate_request
 
-from utils.security import encrypt_password, decrypt_password, safe_decrypt_password
+from utils.auth_token import issue_token
+
+from utils.security import (
+
+    encrypt_password,
+
+    decrypt_password,
+
+    safe_decrypt_password,
+
+    get_crypto_executor,
+
+    get_bulk_crypto_executor,
+
+    verify_password_pooled,
+
+    bcrypt_needs_rehash,
+
+    hash_password
+
+)
+
+from concurrent.futures import TimeoutError as FuturesTimeout
 
 import json
 
@@ -142,6 +166,74 @@ def build_profile_pic_filename(user_name: str, original_filename: str) -> str:
 
 
 
+def _store_password_hash(user_id: int, password: str):
+
+    """
+
+    Background: write bcrypt hash for a user (legacy migration / cost upgrade).
+
+    Runs on the crypto pool with its own connection; failures only logged.
+
+    """
+
+    conn = None
+
+    cursor = None
+
+    try:
+
+        hashed = hash_password(password).decode()
+
+        conn = get_db_connection()
+
+        cursor = conn.cursor()
+
+        cursor.execute(
+
+            "UPDATE tfs_user SET user_password_hash=%s WHERE user_id=%s",
+
+            (hashed, user_id)
+
+        )
+
+        conn.commit()
+
+    except Exception as e:
+
+        print(f"[login] password hash migration failed for user {user_id}: {e}")
+
+    finally:
+
+        try: cursor.close()
+
+        except: pass
+
+        try: conn.close()
+
+        except: pass
+
+
+
+
+
+def _verify_legacy_password(user_password: str, stored_password: str) -> bool:
+
+    # Try to decrypt stored password (for encrypted passwords)
+
+    # If decryption fails, treat as plain text (for existing users)
+
+    try:
+
+        return user_password == decrypt_password(stored_password)
+
+    except Exception:
+
+        return user_password == stored_password
+
+
+
+
+
 @auth_bp.route("/user", methods=["POST"])
 
 def user_handler():
@@ -202,12 +294,16 @@ def user_handler():
 
                     u.*,
 
+                    r.role_name,
+
                     p.project_creation_permission,
 
                     p.user_creation_permission
 
                 FROM tfs_user u
 
+                LEFT JOIN user_role r ON r.role_id = u.role_id
+
                 LEFT JOIN user_permission p ON u.user_id = p.user_id
 
                 WHERE u.user_email = %s
@@ -236,34 +332,48 @@ def user_handler():
 
             stored_password = user.get("user_password")
 
-            if stored_password is None:
+            stored_hash = user.get("user_password_hash")
+
+            if stored_password is None and not stored_hash:
 
                 return api_response(401, "Invalid email or password")
 
-            
 
-            # Try to decrypt stored password (for new encrypted passwords)
 
-            # If decryption fails, treat as plain text (for existing users)
+            if stored_hash:
+
+                # bcrypt (pooled + cached)
 
-            try:
+                try:
 
-                decrypted_password = decrypt_password(stored_password)
+                    is_valid = verify_password_pooled(user_password, stored_hash)
 
-                # If decryption succeeded, compare with decrypted password
+                except ValueError:
 
-                if user_password != decrypted_password:
+                    is_valid = False
+
+                except FuturesTimeout:
+
+                    return api_response(503, "Login is busy, please try again")
+
+                if not is_valid:
 
                     return api_response(401, "Invalid email or password")
 
-            except Exception:
+                if bcrypt_needs_rehash(stored_hash):
 
-                # If decryption failed, treat as plain text (existing users)
+                    get_crypto_executor().submit(_store_password_hash, user["user_id"], user_password)
 
-                if user_password != stored_password:
+            else:
+
+                # legacy Fernet / plain text -> migrate to bcrypt after a successful login
+
+                if not _verify_legacy_password(user_password, stored_password):
 
                     return api_response(401, "Invalid email or password")
 
+                get_crypto_executor().submit(_store_password_hash, user["user_id"], user_password)
+
 
 
             if user.get("profile_picture"):
@@ -280,6 +390,22 @@ def user_handler():
 
             user.pop("user_password", None)
 
+            user.pop("user_password_hash", None)
+
+
+
+            # signed token: lets routes skip the per-request role lookup
+
+            user["access_token"] = issue_token(
+
+                user["user_id"],
+
+                user.get("role_id"),
+
+                user.get("role_name"),
+
+            )
+
             return api_response(200, "Login successful", user)
 
 
@@ -600,3 +726,587 @@ def user_handler():
 
         except: pass
 
+
+
+
+
+# =========================================================
+
+# BULK IMPORT (JSON array or CSV/XLSX upload)
+
+# =========================================================
+
+BULK_IMPORT_MAX_ROWS = 1000
+
+BULK_IMPORT_FIELDS = [
+
+    "user_name", "user_email", "user_password", "role_id", "designation_id", "team",
+
+    "user_tenure", "user_number", "user_address", "project_manager", "assistant_manager", "qa",
+
+]
+
+
+
+
+
+def _cell_str(value):
+
+    if value is None:
+
+        return None
+
+    if isinstance(value, float) and value.is_integer():
+
+        value = int(value)
+
+    s = str(value).strip()
+
+    return s or None
+
+
+
+
+
+def _read_bulk_file(file_storage) -> list:
+
+    """CSV / XLSX upload -> list of dicts keyed by the header row"""
+
+    name = (file_storage.filename or "").lower()
+
+
+
+    if name.endswith(".csv"):
+
+        import csv
+
+        import io
+
+        text = io.TextIOWrapper(file_storage.stream, encoding="utf-8-sig", errors="replace", newline="")
+
+        rows = []
+
+        for rec in csv.DictReader(text):
+
+            rows.append({(k or "").strip().lower(): _cell_str(v) for k, v in rec.items()})
+
+            if len(rows) > BULK_IMPORT_MAX_ROWS:
+
+                break
+
+        return rows
+
+
+
+    if name.endswith(".xlsx"):
+
+        try:
+
+            from openpyxl import load_workbook
+
+        except ImportError:
+
+            raise ValueError("XLSX import is not available on this server, upload CSV instead")
+
+        wb = load_workbook(file_storage.stream, read_only=True, data_only=True)
+
+        try:
+
+            it = wb.worksheets[0].iter_rows(values_only=True)
+
+            header = [(_cell_str(h) or "").lower() for h in next(it, [])]
+
+            rows = []
+
+            for values in it:
+
+                if not any(v is not None and str(v).strip() != "" for v in values):
+
+                    continue
+
+                rows.append({h: _cell_str(v) for h, v in zip(header, values) if h})
+
+                if len(rows) > BULK_IMPORT_MAX_ROWS:
+
+                    break
+
+            return rows
+
+        finally:
+
+            wb.close()
+
+
+
+    raise ValueError("file must be .csv or .xlsx")
+
+
+
+
+
+def _validate_bulk_row(row: dict) -> str | None:
+
+    for f in ("user_name", "user_email", "user_password", "role_id"):
+
+        if not row.get(f):
+
+            return f"{f} is required"
+
+    if not is_valid_username(row["user_name"]):
+
+        return "Username must contain only alphabets"
+
+    if not is_valid_email(row["user_email"]):
+
+        return "Invalid email format"
+
+    if not is_valid_password(row["user_password"]):
+
+        return "Password must be at least 6 characters"
+
+    if row.get("user_number") and not is_valid_phone(str(row["user_number"])):
+
+        return "Invalid phone number"
+
+    if not str(row["role_id"]).strip().isdigit():
+
+        return "role_id must be a number"
+
+    return None
+
+
+
+
+
+def _protect_password(password: str):
+
+    # Fernet copy (reveal feature) + bcrypt hash (login)
+
+    return encrypt_password(password), hash_password(password).decode()
+
+
+
+
+
+@auth_bp.route("/user/bulk", methods=["POST"])
+
+def bulk_user_import():
+
+    """
+
+    JSON: {"users": [{user_name, user_email, user_password, role_id, ...}], "device_id", "device_type", "logged_in_user_id"}
+
+    multipart: file=<.csv|.xlsx> (header row = field names), device_id, device_type, logged_in_user_id
+
+    Optional all_or_nothing=true -> nothing is inserted if any row fails validation.
+
+    Valid rows are inserted in one transaction; errors are reported per row (1-based).
+
+    """
+
+    is_multipart = (request.content_type or "").startswith("multipart/form-data")
+
+
+
+    if is_multipart:
+
+        form = request.form
+
+        uploaded = request.files.get("file")
+
+        if not uploaded or not uploaded.filename:
+
+            return api_response(400, "file is required")
+
+        try:
+
+            raw_rows = _read_bulk_file(uploaded)
+
+        except ValueError as e:
+
+            return api_response(400, str(e))
+
+        except Exception as e:
+
+            return api_response(400, f"Could not read file: {str(e)}")
+
+        device_id = form.get("device_id")
+
+        device_type = form.get("device_type")
+
+        logged_in_user_id = form.get("logged_in_user_id")
+
+        all_or_nothing = str(form.get("all_or_nothing", "")).lower() in ("1", "true", "yes")
+
+    else:
+
+        data, err = validate_request(required=["users"])
+
+        if err:
+
+            return err
+
+        if not isinstance(data["users"], list):
+
+            return api_response(400, "users must be a list")
+
+        raw_rows = data["users"]
+
+        device_id = data.get("device_id")
+
+        device_type = data.get("device_type")
+
+        logged_in_user_id = data.get("logged_in_user_id")
+
+        all_or_nothing = bool(data.get("all_or_nothing"))
+
+
+
+    if not raw_rows:
+
+        return api_response(400, "No users to import")
+
+    if len(raw_rows) > BULK_IMPORT_MAX_ROWS:
+
+        return api_response(400, f"At most {BULK_IMPORT_MAX_ROWS} users per import")
+
+
+
+    # ---- validate every row (no DB)
+
+    errors = []
+
+    candidates = []
+
+    seen_emails = set()
+
+    for idx, raw in enumerate(raw_rows, start=1):
+
+        if not isinstance(raw, dict):
+
+            errors.append({"row": idx, "user_email": None, "error": "row must be an object"})
+
+            continue
+
+        row = {f: raw.get(f) for f in BULK_IMPORT_FIELDS}
+
+        row["user_name"] = (row.get("user_name") or "").strip()
+
+        row["user_email"] = (row.get("user_email") or "").strip().lower()
+
+        row["user_password"] = str(row["user_password"]) if row.get("user_password") is not None else ""
+
+
+
+        problem = _validate_bulk_row(row)
+
+        if not problem and row["user_email"] in seen_emails:
+
+            problem = "Duplicate email in this import"
+
+        if problem:
+
+            errors.append({"row": idx, "user_email": row["user_email"] or None, "error": problem})
+
+            continue
+
+        seen_emails.add(row["user_email"])
+
+        row["role_id"] = int(str(row["role_id"]).strip())
+
+        candidates.append((idx, row))
+
+
+
+    if all_or_nothing and errors:
+
+        return api_response(400, "Import rejected, fix the listed rows", {"inserted": 0, "errors": errors})
+
+
+
+    conn = get_db_connection()
+
+    cursor = conn.cursor(dictionary=True)
+
+
+
+    try:
+
+        # before the first query: the lookups below must not open an implicit transaction
+
+        conn.start_transaction()
+
+
+
+        # ---- existing emails + roles: one IN query each
+
+        if candidates:
+
+            emails = [r["user_email"] for _, r in candidates]
+
+            in_ph = ",".join(["%s"] * len(emails))
+
+            cursor.execute(
+
+                f"SELECT user_email FROM tfs_user WHERE user_email IN ({in_ph}) AND is_active != 0 AND is_delete != 0",
+
+                tuple(emails)
+
+            )
+
+            existing = {(r["user_email"] or "").lower() for r in cursor.fetchall()}
+
+
+
+            role_ids = sorted({r["role_id"] for _, r in candidates})
+
+            in_ph = ",".join(["%s"] * len(role_ids))
+
+            cursor.execute(f"SELECT role_id, role_name FROM user_role WHERE role_id IN ({in_ph})", tuple(role_ids))
+
+            roles = {int(r["role_id"]): (r["role_name"] or "").strip().lower() for r in cursor.fetchall()}
+
+
+
+            valid = []
+
+            for idx, row in candidates:
+
+                if row["user_email"] in existing:
+
+                    errors.append({"row": idx, "user_email": row["user_email"], "error": "User already exists"})
+
+                elif row["role_id"] not in roles:
+
+                    errors.append({"row": idx, "user_email": row["user_email"], "error": "Unknown role_id"})
+
+                else:
+
+                    valid.append((idx, row))
+
+            candidates = valid
+
+
+
+        errors.sort(key=lambda e: e["row"])
+
+        if all_or_nothing and errors:
+
+            conn.rollback()
+
+            return api_response(400, "Import rejected, fix the listed rows", {"inserted": 0, "errors": errors})
+
+        if not candidates:
+
+            conn.rollback()
+
+            return api_response(400, "No valid users to import", {"inserted": 0, "errors": errors})
+
+
+
+        # ---- encrypt + bcrypt on the bulk pool (the login pool stays free)
+
+        protected = list(get_bulk_crypto_executor().map(_protect_password, [r["user_password"] for _, r in candidates]))
+
+
+
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        user_rows = []
+
+        for (idx, row), (encrypted, hashed) in zip(candidates, protected):
+
+            user_rows.append((
+
+                row["user_name"],
+
+                row.get("user_number"),
+
+                row.get("user_address"),
+
+                row["user_email"],
+
+                encrypted,
+
+                hashed,
+
+                1,
+
+                1,
+
+                row["role_id"],
+
+                row.get("designation_id"),
+
+                row.get("user_tenure"),
+
+                _to_id_array_json(row.get("project_manager")),
+
+                _to_id_array_json(row.get("assistant_manager")),
+
+                _to_id_array_json(row.get("qa")),
+
+                row.get("team"),
+
+                device_id,
+
+                device_type,
+
+                now,
+
+                now
+
+            ))
+
+
+
+        cursor.executemany("""
+
+            INSERT INTO tfs_user (
+
+                user_name,
+
+                user_number,
+
+                user_address,
+
+                user_email,
+
+                user_password,
+
+                user_password_hash,
+
+                is_active,
+
+                is_delete,
+
+                role_id,
+
+                designation_id,
+
+                user_tenure,
+
+                project_manager_id,
+
+                asst_manager_id,
+
+                qa_id,
+
+                team_id,
+
+                device_id,
+
+                device_type,
+
+                created_date,
+
+                updated_date
+
+            ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+
+        """, user_rows)
+
+
+
+        # new ids by email (auto-increment ids of a multi-row insert are not guaranteed contiguous)
+
+        emails = [r["user_email"] for _, r in candidates]
+
+        in_ph = ",".join(["%s"] * len(emails))
+
+        cursor.execute(
+
+            f"""
+
+            SELECT user_id, user_email FROM tfs_user
+
+            WHERE user_email IN ({in_ph}) AND is_active = 1 AND is_delete = 1
+
+            ORDER BY user_id
+
+            """,
+
+            tuple(emails)
+
+        )
+
+        new_ids = {(r["user_email"] or "").lower(): r["user_id"] for r in cursor.fetchall()}
+
+
+
+        permission_rows = []
+
+        created = []
+
+        for idx, row in candidates:
+
+            new_user_id = new_ids[row["user_email"]]
+
+            limited = roles[row["role_id"]] in ["qa", "agent"]
+
+            permission_rows.append((row["role_id"], new_user_id, 0 if limited else 1, 0 if limited else 1))
+
+            created.append({"row": idx, "user_id": new_user_id, "user_email": row["user_email"]})
+
+
+
+        cursor.executemany("""
+
+            INSERT INTO user_permission (
+
+                role_id,
+
+                user_id,
+
+                project_creation_permission,
+
+                user_creation_permission
+
+            )
+
+            VALUES (%s, %s, %s, %s)
+
+        """, permission_rows)
+
+
+
+        conn.commit()
+
+
+
+        api_call_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        log_api_call("bulk_user_import", logged_in_user_id, device_id, device_type, api_call_time)
+
+
+
+        return api_response(
+
+            201,
+
+            "Users imported successfully" if not errors else "Users imported with errors",
+
+            {"inserted": len(created), "users": created, "errors": errors}
+
+        )
+
+
+
+    except Exception as e:
+
+        conn.rollback()
+
+        return api_response(500, f"Bulk import failed: {str(e)}")
+
+
+
+    finally:
+
+        try: cursor.close()
+
+        except: pass
+
+        try: conn.close()
+
+        except: pass
+
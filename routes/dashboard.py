@@ -3,6 +3,8 @@
 from flask import Blueprint, request
 from config import get_db_connection, UPLOAD_FOLDER, UPLOAD_SUBDIRS, BASE_UPLOAD_URL
 from utils.response import api_response
+from utils.auth_token import auth_context, get_auth_context
+from utils.db_router import read_only_route
 
 dashboard_bp = Blueprint("dashboard", __name__, url_prefix="/dashboard")
 
@@ -13,6 +15,10 @@ TRACKER_DT = "CAST(twt.date_time AS DATETIME)"
 # Helpers
 # -----------------------------
 def get_user_role(cursor, user_id: int) -> str | None:
+    auth = get_auth_context(user_id)
+    if auth:
+        return auth["role"]
+
     cursor.execute(
         """
         SELECT r.role_name
@@ -288,6 +294,8 @@ def get_tasks_for_role(cursor, role: str, logged_in_user_id: int, project_ids: l
 # Dashboard Filter API
 # -----------------------------
 @dashboard_bp.route("/filter", methods=["POST"])
+@read_only_route
+@auth_context()
 def dashboard_filter():
     data = request.get_json() or {}
 
@@ -1,5 +1,7 @@
-from flask import Blueprint, request
+from flask import Blueprint, current_app, request
 from utils.response import api_response
+from utils.auth_token import auth_context, get_auth_context
+from utils.assignment_graph import get_assignment_graph, to_dropdown
 from config import get_db_connection
 
 dropdown_bp = Blueprint("dropdown", __name__)
@@ -14,6 +16,10 @@ ROLE_BASED_USER_DROPDOWNS = (
 )
 
 def get_user_role(cursor, user_id: int) -> str | None:
+    auth = get_auth_context(user_id)
+    if auth:
+        return auth["role"]
+
     cursor.execute("""
         SELECT r.role_name
         FROM tfs_user u
@@ -34,6 +40,7 @@ def multi_id_match_sql(col: str) -> str:
 
 # ---------------- GET DROPDOWN DATA ---------------- #
 @dropdown_bp.route("/get", methods=["POST"])
+@auth_context()
 def get():
     data = request.get_json()
     if not data or "dropdown_type" not in data:
@@ -107,7 +114,6 @@ def get():
             project_id = data.get("project_id")
             if dropdown_type == "agent" and project_id:
                 # Only return agents assigned to this project (robust for all formats)
-                v = str(project_id)
                 query = f"""
                     SELECT
                         u.user_id,
@@ -133,7 +139,6 @@ def get():
                 return api_response(200, "Dropdown data fetched successfully", result)
             elif dropdown_type == "assistant manager" and project_id:
                 # Only return assistant managers assigned to this project (robust for all formats)
-                v = str(project_id)
                 query = f"""
                     SELECT
                         u.user_id,
@@ -201,33 +206,13 @@ def get():
                 return api_response(200, "Dropdown data fetched successfully", result)
 
         # -------------------- PROJECTS WITH TASKS -------------------- #
+        # served from the cached per-user assignment graph (ETag / If-None-Match)
         if dropdown_type == "projects with tasks":
             user_id = data.get("user_id")
             logged_in_user_id = data.get("logged_in_user_id")
             if user_id:
                 # Only return projects/tasks assigned to this user (regardless of role, including agent logic)
-                v = str(user_id)
-                params = [v, v]
-                where_sql = "WHERE p.is_active = 1 AND " + multi_id_match_sql("p.project_team_id")
-                task_join_extra = " AND " + multi_id_match_sql("t.task_team_id")
-                task_params = [v, v]
-                query = f"""
-                    SELECT
-                        p.project_id,
-                        p.project_name,
-                        t.task_id,
-                        t.task_name,
-                        t.task_target
-                    FROM project p
-                    LEFT JOIN task t
-                        ON t.project_id = p.project_id
-                        AND t.is_active = 1
-                        {task_join_extra}
-                    {where_sql}
-                    ORDER BY p.project_name, t.task_name
-                """
-                cursor.execute(query, tuple(params + task_params))
-                rows = cursor.fetchall()
+                graph, etag = get_assignment_graph(cursor, int(user_id), "", assigned_only=True)
             else:
                 # Use logged_in_user_id and role-based filtering
                 if not logged_in_user_id:
@@ -236,73 +221,16 @@ def get():
                 user_role = get_user_role(cursor, filter_id)
                 if not user_role:
                     return api_response(404, "User not found")
-                params: list = []
-                where_sql = "WHERE p.is_active = 1"
-                if user_role in ["admin", "super admin"]:
-                    pass
-                elif user_role == "qa":
-                    v = str(filter_id)
-                    where_sql += " AND " + multi_id_match_sql("p.project_qa_id")
-                    params.extend([v, v])
-                elif user_role in ["project manager", "manager"]:
-                    v = str(filter_id)
-                    where_sql += " AND " + multi_id_match_sql("p.project_manager_id")
-                    params.extend([v, v])
-                elif user_role == "assistant manager":
-                    v = str(filter_id)
-                    where_sql += " AND " + multi_id_match_sql("p.asst_project_manager_id")
-                    params.extend([v, v])
-                elif user_role == "agent":
-                    v = str(filter_id)
-                    where_sql += " AND " + multi_id_match_sql("p.project_team_id")
-                    params.extend([v, v])
-                else:
-                    v = str(filter_id)
-                    where_sql += " AND " + multi_id_match_sql("p.project_team_id")
-                    params.extend([v, v])
-                # Optional: filter tasks by task_team_id for agent
-                task_join_extra = ""
-                task_params: list = []
-                if user_role == "agent":
-                    v = str(filter_id)
-                    task_join_extra = " AND " + multi_id_match_sql("t.task_team_id")
-                    task_params.extend([v, v])
-                query = f"""
-                    SELECT
-                        p.project_id,
-                        p.project_name,
-                        t.task_id,
-                        t.task_name,
-                        t.task_target
-                    FROM project p
-                    LEFT JOIN task t
-                        ON t.project_id = p.project_id
-                        AND t.is_active = 1
-                        {task_join_extra}
-                    {where_sql}
-                    ORDER BY p.project_name, t.task_name
-                """
-                cursor.execute(query, tuple(params + task_params))
-                rows = cursor.fetchall()
-
-            projects_map = {}
-            for row in rows:
-                pid = row["project_id"]
-                if pid not in projects_map:
-                    projects_map[pid] = {
-                        "project_id": pid,
-                        "project_name": row["project_name"],
-                        "tasks": []
-                    }
+                graph, etag = get_assignment_graph(cursor, filter_id, user_role)
 
-                if row.get("task_id"):
-                    projects_map[pid]["tasks"].append({
-                        "task_id": row["task_id"],
-                        "label": row["task_name"],
-                        "task_target": row["task_target"]
-                    })
+            if request.if_none_match.contains_weak(etag):
+                resp = current_app.response_class(status=304)
+                resp.set_etag(etag, weak=True)
+                return resp
 
-            return api_response(200, "Dropdown data fetched successfully", list(projects_map.values()))
+            resp, status = api_response(200, "Dropdown data fetched successfully", to_dropdown(graph))
+            resp.set_etag(etag, weak=True)
+            return resp, status
 
         # -------------------- INVALID -------------------- #
         return api_response(400, "Invalid dropdown_type")
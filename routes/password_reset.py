@@ -205,7 +205,7 @@ def reset_password():
         # Later replace new_password with hash_password(new_password)
         cursor.execute("""
             UPDATE tfs_user
-            SET user_password=%s, updated_date=%s
+            SET user_password=%s, user_password_hash=NULL, updated_date=%s
             WHERE user_id=%s AND is_delete != 0
         """, (new_password, updated_date, user_id))
 
@@ -3,9 +3,15 @@
 from flask import Blueprint, request
 from utils.response import api_response
 from config import get_db_connection, UPLOAD_SUBDIRS, BASE_UPLOAD_URL, UPLOAD_FOLDER
-from utils.file_utils import save_uploaded_file
+from utils.file_utils import save_uploaded_files_parallel, get_file_executor
+from utils.auth_token import auth_context, get_auth_context
+from utils.pagination import is_paginated, get_page_params, keyset_clause, page_result
+from utils import data_versions
+from utils.assignment_graph import invalidate_users
+from utils.http_cache import conditional_get
 import json
 import os
+import uuid
 from datetime import datetime
 
 project_bp = Blueprint("project", __name__)
@@ -23,7 +29,8 @@ def safe_filename_part(value: str) -> str:
 
 def build_project_filename(project_name: str, project_code: str, original_filename: str, index: int, total: int) -> str:
     """
-    Format: <Project>_<Code>_<DD-MON-YYYY>_1.ext (if multiple)
+    Format: <Project>_<Code>_<DD-MON-YYYY>[_<index>]_<token>.ext
+    token is a short random id so same-day uploads never overwrite each other.
     """
     if "." not in (original_filename or ""):
         raise ValueError("Uploaded file has no extension")
@@ -35,7 +42,8 @@ def build_project_filename(project_name: str, project_code: str, original_filena
     code_part = safe_filename_part(project_code)
 
     suffix = f"_{index}" if total > 1 else ""
-    return f"{name_part}_{code_part}_{date_part}{suffix}.{ext}"
+    token = uuid.uuid4().hex[:8]
+    return f"{name_part}_{code_part}_{date_part}{suffix}_{token}.{ext}"
 
 
 def _get_form_json_list(form, key: str):
@@ -44,9 +52,12 @@ def _get_form_json_list(form, key: str):
         return []
     try:
         val = json.loads(raw)
-        return val if isinstance(val, list) else []
     except Exception:
-        return []
+        # legacy CSV "78,81"
+        return _int_ids(raw)
+    if isinstance(val, list):
+        return val
+    return _int_ids(val)
 
 
 def _get_uploaded_files():
@@ -79,15 +90,59 @@ def safe_remove_project_file(filename: str) -> bool:
     return False
 
 
+def _safe_remove_project_file_logged(f) -> bool:
+    try:
+        return safe_remove_project_file(f)
+    except Exception as e:
+        print("DELETE FAILED:", e, "file=", f)
+        return False
+
+
 def safe_remove_project_files(file_list):
-    deleted = 0
-    for f in file_list or []:
-        try:
-            if safe_remove_project_file(f):
-                deleted += 1
-        except Exception as e:
-            print("DELETE FAILED:", e, "file=", f)
-    return deleted
+    files = [f for f in (file_list or []) if f]
+    if len(files) <= 1:
+        return sum(1 for f in files if _safe_remove_project_file_logged(f))
+    # batch: unlink on the file I/O pool
+    return sum(1 for ok in get_file_executor().map(_safe_remove_project_file_logged, files) if ok)
+
+
+def save_project_files(project_name, project_code, uploaded_files) -> list[dict]:
+    """Saves all uploaded files in parallel; returns file meta dicts (see save_uploaded_file_with_meta)"""
+    total = len(uploaded_files)
+    items = [
+        (fs, build_project_filename(project_name, project_code, fs.filename, idx, total))
+        for idx, fs in enumerate(uploaded_files, start=1)
+    ]
+    return save_uploaded_files_parallel(items, UPLOAD_SUBDIRS["PROJECT_PPRT"])
+
+
+def insert_project_file_rows(cursor, project_id, file_metas, now_str):
+    if not file_metas:
+        return
+    cursor.executemany(
+        """
+        INSERT INTO project_file
+            (project_id, file_name, original_name, file_size, sha256, mime_type, is_active, created_date)
+        VALUES (%s,%s,%s,%s,%s,%s,1,%s)
+        """,
+        [
+            (project_id, m["file_name"], m["original_name"], m["file_size"], m["sha256"], m["mime_type"], now_str)
+            for m in file_metas
+        ],
+    )
+
+
+def _project_member_ids(cursor, project_id) -> set[int]:
+    cursor.execute("SELECT DISTINCT user_id FROM project_member WHERE project_id=%s", (project_id,))
+    return {int(r["user_id"]) for r in cursor.fetchall()}
+
+
+def get_active_project_file_names(cursor, project_id) -> list[str]:
+    cursor.execute(
+        "SELECT file_name FROM project_file WHERE project_id=%s AND is_active=1",
+        (project_id,),
+    )
+    return [r["file_name"] for r in cursor.fetchall()]
 
 
 def parse_db_files(val):
@@ -123,6 +178,58 @@ def parse_db_files(val):
     return []
 
 
+# role -> project_member.member_role used for list scoping
+ROLE_MEMBER_SCOPE = {
+    "manager": "manager",
+    "project manager": "manager",
+    "assistant manager": "asst_manager",
+    "qa": "qa",
+    "agent": "team",
+}
+
+
+def _int_ids(values):
+    """
+    Member ids from any stored / submitted form, like multi_id_match_sql accepts them:
+    5, "5", "78,81", "[78]", '["78","81"]', [78, "81"] -> [5] / [78, 81]
+    """
+    if values is None:
+        return []
+    if not isinstance(values, (list, tuple, set)):
+        values = [values]
+    ids = []
+    for v in values:
+        cleaned = str(v).replace("[", "").replace("]", "").replace('"', "").replace(" ", "")
+        for part in cleaned.split(","):
+            if part.isdigit():
+                ids.append(int(part))
+    return ids
+
+
+def sync_project_members(cursor, project_id, project_manager_id, asst_ids, team_ids, qa_ids):
+    """
+    Rewrites project_member rows for one project (same transaction as the project row).
+    Returns user ids whose membership may have changed (old + new members).
+    """
+    cursor.execute("SELECT user_id FROM project_member WHERE project_id=%s", (project_id,))
+    affected = {int(r["user_id"]) for r in cursor.fetchall()}
+
+    rows = set()
+    for uid in _int_ids(project_manager_id):
+        rows.add((int(project_id), uid, "manager"))
+    for role, ids in (("asst_manager", asst_ids), ("team", team_ids), ("qa", qa_ids)):
+        for uid in _int_ids(ids):
+            rows.add((int(project_id), uid, role))
+
+    cursor.execute("DELETE FROM project_member WHERE project_id=%s", (project_id,))
+    if rows:
+        cursor.executemany(
+            "INSERT INTO project_member (project_id, user_id, member_role) VALUES (%s,%s,%s)",
+            sorted(rows),
+        )
+    return affected | {uid for _, uid, _ in rows}
+
+
 def get_public_upload_base():
     # Absolute base: https://tfshrms.cloud + /python/uploads
     return request.host_url.rstrip("/") + BASE_UPLOAD_URL
@@ -158,16 +265,11 @@ def create_project():
 
     uploaded_files = _get_uploaded_files()
 
-    saved_files = []
     try:
-        total = len(uploaded_files)
-        for idx, fs in enumerate(uploaded_files, start=1):
-            custom_name = build_project_filename(project_name, project_code, fs.filename, idx, total)
-            saved_name = save_uploaded_file(fs, UPLOAD_SUBDIRS["PROJECT_PPRT"], custom_name)
-            saved_files.append(saved_name)
+        file_metas = save_project_files(project_name, project_code, uploaded_files)
     except Exception as e:
-        safe_remove_project_files(saved_files)
         return api_response(400, f"File handling failed: {str(e)}")
+    saved_files = [m["file_name"] for m in file_metas]
 
     conn = get_db_connection()
     cursor = conn.cursor(dictionary=True)
@@ -205,7 +307,19 @@ def create_project():
                 now_str,
             ),
         )
+        new_project_id = cursor.lastrowid
+        affected_users = sync_project_members(
+            cursor,
+            new_project_id,
+            project_manager_id,
+            asst_project_manager_id,
+            project_team_id,
+            project_qa_id,
+        )
+        insert_project_file_rows(cursor, new_project_id, file_metas, now_str)
         conn.commit()
+        data_versions.bump("project", new_project_id)
+        invalidate_users(affected_users)
 
         # ✅ return absolute URLs
         return api_response(201, "Project created successfully", {
@@ -235,6 +349,7 @@ def update_project():
     updated_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     new_saved_files = []
+    new_file_metas = []
     old_files_to_delete = []
 
     try:
@@ -266,16 +381,16 @@ def update_project():
         # file replace (if new files provided)
         uploaded_files = _get_uploaded_files()
         if uploaded_files:
-            old_files_to_delete = parse_db_files(existing.get("project_pprt"))
+            old_files_to_delete = sorted(
+                set(parse_db_files(existing.get("project_pprt")))
+                | set(get_active_project_file_names(cursor, project_id))
+            )
 
             use_project_name = update_values.get("project_name") or existing.get("project_name") or "PROJECT"
             use_project_code = update_values.get("project_code") or existing.get("project_code") or "CODE"
 
-            total = len(uploaded_files)
-            for idx, fs in enumerate(uploaded_files, start=1):
-                custom_name = build_project_filename(use_project_name, use_project_code, fs.filename, idx, total)
-                saved = save_uploaded_file(fs, UPLOAD_SUBDIRS["PROJECT_PPRT"], custom_name)
-                new_saved_files.append(saved)
+            new_file_metas = save_project_files(use_project_name, use_project_code, uploaded_files)
+            new_saved_files = [m["file_name"] for m in new_file_metas]
 
             update_values["project_pprt"] = json.dumps(new_saved_files)
 
@@ -291,7 +406,37 @@ def update_project():
             tuple(params),
         )
 
+        affected_users = None
+        member_keys = ("project_manager_id", "asst_project_manager_id", "project_team_id", "project_qa_id")
+        if any(k in update_values for k in member_keys):
+            def _final_list(key):
+                # stored JSON arrays and legacy CSV values both parse in _int_ids
+                return update_values[key] if key in update_values else existing.get(key)
+
+            affected_users = sync_project_members(
+                cursor,
+                project_id,
+                update_values.get("project_manager_id", existing.get("project_manager_id")),
+                _final_list("asst_project_manager_id"),
+                _final_list("project_team_id"),
+                _final_list("project_qa_id"),
+            )
+
+        if new_file_metas:
+            cursor.execute(
+                "UPDATE project_file SET is_active=0 WHERE project_id=%s AND is_active=1",
+                (project_id,),
+            )
+            insert_project_file_rows(cursor, project_id, new_file_metas, updated_str)
+
         conn.commit()
+        data_versions.bump("project", project_id)
+
+        # membership or project name changed -> rebuild assignment graphs
+        if affected_users is not None:
+            invalidate_users(affected_users)
+        elif "project_name" in update_values:
+            invalidate_users(_project_member_ids(cursor, project_id))
 
         # ✅ delete old files only AFTER commit
         if old_files_to_delete:
@@ -336,13 +481,22 @@ def delete_project():
             conn.rollback()
             return api_response(404, "Project not found or already deleted")
 
-        old_files = parse_db_files(row.get("project_pprt"))
+        old_files = sorted(
+            set(parse_db_files(row.get("project_pprt")))
+            | set(get_active_project_file_names(cursor, project_id))
+        )
 
         cursor.execute(
             "UPDATE project SET is_active=0, updated_date=%s WHERE project_id=%s",
             (updated_str, project_id),
         )
+        cursor.execute(
+            "UPDATE project_file SET is_active=0 WHERE project_id=%s AND is_active=1",
+            (project_id,),
+        )
         conn.commit()
+        data_versions.bump("project", project_id)
+        invalidate_users(_project_member_ids(cursor, project_id))
 
         # delete files after commit
         safe_remove_project_files(old_files)
@@ -357,19 +511,35 @@ def delete_project():
         conn.close()
 
 
-# ---------------- LIST PROJECTS (return multiple absolute URLs) ---------------- #
+# ---------------- LIST PROJECTS (role-scoped, optional keyset pagination) ---------------- #
+# body:
+#   logged_in_user_id  -> scopes non-admin roles to their own projects (project_member)
+#   limit / cursor     -> optional keyset pagination on project_id (response becomes a page object)
+#   include_files      -> false skips project_pprt parsing / URLs
 
 @project_bp.route("/list", methods=["POST"])
+@auth_context()
+@conditional_get("project", "tfs_user")
 def list_projects():
     data = request.get_json(silent=True) or {}
     logged_in_user_id = data.get("logged_in_user_id")
+    include_files = str(data.get("include_files", True)).lower() not in ("0", "false", "no")
+    paginated = is_paginated(data)
+
+    try:
+        limit, after = get_page_params(data) if paginated else (None, None)
+    except ValueError as e:
+        return api_response(400, str(e))
 
     conn = get_db_connection()
     cursor = conn.cursor(dictionary=True)
 
     try:
         role_name = None
-        if logged_in_user_id:
+        auth = get_auth_context(logged_in_user_id) if logged_in_user_id else None
+        if auth:
+            role_name = auth["role"]
+        elif logged_in_user_id:
             cursor.execute("""
                 SELECT r.role_name FROM tfs_user u
                 JOIN user_role r ON r.role_id = u.role_id
@@ -379,24 +549,58 @@ def list_projects():
             if row:
                 role_name = (row["role_name"] or "").strip().lower()
 
-        cursor.execute("""
-            SELECT project_id, project_name, project_code, project_description,
-                   project_team_id, project_manager_id, asst_project_manager_id, project_qa_id,
-                   project_pprt, created_date, updated_date
-            FROM project
-            WHERE is_active=1
-            ORDER BY project_id DESC
-        """)
+        params = []
+        member_join = ""
+        member_role = ROLE_MEMBER_SCOPE.get(role_name or "")
+        if member_role:
+            member_join = """
+                JOIN project_member pm
+                  ON pm.project_id = p.project_id
+                 AND pm.user_id = %s
+                 AND pm.member_role = %s
+            """
+            params.extend([int(logged_in_user_id), member_role])
+
+        where = "WHERE p.is_active=1"
+        if paginated:
+            where += keyset_clause("p.project_id", after, params)
+
+        query = f"""
+            SELECT p.project_id, p.project_name, p.project_code, p.project_description,
+                   p.project_team_id, p.project_manager_id, p.asst_project_manager_id, p.project_qa_id,
+                   p.created_date, p.updated_date
+            FROM project p
+            {member_join}
+            {where}
+            ORDER BY p.project_id DESC
+        """
+        if paginated:
+            query += " LIMIT %s"
+            params.append(limit + 1)
+
+        cursor.execute(query, tuple(params))
         projects = cursor.fetchall()
 
+        # attachments for this page in one indexed lookup
+        files_by_project = {}
+        if include_files and projects:
+            page_ids = [p["project_id"] for p in projects]
+            in_ph = ",".join(["%s"] * len(page_ids))
+            cursor.execute(
+                f"""
+                SELECT project_id, file_name
+                FROM project_file
+                WHERE is_active=1 AND project_id IN ({in_ph})
+                ORDER BY project_file_id
+                """,
+                tuple(page_ids),
+            )
+            for r in cursor.fetchall():
+                files_by_project.setdefault(r["project_id"], []).append(r["file_name"])
+
         result = []
         for proj in projects:
-            # ✅ If you want: re-add your role filtering here (same logic you had earlier)
-
-            files = parse_db_files(proj.get("project_pprt"))
-            project_files = files_to_urls(files)  # ✅ absolute array links
-
-            result.append({
+            item = {
                 "project_id": proj["project_id"],
                 "project_name": proj["project_name"],
                 "project_code": proj["project_code"],
@@ -405,10 +609,15 @@ def list_projects():
                 "project_team_id": json.loads(proj.get("project_team_id") or "[]"),
                 "asst_project_manager_id": json.loads(proj.get("asst_project_manager_id") or "[]"),
                 "project_qa_id": json.loads(proj.get("project_qa_id") or "[]"),
-                "project_files": project_files,
                 "created_date": proj["created_date"],
                 "updated_date": proj["updated_date"],
-            })
+            }
+            if include_files:
+                item["project_files"] = files_to_urls(files_by_project.get(proj["project_id"], []))  # ✅ absolute array links
+            result.append(item)
+
+        if paginated:
+            return api_response(200, "Project list fetched successfully", page_result(result, limit, "project_id"))
 
         return api_response(200, "Project list fetched successfully", result)
 
@@ -417,3 +626,39 @@ def list_projects():
     finally:
         cursor.close()
         conn.close()
+
+
+# ---------------- PROJECT FILES (attachment metadata) ---------------- #
+
+@project_bp.route("/files", methods=["POST"])
+def list_project_files():
+    data = request.get_json(silent=True) or {}
+    project_id = data.get("project_id")
+    if not project_id:
+        return api_response(400, "project_id is required")
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        cursor.execute(
+            """
+            SELECT project_file_id, file_name, original_name, file_size, sha256, mime_type, created_date
+            FROM project_file
+            WHERE project_id=%s AND is_active=1
+            ORDER BY project_file_id
+            """,
+            (project_id,),
+        )
+        rows = cursor.fetchall()
+        urls = files_to_urls([r["file_name"] for r in rows])
+        for r, url in zip(rows, urls):
+            r["url"] = url
+
+        return api_response(200, "Project files fetched successfully", rows)
+
+    except Exception as e:
+        return api_response(500, f"Failed to fetch project files: {str(e)}")
+    finally:
+        cursor.close()
+        conn.close()
@@ -1,7 +1,13 @@
 from flask import Blueprint, request
 from config import get_db_connection
 from utils.response import api_response
-from datetime import datetime
+from utils.cache import TTLCache
+from utils import data_versions
+from utils import billable_metrics
+from utils.pagination import get_page_params, keyset_clause, page_result, cached_total
+from utils.work_calendar import month_range, month_datetime_bounds, month_yyyymm
+from datetime import datetime, date
+import re
 
 project_monthly_tracker_bp = Blueprint("project_monthly_tracker",__name__)
 
@@ -66,6 +72,7 @@ def add_project_monthly_tracker():
             (project_id, month_year, monthly_target, created_date)
         )
         conn.commit()
+        data_versions.bump("project_target", project_id)
 
         return api_response(201, "Project monthly target added successfully", {
             "project_monthly_tracker_id": cursor.lastrowid
@@ -166,6 +173,7 @@ def update_project_monthly_tracker():
         """
         cursor.execute(query, tuple(params))
         conn.commit()
+        data_versions.bump("project_target", int(current["project_id"]))
 
         return api_response(200, "Project monthly target updated successfully")
 
@@ -214,6 +222,7 @@ def delete_project_monthly_tracker():
             (pm_id,)
         )
         conn.commit()
+        data_versions.bump("project_target")
         return api_response(200, "Project monthly target deleted successfully")
 
     except Exception as e:
@@ -224,6 +233,25 @@ def delete_project_monthly_tracker():
         conn.close()
 
 
+# project_name search (project_name_match):
+#   contains (default) LIKE '%term%', same results as before (full scan of project)
+#   prefix   opt-in word-prefix match via FULLTEXT ft_project_name; short terms use
+#            idx_project_name with LIKE 'term%'
+FULLTEXT_MIN_TERM = 3
+
+
+def project_name_filter(term: str, mode: str = "contains") -> tuple[str, list]:
+    if mode != "prefix":
+        return " AND p.project_name LIKE %s", [f"%{term}%"]
+
+    words = [w for w in re.split(r"\W+", term) if w]
+    if not words or any(len(w) < FULLTEXT_MIN_TERM for w in words):
+        return " AND p.project_name LIKE %s", [term.replace("%", "").replace("_", "\\_") + "%"]
+
+    boolean_query = " ".join(f"+{w}*" for w in words)
+    return " AND MATCH(p.project_name) AGAINST (%s IN BOOLEAN MODE)", [boolean_query]
+
+
 # -----------------------------
 # LIST (active only, optional filters)
 # -----------------------------
@@ -247,17 +275,34 @@ def list_project_monthly_tracker():
         where += " AND pmt.month_year = %s"
         params.append(str(data["month_year"]).strip())
 
+    needs_project_join = False
     if data.get("project_name"):
-        where += " AND p.project_name LIKE %s"
-        params.append(f"%{data['project_name']}%")
+        name_sql, name_params = project_name_filter(
+            str(data["project_name"]).strip(), data.get("project_name_match") or "contains"
+        )
+        where += name_sql
+        params.extend(name_params)
+        needs_project_join = True
 
-    limit = int(data.get("limit") or 200)
-    offset = int(data.get("offset") or 0)
+    try:
+        limit, after = get_page_params(data, default_limit=200)
+        offset = int(data.get("offset") or 0)
+    except ValueError as e:
+        return api_response(400, str(e))
 
     conn = get_db_connection()
     cursor = conn.cursor(dictionary=True)
 
     try:
+        page_params = list(params)
+        # keyset on the primary key; OFFSET only for old clients that still send it
+        page_where = where + keyset_clause("pmt.project_monthly_tracker_id", after, page_params)
+        paging_sql = "LIMIT %s"
+        page_params.append(limit + 1)
+        if offset and after is None:
+            paging_sql += " OFFSET %s"
+            page_params.append(offset)
+
         query = f"""
             SELECT
                 pmt.project_monthly_tracker_id,
@@ -269,27 +314,36 @@ def list_project_monthly_tracker():
                 pmt.is_active
             FROM project_monthly_tracker pmt
             LEFT JOIN project p ON p.project_id = pmt.project_id
-            {where}
+            {page_where}
             ORDER BY pmt.project_monthly_tracker_id DESC
-            LIMIT %s OFFSET %s
+            {paging_sql}
         """
-        cursor.execute(query, tuple(params + [limit, offset]))
-        rows = cursor.fetchall()
+        cursor.execute(query, tuple(page_params))
+        page = page_result(cursor.fetchall(), limit, "project_monthly_tracker_id")
 
+        # total: cached between target / project changes (name search) unless exact_count=true
         count_query = f"""
             SELECT COUNT(*) AS total
             FROM project_monthly_tracker pmt
-            LEFT JOIN project p ON p.project_id = pmt.project_id
+            {"LEFT JOIN project p ON p.project_id = pmt.project_id" if needs_project_join else ""}
             {where}
         """
-        cursor.execute(count_query, tuple(params))
-        total = (cursor.fetchone() or {}).get("total", 0)
+        total, total_is_exact = cached_total(
+            cursor,
+            count_query,
+            params,
+            version=data_versions.token("project_target", "project"),
+            exact=bool(data.get("exact_count")),
+        )
 
         return api_response(200, "Records fetched successfully", {
             "total": total,
+            "total_is_exact": total_is_exact,
             "limit": limit,
-            "offset": offset,
-            "rows": rows
+            "offset": offset if after is None else None,
+            "has_more": page["has_more"],
+            "next_cursor": page["next_cursor"],
+            "rows": page["rows"]
         })
 
     except Exception as e:
@@ -297,3 +351,158 @@ def list_project_monthly_tracker():
     finally:
         cursor.close()
         conn.close()
+
+
+# -----------------------------
+# ATTAINMENT (target vs achieved per project, one grouped pass)
+# -----------------------------
+ATTAINMENT_CACHE_TTL = 120
+_attainment_cache = TTLCache(ttl_seconds=ATTAINMENT_CACHE_TTL, max_entries=500)
+
+
+def elapsed_days(first: date, last: date) -> int:
+    """Calendar days of the month already passed (today included)"""
+    today = date.today()
+    if today < first:
+        return 0
+    if today > last:
+        return (last - first).days + 1
+    return (today - first).days + 1
+
+
+def compute_project_attainment(cursor, month_year: str, project_ids: list[int] | None = None) -> list[dict]:
+    yyyymm = month_yyyymm(month_year)
+    first, last = month_range(yyyymm)
+    days_in_month = last.day
+    days_elapsed = elapsed_days(first, last)
+
+    project_filter = ""
+    params = [*month_datetime_bounds(yyyymm), month_year]
+    if project_ids:
+        project_filter = f" AND p.project_id IN ({','.join(['%s'] * len(project_ids))})"
+        params.extend(project_ids)
+
+    # date_time is TEXT 'YYYY-MM-DD HH:MM:SS' -> string range (no CAST, index friendly)
+    cursor.execute(
+        f"""
+        SELECT
+            p.project_id,
+            p.project_name,
+            p.project_code,
+            pmt.project_monthly_tracker_id,
+            CAST(pmt.monthly_target AS DECIMAL(12,2)) AS monthly_target,
+            COALESCE(agg.achieved_billable_hours, 0) AS achieved_billable_hours,
+            COALESCE(agg.total_production, 0) AS total_production,
+            COALESCE(agg.contributing_users, 0) AS contributing_users,
+            COALESCE(agg.tracker_entries, 0) AS tracker_entries,
+            COALESCE(agg.worked_days, 0) AS worked_days
+        FROM project p
+        LEFT JOIN (
+            SELECT
+                twt.project_id,
+                SUM({billable_metrics.billable_sql()}) AS achieved_billable_hours,
+                SUM(COALESCE(twt.production, 0)) AS total_production,
+                COUNT(DISTINCT twt.user_id) AS contributing_users,
+                COUNT(*) AS tracker_entries,
+                COUNT(DISTINCT LEFT(twt.date_time, 10)) AS worked_days
+            FROM task_work_tracker twt
+            WHERE twt.is_active = 1
+              AND twt.date_time >= %s AND twt.date_time < %s
+            GROUP BY twt.project_id
+        ) agg ON agg.project_id = p.project_id
+        LEFT JOIN project_monthly_tracker pmt
+          ON pmt.project_id = p.project_id
+         AND pmt.is_active = 1
+         AND pmt.month_year = %s
+        WHERE p.is_active = 1
+          AND (pmt.project_monthly_tracker_id IS NOT NULL OR agg.project_id IS NOT NULL)
+          {project_filter}
+        ORDER BY p.project_name
+        """,
+        tuple(params),
+    )
+    rows = cursor.fetchall()
+
+    for r in rows:
+        target = float(r["monthly_target"]) if r["monthly_target"] is not None else None
+        achieved = float(r["achieved_billable_hours"] or 0)
+        projected = achieved / days_elapsed * days_in_month if days_elapsed else 0.0
+
+        r["monthly_target"] = target
+        r["achieved_billable_hours"] = round(achieved, 2)
+        r["total_production"] = float(r["total_production"] or 0)
+        r["projected_billable_hours"] = round(projected, 2)
+        if target:
+            r["attainment_pct"] = round(achieved / target * 100, 2)
+            r["projected_attainment_pct"] = round(projected / target * 100, 2)
+            r["remaining_hours"] = round(max(target - achieved, 0), 2)
+            remaining_days = days_in_month - days_elapsed
+            r["required_daily_hours"] = round(r["remaining_hours"] / remaining_days, 2) if remaining_days > 0 else None
+        else:
+            r["attainment_pct"] = None
+            r["projected_attainment_pct"] = None
+            r["remaining_hours"] = None
+            r["required_daily_hours"] = None
+
+    return rows
+
+
+@project_monthly_tracker_bp.route("/attainment", methods=["POST"])
+def project_attainment():
+    """
+    body (all optional):
+      month_year   MONYYYY, default current month
+      project_ids  limit to these projects
+    Every active project with a target or tracker activity in the month, with
+    target, achieved billable hours, production, contributing users and a
+    calendar-day run-rate projection.
+    """
+    data = request.get_json(silent=True) or {}
+
+    month_year = str(data.get("month_year") or datetime.now().strftime("%b%Y")).strip().upper()
+    if month_yyyymm(month_year) is None:
+        return api_response(400, "month_year must be MONYYYY (e.g. JAN2026)")
+
+    project_ids = None
+    if data.get("project_ids"):
+        if not isinstance(data["project_ids"], list):
+            return api_response(400, "project_ids must be a list")
+        project_ids = sorted({int(p) for p in data["project_ids"] if str(p).strip().isdigit()})
+
+    cache_key = (
+        month_year,
+        date.today().isoformat(),
+        tuple(project_ids or ()),
+        data_versions.token("tracker", "project_target"),
+    )
+    cached = _attainment_cache.get(cache_key)
+    if cached is not None:
+        return api_response(200, "Project attainment fetched successfully", cached)
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        rows = compute_project_attainment(cursor, month_year, project_ids)
+
+        totals_target = sum(r["monthly_target"] or 0 for r in rows)
+        totals_achieved = sum(r["achieved_billable_hours"] for r in rows)
+        result = {
+            "month_year": month_year,
+            "count": len(rows),
+            "totals": {
+                "monthly_target": round(totals_target, 2),
+                "achieved_billable_hours": round(totals_achieved, 2),
+                "projected_billable_hours": round(sum(r["projected_billable_hours"] for r in rows), 2),
+                "attainment_pct": round(totals_achieved / totals_target * 100, 2) if totals_target else None,
+            },
+            "projects": rows,
+        }
+        _attainment_cache.set(cache_key, result)
+        return api_response(200, "Project attainment fetched successfully", result)
+
+    except Exception as e:
+        return api_response(500, f"Attainment failed: {str(e)}")
+    finally:
+        cursor.close()
+        conn.close()
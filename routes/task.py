@@ -3,12 +3,42 @@ from utils.response import api_response
 from config import get_db_connection, UPLOAD_FOLDER, UPLOAD_SUBDIRS
 import json
 from utils.file_utils import save_base64_file
+from utils.auth_token import auth_context
+from utils.pagination import is_paginated, get_page_params, keyset_clause, page_result
+from utils.assignment_graph import invalidate_users
+from utils.http_cache import conditional_get
 from datetime import datetime
 
 task_bp = Blueprint("task", __name__)
 
 DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+
+def sync_task_team(cursor, task_id, user_ids):
+    """Rewrites task_team rows for one task (same transaction as the task row)"""
+    ids = sorted({int(str(u).strip()) for u in (user_ids or []) if str(u).strip().isdigit()})
+    cursor.execute("DELETE FROM task_team WHERE task_id=%s", (task_id,))
+    if ids:
+        cursor.executemany(
+            "INSERT INTO task_team (task_id, user_id) VALUES (%s,%s)",
+            [(task_id, uid) for uid in ids],
+        )
+
+
+def task_audience(cursor, task_id) -> set[int]:
+    """Users whose 'projects with tasks' graph contains this task (team + project members)"""
+    cursor.execute(
+        """
+        SELECT tt.user_id FROM task_team tt WHERE tt.task_id = %s
+        UNION
+        SELECT pm.user_id FROM task t
+        JOIN project_member pm ON pm.project_id = t.project_id
+        WHERE t.task_id = %s
+        """,
+        (task_id, task_id),
+    )
+    return {int(r["user_id"]) for r in cursor.fetchall()}
+
 # ---------------- CREATE TASK ---------------- #
 @task_bp.route("/add", methods=["POST"])
 def add_task():
@@ -71,7 +101,11 @@ def add_task():
             now_str,
             now_str
         ))
+        new_task_id = cursor.lastrowid
+        sync_task_team(cursor, new_task_id, data["task_team_id"])
+        affected_users = task_audience(cursor, new_task_id)
         conn.commit()
+        invalidate_users(affected_users)
         return api_response(201, "Task added successfully")
     except Exception as e:
         conn.rollback()
@@ -154,6 +188,8 @@ def update_task():
             conn.rollback()
             return api_response(404, "Task not found")
 
+        affected_users = task_audience(cursor, task_id)
+
         set_clause = ", ".join(f"{k}=%s" for k in update_values)
 
         cursor.execute(f"""
@@ -162,7 +198,12 @@ def update_task():
             WHERE task_id=%s
         """, (*update_values.values(), updated_str, task_id))
 
+        if "task_team_id" in update_values:
+            sync_task_team(cursor, task_id, data["task_team_id"])
+
+        affected_users |= task_audience(cursor, task_id)
         conn.commit()
+        invalidate_users(affected_users)
         return api_response(200, "Task updated successfully")
 
     except Exception as e:
@@ -197,8 +238,10 @@ def delete_task():
             conn.rollback()
             return api_response(404, "Task not found or already deleted")
 
+        affected_users = task_audience(cursor, task_id)
         cursor.execute("UPDATE task SET is_active=0, updated_date=%s WHERE task_id=%s", (updated_str, task_id))
         conn.commit()
+        invalidate_users(affected_users)
         return api_response(200, "Task deleted successfully")
     except Exception as e:
         conn.rollback()
@@ -209,19 +252,58 @@ def delete_task():
 
 
 # ---------------- LIST TASKS ---------------- #
+# body (all optional):
+#   project_id     -> tasks of one project (idx_task_project_active)
+#   user_id        -> tasks assigned to this user (task_team)
+#   limit / cursor -> keyset pagination on task_id (response becomes a page object)
 @task_bp.route("/list", methods=["POST"])
+@auth_context()
+@conditional_get("task", "project", "tfs_user")
 def list_tasks():
+    data = request.get_json(silent=True) or {}
+    paginated = is_paginated(data)
+
+    try:
+        limit, after = get_page_params(data) if paginated else (None, None)
+    except ValueError as e:
+        return api_response(400, str(e))
+
+    try:
+        user_id = int(data["user_id"]) if data.get("user_id") else None
+        project_id = int(data["project_id"]) if data.get("project_id") else None
+    except (TypeError, ValueError):
+        return api_response(400, "user_id and project_id must be integers")
+
+    params = []
+    team_join = ""
+    if user_id:
+        team_join = "JOIN task_team tt ON tt.task_id = t.task_id AND tt.user_id = %s"
+        params.append(user_id)
+
+    where = "WHERE t.is_active=1"
+    if project_id:
+        where += " AND t.project_id=%s"
+        params.append(project_id)
+    if paginated:
+        where += keyset_clause("t.task_id", after, params)
+
+    query = f"""
+        SELECT t.task_id, t.project_id, t.task_team_id,
+               t.task_name, t.task_description, t.task_target,
+               t.is_active, t.created_date, t.updated_date
+        FROM task t
+        {team_join}
+        {where}
+        ORDER BY t.task_id DESC
+    """
+    if paginated:
+        query += " LIMIT %s"
+        params.append(limit + 1)
+
     conn = get_db_connection()
     cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("""
-            SELECT task_id, project_id, task_team_id,
-                   task_name, task_description, task_target,
-                   is_active, created_date, updated_date
-            FROM task
-            WHERE is_active=1
-            ORDER BY task_id DESC
-        """)
+        cursor.execute(query, tuple(params))
         tasks = cursor.fetchall()
         result = []
         for t in tasks:
@@ -236,6 +318,8 @@ def list_tasks():
                 "created_date": t["created_date"],
                 "updated_date": t["updated_date"]
             })
+        if paginated:
+            return api_response(200, "Task list fetched successfully", page_result(result, limit, "task_id"))
         return api_response(200, "Task list fetched successfully", result)
     except Exception as e:
         return api_response(500, f"Failed to fetch tasks: {str(e)}")
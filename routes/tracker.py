@@ -3,7 +3,25 @@ from config import get_db_connection, BASE_UPLOAD_URL, UPLOAD_SUBDIRS, UPLOAD_FO
 from utils.response import api_response
 from utils.file_utils import save_base64_file  # kept (not used now in update)
 from utils.api_log_utils import log_api_call
-from datetime import datetime
+from utils.auth_token import auth_context, get_auth_context, get_role_context
+from utils.cache import TTLCache
+from utils import data_versions
+from utils.db import stream
+from utils.db_router import read_only_route
+from utils.http_cache import conditional_get
+from utils.tracker_file_processing import schedule_tracker_file_inspection
+from utils import billable_metrics
+from utils.work_calendar import (
+    get_working_days,
+    get_user_leaves,
+    count_working_days,
+    working_days_after,
+    month_range,
+    month_datetime_bounds,
+    month_yyyymm,
+)
+from datetime import datetime, date, timedelta
+from decimal import Decimal
 import re
 import os
 
@@ -35,34 +53,210 @@ def normalize_month_year(month_year: str) -> str:
     return f"{month_abbr}{year_part}"
 
 
-def get_role_context(cursor, user_id: int) -> dict:
-    cursor.execute(
-        """
-        SELECT
-            u.role_id AS user_role_id,
-            r.role_name AS user_role_name,
-            (
-                SELECT ur2.role_id
-                FROM user_role ur2
-                WHERE LOWER(TRIM(ur2.role_name)) = 'agent'
-                LIMIT 1
-            ) AS agent_role_id
-        FROM tfs_user u
-        JOIN user_role r ON r.role_id = u.role_id
-        WHERE u.user_id=%s AND u.is_active=1 AND u.is_delete=1
-        """,
-        (int(user_id),),
+def cleaned_csv_col(col_sql: str) -> str:
+    return f"REPLACE(REPLACE(REPLACE({col_sql}, '[', ''), ']', ''), ' ', '')"
+
+
+def month_bounds(month_year: str):
+    """
+    'Jan2026' -> ('2026-01-01 00:00:00', '2026-02-01 00:00:00')
+    Returns None if month_year is not parseable.
+    """
+    yyyymm = month_yyyymm(month_year)
+    if yyyymm is None:
+        return None
+    return month_datetime_bounds(yyyymm)
+
+
+def month_cutoff_date(month_year: str) -> date | None:
+    """
+    Last day counted as 'worked so far':
+      current month -> today, past month -> last day, future month -> day before it starts
+    """
+    yyyymm = month_yyyymm(month_year)
+    if yyyymm is None:
+        return None
+    first, last = month_range(yyyymm)
+    today = date.today()
+    if first <= today <= last:
+        return today
+    if today > last:
+        return last
+    return first - timedelta(days=1)
+
+
+def get_visible_user_ids(cursor, logged_in_user_id, role_name: str, team_id=None) -> list[int] | None:
+    """
+    Users whose trackers the logged-in user can see.
+    None = no restriction (admin / super admin, no team filter).
+    """
+    if role_name in ("admin", "super admin"):
+        if not team_id:
+            return None
+        cursor.execute(
+            "SELECT user_id FROM tfs_user WHERE is_active=1 AND is_delete=1 AND team_id=%s",
+            (team_id,),
+        )
+        return [int(r["user_id"]) for r in cursor.fetchall()]
+
+    manager_id_str = str(logged_in_user_id)
+    query = f"""
+        SELECT tu.user_id
+        FROM tfs_user tu
+        WHERE tu.is_active = 1
+          AND tu.is_delete = 1
+          AND (
+                tu.project_manager_id = %s
+                OR tu.asst_manager_id = %s
+                OR tu.qa_id = %s
+                OR tu.user_id = %s
+                OR FIND_IN_SET(%s, {cleaned_csv_col("tu.project_manager_id")}) > 0
+                OR FIND_IN_SET(%s, {cleaned_csv_col("tu.asst_manager_id")}) > 0
+                OR FIND_IN_SET(%s, {cleaned_csv_col("tu.qa_id")}) > 0
+          )
+    """
+    params = [manager_id_str] * 7
+    if team_id:
+        query += " AND tu.team_id = %s"
+        params.append(team_id)
+    cursor.execute(query, tuple(params))
+    return [int(r["user_id"]) for r in cursor.fetchall()]
+
+
+# ---------- month summary (per-user, cached on tracker / target changes)
+
+MONTH_SUMMARY_CACHE_TTL = 300
+_month_summary_cache = TTLCache(ttl_seconds=MONTH_SUMMARY_CACHE_TTL)
+
+
+def _month_summary_key(user_id: int, month_year: str, cutoff: date):
+    return (
+        user_id,
+        month_year.lower(),
+        cutoff.isoformat(),
+        data_versions.get("tracker", user_id),
+        data_versions.get("user_target", user_id),
+        data_versions.get("work_calendar"),
     )
-    row = cursor.fetchone() or {}
-    return {
-        "user_role_id": row.get("user_role_id"),
-        "user_role_name": (row.get("user_role_name") or "").strip().lower(),
-        "agent_role_id": row.get("agent_role_id"),
-    }
 
 
-def cleaned_csv_col(col_sql: str) -> str:
-    return f"REPLACE(REPLACE(REPLACE({col_sql}, '[', ''), ']', ''), ' ', '')"
+def month_calendars(cursor, user_teams: dict, yyyymm: int) -> tuple[dict, dict]:
+    """
+    user_id -> team_id  =>  (user_id -> working-day ordinals, user_id -> leave ordinals)
+    Team calendars are shared (and cached in utils.work_calendar); leaves are one query.
+    """
+    by_team = {}
+    days = {}
+    for uid, team_id in user_teams.items():
+        team_key = int(team_id) if team_id else None
+        if team_key not in by_team:
+            by_team[team_key] = get_working_days(cursor, yyyymm, team_key)
+        days[uid] = by_team[team_key]
+    return days, get_user_leaves(cursor, list(user_teams), yyyymm)
+
+
+def remaining_working_days(days, leaves, cutoff: date, month_end: date, last_work_date=None) -> int:
+    """
+    Working days still ahead of the user after the cutoff.
+    Today (cutoff of the current month) still counts while nothing is tracked for it.
+    """
+    pending = working_days_after(days, cutoff, month_end, leaves)
+    if cutoff == date.today() and str(last_work_date or "")[:10] != cutoff.isoformat():
+        pending += count_working_days(days, cutoff, cutoff, leaves)
+    return pending
+
+
+def _finish_month_summary_row(row: dict, pending_days: int) -> dict:
+    total_target = Decimal(row["monthly_target"] or 0) + Decimal(row["extra_assigned_hours"] or 0)
+    billable = Decimal(row["total_billable_hours_month"] or 0)
+    row["monthly_total_target"] = total_target
+
+    if row.get("user_monthly_tracker_id") is None:
+        row["pending_days"] = None
+        row["daily_required_hours"] = None
+        return row
+
+    row["pending_days"] = pending_days
+    row["daily_required_hours"] = (total_target - billable) / pending_days if pending_days else None
+    return row
+
+
+def compute_month_summary(cursor, user_ids: list[int], month_year: str) -> list[dict]:
+    """
+    pending_days / daily_required_hours / billable total per user for one month.
+    Billable total and last worked day of the cache misses come from one grouped query.
+    """
+    bounds = month_bounds(month_year)
+    cutoff = month_cutoff_date(month_year)
+    if not bounds or not user_ids:
+        return []
+
+    user_ids = sorted({int(u) for u in user_ids})
+    result = {}
+    misses = []
+    for uid in user_ids:
+        cached = _month_summary_cache.get(_month_summary_key(uid, month_year, cutoff))
+        if cached is not None:
+            result[uid] = dict(cached)
+        else:
+            misses.append(uid)
+
+    if misses:
+        yyyymm = month_yyyymm(month_year)
+        in_ph = ",".join(["%s"] * len(misses))
+        cursor.execute(
+            f"""
+            SELECT
+                u.user_id,
+                u.user_name,
+                u.team_id,
+                %s AS month_year,
+                umt.user_monthly_tracker_id,
+                COALESCE(umt.monthly_target, 0) AS monthly_target,
+                COALESCE(umt.extra_assigned_hours, 0) AS extra_assigned_hours
+            FROM tfs_user u
+            LEFT JOIN user_monthly_tracker umt
+              ON umt.user_id = u.user_id
+             AND umt.is_active = 1
+             AND umt.yyyymm = %s
+            WHERE u.user_id IN ({in_ph})
+            """,
+            tuple([month_year, yyyymm] + misses),
+        )
+        fetched = cursor.fetchall()
+
+        cursor.execute(
+            f"""
+            SELECT
+                twt.user_id,
+                SUM({billable_metrics.billable_sql()}) AS billable,
+                MAX(LEFT(twt.date_time, 10)) AS last_work_date
+            FROM task_work_tracker twt
+            WHERE twt.is_active = 1
+              AND twt.user_id IN ({in_ph})
+              AND twt.date_time >= %s
+              AND twt.date_time < %s
+            GROUP BY twt.user_id
+            """,
+            tuple(misses + [bounds[0], bounds[1]]),
+        )
+        totals = {int(r["user_id"]): r for r in cursor.fetchall()}
+
+        month_end = month_range(yyyymm)[1]
+        days, leaves = month_calendars(cursor, {int(r["user_id"]): r["team_id"] for r in fetched}, yyyymm)
+        for row in fetched:
+            uid = int(row["user_id"])
+            row.pop("team_id", None)
+            month_total = totals.get(uid) or {}
+            row["total_billable_hours_month"] = billable_metrics.to_decimal(month_total.get("billable") or 0)
+            pending = remaining_working_days(
+                days[uid], leaves.get(uid), cutoff, month_end, month_total.get("last_work_date")
+            )
+            row = _finish_month_summary_row(row, pending)
+            _month_summary_cache.set(_month_summary_key(uid, month_year, cutoff), dict(row))
+            result[uid] = row
+
+    return [result[uid] for uid in user_ids if uid in result]
 
 
 # ---------- NEW: filename helpers (tracker-specific, NOT in file_utils)
@@ -146,10 +340,108 @@ def safe_remove_tracker_file(filename: str) -> bool:
 
     return False
 
+
+# ---------- tracker write path: all referenced metadata in one query
+
+ADD_TRACKER_META_SQL = """
+    SELECT
+        t.task_target,
+        t.task_name,
+        t.project_id AS task_project_id,
+        (SELECT p.project_code FROM project p WHERE p.project_id = %s) AS project_code,
+        (SELECT u.user_name FROM tfs_user u WHERE u.user_id = %s) AS user_name
+    FROM task t
+    WHERE t.task_id = %s
+"""
+
+UPDATE_TRACKER_META_SQL = """
+    SELECT
+        twt.tracker_id,
+        twt.user_id,
+        twt.project_id,
+        twt.task_id,
+        twt.production,
+        twt.actual_target,
+        twt.tracker_file,
+        u.user_id AS tracker_user_id,
+        u.user_tenure,
+        u.user_name,
+        p.project_code,
+        t.task_name
+    FROM task_work_tracker twt
+    LEFT JOIN tfs_user u ON u.user_id = twt.user_id
+    LEFT JOIN project p ON p.project_id = twt.project_id
+    LEFT JOIN task t ON t.task_id = twt.task_id
+    WHERE twt.tracker_id = %s
+"""
+
+# ---------- idempotent /tracker/add
+# Client sends "Idempotency-Key" header (or idempotency_key form field) per submission;
+# a retry with the same key returns the original tracker_id without inserting / saving again.
+
+IDEMPOTENCY_KEY_MAX_LEN = 64
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("TRACKER_IDEMPOTENCY_TTL_SECONDS", str(48 * 60 * 60)))
+IDEMPOTENCY_PURGE_EVERY_SECONDS = 600
+_idempotency_cache = TTLCache(ttl_seconds=60 * 60, max_entries=20000)
+_idempotency_last_purge = [0.0]
+
+
+def get_idempotency_key(form):
+    """Returns the key, None if not sent, or False if invalid"""
+    key = (request.headers.get("Idempotency-Key") or form.get("idempotency_key") or "").strip()
+    if not key:
+        return None
+    if len(key) > IDEMPOTENCY_KEY_MAX_LEN or not re.fullmatch(r"[A-Za-z0-9_\-:.]+", key):
+        return False
+    return key
+
+
+def claim_idempotency_key(cursor, user_id: int, key: str, now: str) -> bool:
+    """
+    Inserts the key row inside the caller's transaction. A concurrent request with the
+    same key blocks on the primary key until this one commits / rolls back.
+    Returns False if the key was already used.
+    """
+    cursor.execute(
+        """
+        INSERT IGNORE INTO tracker_idempotency (user_id, idempotency_key, tracker_id, created_date)
+        VALUES (%s, %s, NULL, %s)
+        """,
+        (user_id, key, now),
+    )
+    return cursor.rowcount == 1
+
+
+def lookup_idempotency_key(cursor, user_id: int, key: str):
+    cursor.execute(
+        "SELECT tracker_id FROM tracker_idempotency WHERE user_id=%s AND idempotency_key=%s",
+        (user_id, key),
+    )
+    row = cursor.fetchone()
+    return row["tracker_id"] if row else None
+
+
+def purge_expired_idempotency_keys(conn, cursor):
+    now_ts = datetime.now().timestamp()
+    if now_ts - _idempotency_last_purge[0] < IDEMPOTENCY_PURGE_EVERY_SECONDS:
+        return
+    _idempotency_last_purge[0] = now_ts
+    cutoff = (datetime.now() - timedelta(seconds=IDEMPOTENCY_TTL_SECONDS)).strftime("%Y-%m-%d %H:%M:%S")
+    try:
+        cursor.execute("DELETE FROM tracker_idempotency WHERE created_date < %s LIMIT 5000", (cutoff,))
+        conn.commit()
+    except Exception as e:
+        print("IDEMPOTENCY PURGE FAILED:", str(e))
+
+
+def replayed_tracker_response(tracker_id):
+    return api_response(200, "Tracker already added", {"tracker_id": tracker_id, "replayed": True})
+
 # ------------------------
 # ADD TRACKER  (multipart + custom filename)
 # ------------------------
 @tracker_bp.route("/add", methods=["POST"])
+@auth_context()
 def add_tracker():
     form = request.form
 
@@ -164,30 +456,45 @@ def add_tracker():
     production = float(form["production"])
     tenure_target = float(form["tenure_target"])
 
-    billable_hours = production / tenure_target if tenure_target else 0
+    billable_hours = billable_metrics.billable_hours(production, tenure_target)
+
+    idem_key = get_idempotency_key(form)
+    if idem_key is False:
+        return api_response(400, f"Idempotency-Key must be up to {IDEMPOTENCY_KEY_MAX_LEN} chars of [A-Za-z0-9_-:.]")
+    if idem_key:
+        cached_id = _idempotency_cache.get((user_id, idem_key))
+        if cached_id is not None:
+            return replayed_tracker_response(cached_id)
 
     conn = get_db_connection()
     cursor = conn.cursor(dictionary=True)
 
     try:
-        # --- validate task + get task_target
-        cursor.execute("SELECT task_target, task_name FROM task WHERE task_id=%s", (task_id,))
-        task_row = cursor.fetchone()
-        if not task_row:
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        conn.start_transaction()
+
+        if idem_key and not claim_idempotency_key(cursor, user_id, idem_key, now):
+            conn.rollback()
+            original_id = lookup_idempotency_key(cursor, user_id, idem_key)
+            if original_id is None:
+                return api_response(409, "A submission with this Idempotency-Key is still in progress")
+            _idempotency_cache.set((user_id, idem_key), original_id)
+            return replayed_tracker_response(original_id)
+
+        # --- task_target / task_name / project_code / user_name in one round trip
+        cursor.execute(ADD_TRACKER_META_SQL, (project_id, user_id, task_id))
+        meta = cursor.fetchone()
+        if not meta:
+            conn.rollback()  # releases the idempotency key claimed above
             return api_response(404, "Task not found")
+        if meta["task_project_id"] is not None and int(meta["task_project_id"]) != project_id:
+            conn.rollback()
+            return api_response(400, "Task does not belong to the given project")
 
-        actual_target = task_row["task_target"]
-        task_name = task_row.get("task_name") or "Task"
-
-        # --- get project_code
-        cursor.execute("SELECT project_code FROM project WHERE project_id=%s", (project_id,))
-        proj_row = cursor.fetchone() or {}
-        project_code = proj_row.get("project_code") or "PROJECT"
-
-        # --- get user_name
-        cursor.execute("SELECT user_name FROM tfs_user WHERE user_id=%s", (user_id,))
-        usr_row = cursor.fetchone() or {}
-        user_name = usr_row.get("user_name") or "USER"
+        actual_target = meta["task_target"]
+        task_name = meta.get("task_name") or "Task"
+        project_code = meta.get("project_code") or "PROJECT"
+        user_name = meta.get("user_name") or "USER"
 
         # ✅ file save (multipart)
         tracker_file = None
@@ -198,10 +505,9 @@ def add_tracker():
                 custom_name = build_tracker_filename(project_code, task_name, user_name, uploaded.filename)
                 tracker_file = save_uploaded_file(uploaded, UPLOAD_SUBDIRS["TRACKER_FILES"], custom_name)
             except ValueError as e:
+                conn.rollback()
                 return api_response(400, str(e))
 
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
         cursor.execute(
             """
             INSERT INTO task_work_tracker
@@ -214,8 +520,18 @@ def add_tracker():
                 billable_hours, tracker_file, 1, now, now
             ),
         )
-        conn.commit()
         tracker_id = cursor.lastrowid
+        if idem_key:
+            cursor.execute(
+                "UPDATE tracker_idempotency SET tracker_id=%s WHERE user_id=%s AND idempotency_key=%s",
+                (tracker_id, user_id, idem_key),
+            )
+        conn.commit()
+        data_versions.bump("tracker", user_id)
+        schedule_tracker_file_inspection(tracker_id, tracker_file)
+        if idem_key:
+            _idempotency_cache.set((user_id, idem_key), tracker_id)
+            purge_expired_idempotency_keys(conn, cursor)
 
         device_id = form.get("device_id")
         device_type = form.get("device_type")
@@ -237,6 +553,7 @@ def add_tracker():
 # UPDATE TRACKER (multipart + optional file replace + custom filename)
 # ------------------------
 @tracker_bp.route("/update", methods=["POST"])
+@auth_context()
 def update_tracker():
     form = request.form
     tracker_id = form.get("tracker_id")
@@ -248,9 +565,14 @@ def update_tracker():
 
     # for rollback safety if DB update fails after saving file
     new_file_saved = None
+    # old file to delete once the new one is committed
+    replaced_file = None
 
     try:
-        cursor.execute("SELECT * FROM task_work_tracker WHERE tracker_id=%s", (tracker_id,))
+        conn.start_transaction()
+
+        # tracker row + user / project / task metadata in one round trip
+        cursor.execute(UPDATE_TRACKER_META_SQL, (tracker_id,))
         tracker = cursor.fetchone()
         if not tracker:
             return api_response(404, "Tracker not found")
@@ -261,31 +583,20 @@ def update_tracker():
         production = float(form.get("production", tracker["production"]))
         base_target = float(form.get("base_target", tracker["actual_target"]))
 
-        # tenure + user_name
-        cursor.execute("SELECT user_tenure, user_name FROM tfs_user WHERE user_id=%s", (tracker["user_id"],))
-        user_row = cursor.fetchone()
-        if not user_row:
+        if tracker["tracker_user_id"] is None:
             return api_response(404, "User not found")
 
         # compute targets (keep your existing calculate_targets)
-        actual_target, tenure_target = calculate_targets(base_target, user_row["user_tenure"])
+        actual_target, tenure_target = calculate_targets(base_target, tracker["user_tenure"])
 
         tracker_file = old_file
         uploaded = request.files.get("tracker_file")
 
         # ✅ Replace file only if new file provided
         if uploaded and uploaded.filename:
-            # project_code
-            cursor.execute("SELECT project_code FROM project WHERE project_id=%s", (tracker["project_id"],))
-            proj = cursor.fetchone() or {}
-            project_code = proj.get("project_code") or "PROJECT"
-
-            # task_name
-            cursor.execute("SELECT task_name FROM task WHERE task_id=%s", (tracker["task_id"],))
-            trow = cursor.fetchone() or {}
-            task_name = trow.get("task_name") or "TASK"
-
-            user_name = user_row.get("user_name") or "USER"
+            project_code = tracker.get("project_code") or "PROJECT"
+            task_name = tracker.get("task_name") or "TASK"
+            user_name = tracker.get("user_name") or "USER"
 
             custom_filename = build_tracker_filename(project_code, task_name, user_name, uploaded.filename)
 
@@ -295,18 +606,10 @@ def update_tracker():
             new_file = save_uploaded_file(uploaded, UPLOAD_SUBDIRS["TRACKER_FILES"], custom_filename)
             new_file_saved = new_file
 
-            # ✅ Delete old file (only if old exists AND not same)
-            try:
-                if old_file:
-                    old_file_norm = os.path.basename(str(old_file))
-                else:
-                    old_file_norm = None
-
-                if old_file_norm and old_file_norm != new_file:
-                    safe_remove_tracker_file(old_file_norm)
-            except Exception as e:
-                # DO NOT fail update if old deletion fails, but don't hide it
-                print("DELETE FAILED (update):", str(e), " old_file=", old_file)
+            # old file is removed only after the commit (see below)
+            old_file_norm = os.path.basename(str(old_file)) if old_file else None
+            if old_file_norm and old_file_norm != new_file:
+                replaced_file = old_file_norm
 
             tracker_file = new_file
 
@@ -318,7 +621,7 @@ def update_tracker():
             SET production=%s,
                 actual_target=%s,
                 tenure_target=%s,
-                billable_hours=(%s / NULLIF(%s, 0)),
+                billable_hours=%s,
                 tracker_file=%s,
                 updated_date=%s
             WHERE tracker_id=%s
@@ -327,18 +630,28 @@ def update_tracker():
                 production,
                 actual_target,
                 tenure_target,
-                production,
-                tenure_target,
+                billable_metrics.billable_hours(production, tenure_target),
                 tracker_file,
                 updated_date,
                 tracker_id,
             ),
         )
         conn.commit()
+        data_versions.bump("tracker", int(tracker["user_id"]))
 
         # if DB commit succeeded, clear rollback marker
+        if new_file_saved:
+            schedule_tracker_file_inspection(tracker_id, new_file_saved)
         new_file_saved = None
 
+        # ✅ Delete old file (only if old exists AND not same)
+        if replaced_file:
+            try:
+                safe_remove_tracker_file(replaced_file)
+            except Exception as e:
+                # DO NOT fail update if old deletion fails, but don't hide it
+                print("DELETE FAILED (update):", str(e), " old_file=", old_file)
+
         device_id = form.get("device_id")
         device_type = form.get("device_type")
         api_call_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -374,6 +687,7 @@ def update_tracker():
 # VIEW TRACKERS (UNCHANGED)
 # ------------------------
 @tracker_bp.route("/delete", methods=["POST"])
+@auth_context()
 def delete_tracker():
     data = request.get_json() or {}
     tracker_id = data.get("tracker_id")
@@ -394,10 +708,11 @@ def delete_tracker():
 
         # ✅ soft delete DB
         cursor.execute(
-            "UPDATE task_work_tracker SET is_active = 0 WHERE tracker_id = %s",
-            (tracker_id,),
+            "UPDATE task_work_tracker SET is_active = 0, updated_date = %s WHERE tracker_id = %s",
+            (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), tracker_id),
         )
         conn.commit()
+        data_versions.bump("tracker", int(tracker["user_id"]))
 
         # ✅ delete physical file
         try:
@@ -427,7 +742,21 @@ def delete_tracker():
 # ------------------------
 # VIEW TRACKERS (your existing logic + month_year normalization + robust manager matching)
 # ------------------------
+def requested_month_year() -> str:
+    """month_year of the request body, else the current month"""
+    data = request.get_json(silent=True) or {}
+    return normalize_month_year(data.get("month_year")) or normalize_month_year(date.today().strftime("%b%Y"))
+
+
 @tracker_bp.route("/view", methods=["POST"])
+@read_only_route
+@auth_context()
+# month_summary in the response also depends on the monthly targets and the work calendar
+@conditional_get(
+    "task_work_tracker", "tfs_user", "project", "task", "tracker_file_meta",
+    "user_monthly_tracker", "work_calendar",
+    vary=requested_month_year,
+)
 def view_trackers():
     data = request.get_json() or {}
 
@@ -441,38 +770,39 @@ def view_trackers():
         if not logged_in_user_id:
             return api_response(400, "logged_in_user_id is required")
 
-        # month_year default current month
-        month_year = normalize_month_year(data.get("month_year"))
-        if not month_year:
-            cursor.execute("SELECT DATE_FORMAT(CURDATE(), '%b%Y') AS m")
-            month_year = normalize_month_year((cursor.fetchone() or {}).get("m") or "")
+        # month_year default current month (same value the ETag varies on)
+        month_year = requested_month_year()
 
         ctx = get_role_context(cursor, int(logged_in_user_id))
         role_name = ctx["user_role_name"]
 
-        query = """
+        query = f"""
             SELECT 
                 twt.*,
                 u.user_name,
                 p.project_name,
                 tk.task_name,
                 t.team_name,
-                (twt.production / NULLIF(twt.tenure_target, 0)) AS billable_hours
+                {billable_metrics.billable_sql()} AS billable_hours,
+                fm.status AS file_status,
+                fm.row_count AS file_row_count,
+                fm.sheet_count AS file_sheet_count,
+                fm.sha256 AS file_sha256
             FROM task_work_tracker twt
             LEFT JOIN tfs_user u ON u.user_id = twt.user_id
             LEFT JOIN project p ON p.project_id = twt.project_id
             LEFT JOIN task tk ON tk.task_id = twt.task_id
             LEFT JOIN team t ON u.team_id = t.team_id
+            LEFT JOIN tracker_file_meta fm
+              ON fm.tracker_id = twt.tracker_id AND fm.tracker_file = twt.tracker_file
             WHERE twt.is_active != 0
         """
 
-        # month filter
-        try:
-            dt = datetime.strptime(month_year, "%b%Y")
-            query += " AND YEAR(CAST(twt.date_time AS DATETIME)) = %s AND MONTH(CAST(twt.date_time AS DATETIME)) = %s"
-            params.extend([dt.year, dt.month])
-        except Exception:
-            pass
+        # month filter: string range on TEXT date_time (no per-row CAST)
+        bounds = month_bounds(month_year)
+        if bounds:
+            query += " AND twt.date_time >= %s AND twt.date_time < %s"
+            params.extend(bounds)
 
         if data.get("team_id"):
             query += " AND u.team_id=%s"
@@ -533,124 +863,29 @@ def view_trackers():
 
         query += " ORDER BY CAST(twt.date_time AS DATETIME) DESC"
 
-        cursor.execute(query, tuple(params))
-        trackers = cursor.fetchall()
-
+        trackers = []
         tracker_files_url = f"{BASE_UPLOAD_URL}/{UPLOAD_SUBDIRS['TRACKER_FILES']}/"
-        for t in trackers:
+        for t in stream(conn, query, params, row="dict"):
+            trackers.append(t)
             tracker_file_temp = t.get("tracker_file")
             t["tracker_file"] = (tracker_files_url + tracker_file_temp) if tracker_file_temp else None
 
-        # Month-wise summary (your logic, but month_year is normalized now)
+            # background inspection result (None until processed / no file)
+            file_status = t.pop("file_status", None)
+            file_meta = {
+                "status": file_status,
+                "row_count": t.pop("file_row_count", None),
+                "sheet_count": t.pop("file_sheet_count", None),
+                "sha256": t.pop("file_sha256", None),
+            }
+            t["tracker_file_meta"] = file_meta if file_status else None
+
+        # Month-wise summary (shared with /month_summary, cached per user)
         user_ids = sorted({t.get("user_id") for t in trackers if t.get("user_id") is not None})
         month_summary = []
 
         if user_ids:
-            in_ph = ",".join(["%s"] * len(user_ids))
-
-            summary_query = f"""
-                SELECT
-                    u.user_id,
-                    u.user_name,
-                    m.mon AS month_year,
-                    umt.user_monthly_tracker_id,
-                    COALESCE(CAST(umt.monthly_target AS DECIMAL(10,2)), 0) AS monthly_target,
-                    COALESCE(umt.extra_assigned_hours, 0) AS extra_assigned_hours,
-                    (
-                      COALESCE(CAST(umt.monthly_target AS DECIMAL(10,2)), 0)
-                      + COALESCE(umt.extra_assigned_hours, 0)
-                    ) AS monthly_total_target,
-                    COALESCE((
-                      SELECT SUM(twt3.production / NULLIF(twt3.tenure_target, 0))
-                      FROM task_work_tracker twt3
-                      WHERE twt3.user_id = u.user_id
-                        AND twt3.is_active = 1
-                        AND (YEAR(CAST(twt3.date_time AS DATETIME))*100 + MONTH(CAST(twt3.date_time AS DATETIME))) = m.yyyymm
-                    ), 0) AS total_billable_hours_month,
-                    CASE
-                      WHEN umt.user_monthly_tracker_id IS NULL THEN NULL
-                      ELSE GREATEST(
-                             COALESCE(CAST(umt.working_days AS SIGNED), 0)
-                             - COALESCE((
-                                 SELECT COUNT(DISTINCT DATE(CAST(twt2.date_time AS DATETIME)))
-                                 FROM task_work_tracker twt2
-                                 WHERE twt2.user_id = u.user_id
-                                   AND twt2.is_active = 1
-                                   AND (YEAR(CAST(twt2.date_time AS DATETIME))*100 + MONTH(CAST(twt2.date_time AS DATETIME))) = m.yyyymm
-                                   AND DATE(CAST(twt2.date_time AS DATETIME)) <= m.cutoff
-                               ), 0),
-                             0
-                           )
-                    END AS pending_days,
-                    CASE
-                      WHEN umt.user_monthly_tracker_id IS NULL THEN NULL
-                      WHEN GREATEST(
-                             COALESCE(CAST(umt.working_days AS SIGNED), 0)
-                             - COALESCE((
-                                 SELECT COUNT(DISTINCT DATE(CAST(twt2.date_time AS DATETIME)))
-                                 FROM task_work_tracker twt2
-                                 WHERE twt2.user_id = u.user_id
-                                   AND twt2.is_active = 1
-                                   AND (YEAR(CAST(twt2.date_time AS DATETIME))*100 + MONTH(CAST(twt2.date_time AS DATETIME))) = m.yyyymm
-                                   AND DATE(CAST(twt2.date_time AS DATETIME)) <= m.cutoff
-                               ), 0),
-                             0
-                           ) = 0 THEN NULL
-                      ELSE
-                        (
-                          (
-                            COALESCE(CAST(umt.monthly_target AS DECIMAL(10,2)), 0)
-                            + COALESCE(umt.extra_assigned_hours, 0)
-                          )
-                          - COALESCE((
-                              SELECT SUM(twt3.production / NULLIF(twt3.tenure_target, 0))
-                              FROM task_work_tracker twt3
-                              WHERE twt3.user_id = u.user_id
-                                AND twt3.is_active = 1
-                                AND (YEAR(CAST(twt3.date_time AS DATETIME))*100 + MONTH(CAST(twt3.date_time AS DATETIME))) = m.yyyymm
-                            ), 0)
-                        )
-                        / NULLIF(
-                            GREATEST(
-                              COALESCE(CAST(umt.working_days AS SIGNED), 0)
-                              - COALESCE((
-                                  SELECT COUNT(DISTINCT DATE(CAST(twt2.date_time AS DATETIME)))
-                                  FROM task_work_tracker twt2
-                                  WHERE twt2.user_id = u.user_id
-                                    AND twt2.is_active = 1
-                                    AND (YEAR(CAST(twt2.date_time AS DATETIME))*100 + MONTH(CAST(twt2.date_time AS DATETIME))) = m.yyyymm
-                                    AND DATE(CAST(twt2.date_time AS DATETIME)) <= m.cutoff
-                                ), 0),
-                              0
-                            ),
-                            0
-                          )
-                    END AS daily_required_hours
-                FROM tfs_user u
-                CROSS JOIN (
-                    SELECT
-                      %s AS mon,
-                      CAST(DATE_FORMAT(STR_TO_DATE(CONCAT('01-', %s), '%d-%b%Y'), '%Y%m') AS UNSIGNED) AS yyyymm,
-                      CASE
-                        WHEN (YEAR(CURDATE())*100 + MONTH(CURDATE())) =
-                             CAST(DATE_FORMAT(STR_TO_DATE(CONCAT('01-', %s), '%d-%b%Y'), '%Y%m') AS UNSIGNED)
-                        THEN CURDATE()
-                        WHEN (YEAR(CURDATE())*100 + MONTH(CURDATE())) >
-                             CAST(DATE_FORMAT(STR_TO_DATE(CONCAT('01-', %s), '%d-%b%Y'), '%Y%m') AS UNSIGNED)
-                        THEN LAST_DAY(STR_TO_DATE(CONCAT('01-', %s), '%d-%b%Y'))
-                        ELSE DATE_SUB(STR_TO_DATE(CONCAT('01-', %s), '%d-%b%Y'), INTERVAL 1 DAY)
-                      END AS cutoff
-                ) m
-                LEFT JOIN user_monthly_tracker umt
-                  ON umt.user_id = u.user_id
-                 AND umt.is_active = 1
-                 AND umt.month_year = m.mon
-                WHERE u.user_id IN ({in_ph})
-            """
-
-            summary_params = [month_year] * 6 + user_ids
-            cursor.execute(summary_query, tuple(summary_params))
-            month_summary = cursor.fetchall()
+            month_summary = compute_month_summary(cursor, user_ids, month_year)
 
             device_id = data.get("device_id")
             device_type = data.get("device_type")
@@ -676,7 +911,269 @@ def view_trackers():
         conn.close()
 
 
+# ------------------------
+# MONTH SUMMARY (totals only, no tracker rows)
+# ------------------------
+@tracker_bp.route("/month_summary", methods=["POST"])
+@read_only_route
+@auth_context()
+def view_month_summary():
+    data = request.get_json() or {}
+
+    logged_in_user_id = data.get("logged_in_user_id")
+    if not logged_in_user_id:
+        return api_response(400, "logged_in_user_id is required")
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        month_year = normalize_month_year(data.get("month_year"))
+        if not month_year:
+            month_year = normalize_month_year(datetime.now().strftime("%b%Y"))
+        if not month_bounds(month_year):
+            return api_response(400, "month_year must be MONYYYY (e.g. JAN2026)")
+
+        ctx = get_role_context(cursor, int(logged_in_user_id))
+        visible_ids = get_visible_user_ids(cursor, logged_in_user_id, ctx["user_role_name"], data.get("team_id"))
+
+        requested = data.get("user_ids") or ([data["user_id"]] if data.get("user_id") else [])
+        if not isinstance(requested, list):
+            return api_response(400, "user_ids must be a list")
+
+        if requested:
+            user_ids = [int(u) for u in requested]
+            if visible_ids is not None:
+                allowed = set(visible_ids)
+                user_ids = [u for u in user_ids if u in allowed]
+        elif visible_ids is not None:
+            user_ids = visible_ids
+        else:
+            cursor.execute("SELECT user_id FROM tfs_user WHERE is_active=1 AND is_delete=1")
+            user_ids = [int(r["user_id"]) for r in cursor.fetchall()]
+
+        rows = compute_month_summary(cursor, user_ids, month_year)
+
+        return api_response(
+            200,
+            "Month summary fetched successfully",
+            {
+                "count": len(rows),
+                "month_year": month_year,
+                "month_summary": rows,
+            },
+        )
+
+    except Exception as e:
+        return api_response(500, f"Failed to fetch month summary: {str(e)}")
+
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# ---------- daily engine helpers
+
+# "auto" -> window functions when the server supports them, else "python" (NumPy, utils.billable_metrics)
+DAILY_ENGINE = os.getenv("DAILY_ENGINE", "auto").strip().lower()
+_window_function_support = None
+
+
+def supports_window_functions(conn) -> bool:
+    """MySQL >= 8.0 / MariaDB >= 10.2 (checked once per process)"""
+    global _window_function_support
+    if _window_function_support is None:
+        try:
+            version = tuple(conn.get_server_version() or (0, 0, 0))
+            info = str(conn.get_server_info() or "")
+            if "mariadb" in info.lower():
+                _window_function_support = version >= (10, 2, 0)
+            else:
+                _window_function_support = version >= (8, 0, 0)
+        except Exception:
+            _window_function_support = False
+    return _window_function_support
+
+
+def _daily_required(total_target, cumulative, pending_days):
+    if pending_days <= 0:
+        return None
+    return (total_target - cumulative) / pending_days
+
+
+def _daily_rows_sql(cursor, scan_where: str, scan_params: list, month_year: str) -> list[dict]:
+    """Daily aggregate + running totals + required hours in one statement (window functions)"""
+    cursor.execute(
+        f"""
+        WITH daily AS (
+            SELECT
+                twt.user_id,
+                DATE(twt.date_time) AS work_date,
+                SUM(COALESCE(twt.production, 0)) AS total_production_day,
+                SUM({billable_metrics.billable_sql()}) AS total_billable_hours_day,
+                COUNT(*) AS trackers_count_day
+            FROM task_work_tracker twt
+            {scan_where}
+            GROUP BY twt.user_id, DATE(twt.date_time)
+        ),
+        daily_with_cum AS (
+            SELECT
+                d.*,
+                SUM(d.total_billable_hours_day)
+                    OVER (PARTITION BY d.user_id ORDER BY d.work_date)
+                    AS cumulative_billable_hours_till_day
+            FROM daily d
+        )
+        SELECT
+            dwc.user_id,
+            u.user_name,
+            u.team_id,
+            dwc.work_date,
+
+            dwc.total_production_day,
+            ROUND(dwc.total_billable_hours_day, 4) AS total_billable_hours_day,
+            dwc.trackers_count_day,
+
+            ROUND(dwc.cumulative_billable_hours_till_day, 4)
+                AS cumulative_billable_hours_till_day,
+
+            umt.user_monthly_tracker_id,
+            COALESCE(umt.monthly_target, 0) AS monthly_target,
+            COALESCE(umt.extra_assigned_hours, 0) AS extra_assigned_hours,
+            (
+              COALESCE(umt.monthly_target, 0)
+              + COALESCE(umt.extra_assigned_hours, 0)
+            ) AS monthly_total_target,
+
+            umt.working_days AS working_days
+        FROM daily_with_cum dwc
+        JOIN tfs_user u ON u.user_id = dwc.user_id
+        LEFT JOIN user_monthly_tracker umt
+          ON umt.user_id = dwc.user_id
+         AND umt.is_active = 1
+         AND umt.yyyymm = %s
+        ORDER BY dwc.work_date DESC, u.user_name ASC
+        """,
+        tuple(list(scan_params) + [month_yyyymm(month_year)]),
+    )
+    return cursor.fetchall()
+
+
+def _daily_rows_python(conn, cursor, scan_where: str, scan_params: list, month_year: str) -> list[dict]:
+    """
+    Same output as _daily_rows_sql for servers without window functions:
+    DB streams the month's tracker rows as tuples, daily sums and running totals are
+    done in utils.billable_metrics.
+    """
+    cols = billable_metrics.tracker_columns(stream(
+        conn,
+        f"""
+        SELECT twt.user_id, LEFT(twt.date_time, 10) AS work_date, twt.production, twt.tenure_target
+        FROM task_work_tracker twt
+        {scan_where}
+        """,
+        scan_params,
+    ))
+    if not len(cols["user_id"]):
+        return []
+
+    daily = billable_metrics.daily_metrics(cols)
+    user_col = daily["user_id"].tolist()
+
+    user_ids = sorted(set(user_col))
+    in_ph = ",".join(["%s"] * len(user_ids))
+    cursor.execute(
+        f"""
+        SELECT
+            u.user_id,
+            u.user_name,
+            u.team_id,
+            umt.user_monthly_tracker_id,
+            COALESCE(umt.monthly_target, 0) AS monthly_target,
+            COALESCE(umt.extra_assigned_hours, 0) AS extra_assigned_hours,
+            umt.working_days AS working_days
+        FROM tfs_user u
+        LEFT JOIN user_monthly_tracker umt
+          ON umt.user_id = u.user_id
+         AND umt.is_active = 1
+         AND umt.yyyymm = %s
+        WHERE u.user_id IN ({in_ph})
+        """,
+        tuple([month_yyyymm(month_year)] + user_ids),
+    )
+    meta = {int(r["user_id"]): r for r in cursor.fetchall()}
+
+    work_dates = daily["day"].astype(object)
+    production = daily["production"].tolist()
+    billable = daily["billable"].tolist()
+    counts = daily["rows"].tolist()
+    cumulative = daily["cumulative_billable"].tolist()
+
+    rows = []
+    for i, uid in enumerate(user_col):
+        m = meta.get(uid)
+        if not m:
+            continue
+        total_target = Decimal(m["monthly_target"] or 0) + Decimal(m["extra_assigned_hours"] or 0)
+        rows.append({
+            "user_id": uid,
+            "user_name": m["user_name"],
+            "team_id": m["team_id"],
+            "work_date": work_dates[i],
+            "total_production_day": production[i],
+            "total_billable_hours_day": billable_metrics.to_decimal(billable[i]),
+            "trackers_count_day": counts[i],
+            "cumulative_billable_hours_till_day": billable_metrics.to_decimal(cumulative[i]),
+            "user_monthly_tracker_id": m["user_monthly_tracker_id"],
+            "monthly_target": m["monthly_target"],
+            "extra_assigned_hours": m["extra_assigned_hours"],
+            "monthly_total_target": total_target,
+            "working_days": m["working_days"],
+        })
+
+    rows.sort(key=lambda r: (r["user_name"] or "").lower())
+    rows.sort(key=lambda r: r["work_date"], reverse=True)
+    return rows
+
+
+def _apply_daily_calendar(cursor, rows: list[dict], month_year: str) -> list[dict]:
+    """pending_days_after_this_day / daily_required_hours from the work calendar (both engines)"""
+    yyyymm = month_yyyymm(month_year)
+    if not rows or not yyyymm:
+        return rows
+
+    month_start, month_end = month_range(yyyymm)
+    days, leaves = month_calendars(cursor, {int(r["user_id"]): r.get("team_id") for r in rows}, yyyymm)
+
+    for r in rows:
+        uid = int(r["user_id"])
+        r.pop("team_id", None)
+        user_days, user_leaves = days[uid], leaves.get(uid)
+        work_date = r["work_date"]
+        if isinstance(work_date, datetime):
+            work_date = work_date.date()
+        elif not isinstance(work_date, date):
+            work_date = datetime.strptime(str(work_date)[:10], "%Y-%m-%d").date()
+
+        pending = working_days_after(user_days, work_date, month_end, user_leaves)
+        if r.get("working_days") is None:
+            r["working_days"] = count_working_days(user_days, month_start, month_end, user_leaves)
+        r["pending_days_after_this_day"] = pending
+        r["daily_required_hours"] = (
+            _daily_required(
+                Decimal(r["monthly_total_target"] or 0),
+                Decimal(r["cumulative_billable_hours_till_day"] or 0),
+                pending,
+            )
+            if r.get("user_monthly_tracker_id") is not None
+            else None
+        )
+    return rows
+
+
 @tracker_bp.route("/view_daily", methods=["POST"])
+@read_only_route
+@auth_context()
 def view_daily_trackers():
     data = request.get_json() or {}
 
@@ -684,8 +1181,6 @@ def view_daily_trackers():
     cursor = conn.cursor(dictionary=True)
 
     try:
-        params = []
-
         logged_in_user_id = data.get("logged_in_user_id")
         if not logged_in_user_id:
             return api_response(400, "logged_in_user_id is required")
@@ -693,37 +1188,53 @@ def view_daily_trackers():
         # -------- Month (case-insensitive, same behavior as view)
         month_year = normalize_month_year(data.get("month_year"))
         if not month_year:
-            cursor.execute("SELECT DATE_FORMAT(CURDATE(), '%b%Y') AS m")
-            month_year = normalize_month_year((cursor.fetchone() or {}).get("m") or "")
+            month_year = normalize_month_year(datetime.now().strftime("%b%Y"))
 
         # -------- Role check (DO NOT depend on is_delete)
-        cursor.execute(
-            """
-            SELECT LOWER(TRIM(r.role_name)) AS role_name
-            FROM tfs_user u
-            JOIN user_role r ON r.role_id = u.role_id
-            WHERE u.user_id=%s
-            LIMIT 1
-            """,
-            (int(logged_in_user_id),),
-        )
-        role_name = ((cursor.fetchone() or {}).get("role_name") or "").lower()
+        auth = get_auth_context(logged_in_user_id)
+        if auth:
+            role_name = auth["role"]
+        else:
+            cursor.execute(
+                """
+                SELECT LOWER(TRIM(r.role_name)) AS role_name
+                FROM tfs_user u
+                JOIN user_role r ON r.role_id = u.role_id
+                WHERE u.user_id=%s
+                LIMIT 1
+                """,
+                (int(logged_in_user_id),),
+            )
+            role_name = ((cursor.fetchone() or {}).get("role_name") or "").lower()
+
+        # -------- Visible users resolved up front (no per-row subquery)
+        if data.get("user_id"):
+            user_ids = [int(data["user_id"])]
+            if data.get("team_id"):
+                team_ids = set(get_visible_user_ids(cursor, logged_in_user_id, "admin", data["team_id"]) or [])
+                user_ids = [u for u in user_ids if u in team_ids]
+        else:
+            scope_role = "admin" if "admin" in role_name else role_name
+            user_ids = get_visible_user_ids(cursor, logged_in_user_id, scope_role, data.get("team_id"))
 
+        empty = {"count": 0, "month_year": month_year, "trackers": [], "month_summary": []}
+        if user_ids is not None and not user_ids:
+            return api_response(200, "Trackers fetched successfully", empty)
+
+        # -------- Scan bounded to the month (string range on TEXT date_time)
         where = "WHERE twt.is_active != 0"
+        params = []
 
-        # -------- Month filter
-        try:
-            dt = datetime.strptime(month_year, "%b%Y")
-            where += " AND YEAR(CAST(twt.date_time AS DATETIME))=%s AND MONTH(CAST(twt.date_time AS DATETIME))=%s"
-            params.extend([dt.year, dt.month])
-        except Exception:
-            pass
+        bounds = month_bounds(month_year)
+        if bounds:
+            where += " AND twt.date_time >= %s AND twt.date_time < %s"
+            params.extend(bounds)
 
-        # -------- Same filters as /view
-        if data.get("team_id"):
-            where += " AND u.team_id=%s"
-            params.append(data["team_id"])
+        if user_ids is not None:
+            where += f" AND twt.user_id IN ({','.join(['%s'] * len(user_ids))})"
+            params.extend(user_ids)
 
+        # -------- Same filters as /view
         if data.get("project_id"):
             where += " AND twt.project_id=%s"
             params.append(data["project_id"])
@@ -736,134 +1247,30 @@ def view_daily_trackers():
             date_from = data["date_from"]
             if len(date_from) == 10:
                 date_from += " 00:00:00"
-            where += " AND CAST(twt.date_time AS DATETIME) >= %s"
+            where += " AND twt.date_time >= %s"
             params.append(date_from)
 
         if data.get("date_to"):
             date_to = data["date_to"]
             if len(date_to) == 10:
                 date_to += " 23:59:59"
-            where += " AND CAST(twt.date_time AS DATETIME) <= %s"
+            where += " AND twt.date_time <= %s"
             params.append(date_to)
 
         if data.get("is_active") is not None:
             where += " AND twt.is_active=%s"
             params.append(data["is_active"])
 
-        # -------- User filter OR restriction (same logic as view)
-        if data.get("user_id"):
-            where += " AND twt.user_id=%s"
-            params.append(data["user_id"])
-        else:
-            if "admin" not in role_name:
-                manager_id = str(logged_in_user_id)
-                where += f"""
-                    AND twt.user_id IN (
-                        SELECT tu.user_id
-                        FROM tfs_user tu
-                        WHERE tu.is_active = 1
-                          AND tu.is_delete = 1
-                          AND (
-                                tu.project_manager_id = %s
-                                OR tu.asst_manager_id = %s
-                                OR tu.qa_id = %s
-                                OR tu.user_id = %s
-                                OR FIND_IN_SET(%s, {cleaned_csv_col("tu.project_manager_id")}) > 0
-                                OR FIND_IN_SET(%s, {cleaned_csv_col("tu.asst_manager_id")}) > 0
-                                OR FIND_IN_SET(%s, {cleaned_csv_col("tu.qa_id")}) > 0
-                          )
-                    )
-                """
-                params.extend([manager_id] * 7)
-
         # -------- Daily aggregation + cumulative + daily required
-        query = f"""
-            WITH daily AS (
-                SELECT
-                    twt.user_id,
-                    DATE(CAST(twt.date_time AS DATETIME)) AS work_date,
-                    SUM(COALESCE(twt.production, 0)) AS total_production_day,
-                    SUM(COALESCE(twt.production, 0) / NULLIF(twt.tenure_target, 0)) AS total_billable_hours_day,
-                    COUNT(*) AS trackers_count_day
-                FROM task_work_tracker twt
-                LEFT JOIN tfs_user u ON u.user_id = twt.user_id
-                {where}
-                GROUP BY twt.user_id, DATE(CAST(twt.date_time AS DATETIME))
-            ),
-            daily_with_cum AS (
-                SELECT
-                    d.*,
-                    SUM(d.total_billable_hours_day)
-                        OVER (PARTITION BY d.user_id ORDER BY d.work_date)
-                        AS cumulative_billable_hours_till_day,
-                    COUNT(*) OVER (PARTITION BY d.user_id ORDER BY d.work_date)
-                        AS worked_days_till_day
-                FROM daily d
-            )
-            SELECT
-                dwc.user_id,
-                u.user_name,
-                dwc.work_date,
-
-                dwc.total_production_day,
-                ROUND(dwc.total_billable_hours_day, 4) AS total_billable_hours_day,
-                dwc.trackers_count_day,
-
-                ROUND(dwc.cumulative_billable_hours_till_day, 4)
-                    AS cumulative_billable_hours_till_day,
+        engine = (data.get("engine") or DAILY_ENGINE).strip().lower()
+        if engine == "auto":
+            engine = "sql" if supports_window_functions(conn) else "python"
 
-                umt.user_monthly_tracker_id,
-                COALESCE(CAST(umt.monthly_target AS DECIMAL(10,2)), 0) AS monthly_target,
-                COALESCE(umt.extra_assigned_hours, 0) AS extra_assigned_hours,
-                (
-                  COALESCE(CAST(umt.monthly_target AS DECIMAL(10,2)), 0)
-                  + COALESCE(umt.extra_assigned_hours, 0)
-                ) AS monthly_total_target,
-
-                CAST(umt.working_days AS SIGNED) AS working_days,
-
-                GREATEST(
-                    COALESCE(CAST(umt.working_days AS SIGNED), 0)
-                    - COALESCE(dwc.worked_days_till_day, 0),
-                    0
-                ) AS pending_days_after_this_day,
-
-                CASE
-                  WHEN umt.user_monthly_tracker_id IS NULL THEN NULL
-                  WHEN GREATEST(
-                        COALESCE(CAST(umt.working_days AS SIGNED), 0)
-                        - COALESCE(dwc.worked_days_till_day, 0),
-                        0
-                      ) = 0 THEN NULL
-                  ELSE
-                    (
-                      (
-                        COALESCE(CAST(umt.monthly_target AS DECIMAL(10,2)), 0)
-                        + COALESCE(umt.extra_assigned_hours, 0)
-                      )
-                      - COALESCE(dwc.cumulative_billable_hours_till_day, 0)
-                    )
-                    / NULLIF(
-                        GREATEST(
-                            COALESCE(CAST(umt.working_days AS SIGNED), 0)
-                            - COALESCE(dwc.worked_days_till_day, 0),
-                            0
-                        ),
-                        0
-                      )
-                END AS daily_required_hours
-            FROM daily_with_cum dwc
-            JOIN tfs_user u ON u.user_id = dwc.user_id
-            LEFT JOIN user_monthly_tracker umt
-              ON umt.user_id = dwc.user_id
-             AND umt.is_active = 1
-             AND umt.month_year = %s
-            ORDER BY dwc.work_date DESC, u.user_name ASC
-        """
-
-        final_params = list(params) + [month_year]
-        cursor.execute(query, tuple(final_params))
-        rows = cursor.fetchall()
+        if engine in ("python", "numpy"):
+            rows = _daily_rows_python(conn, cursor, where, params, month_year)
+        else:
+            rows = _daily_rows_sql(cursor, where, params, month_year)
+        rows = _apply_daily_calendar(cursor, rows, month_year)
 
         # -------- Response KEYS SAME AS /view
         return api_response(
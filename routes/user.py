@@ -10,7 +10,13 @@ from utils.validators import validate_request
 
 from utils.json_utils import to_db_json
 
-from utils.security import decrypt_password, encrypt_password, safe_decrypt_password
+from utils.auth_token import auth_context, get_auth_context
+
+from utils.security import encrypt_password, safe_decrypt_password, safe_decrypt_passwords
+
+from utils.tenure_recalc import tenure_changed, create_job, schedule_job, resumable_job_ids, job_progress
+
+from utils.http_cache import conditional_get
 
 from datetime import datetime
 
@@ -264,14 +270,84 @@ def safe_remove_profile_pic(filename: str) -> bool:
 
 
 
+def _role_scope_filter(role: str, user_id):
+
+    """
+
+    Role-based visibility on tfs_user (alias u).
+
+    Returns (sql_fragment, params); admin roles get no filter.
+
+    """
+
+    if role == "qa":
+
+        return " AND JSON_CONTAINS(COALESCE(u.qa_id, '[]'), %s)", [str(user_id)]
+
+    if role == "assistant manager":
+
+        return " AND JSON_CONTAINS(COALESCE(u.asst_manager_id, '[]'), %s)", [str(user_id)]
+
+    if role == "manager":
+
+        return " AND JSON_CONTAINS(COALESCE(u.project_manager_id, '[]'), %s)", [str(user_id)]
+
+    return "", []
+
+
+
+
+
+def _get_requester_role(cursor, user_id):
+
+    auth = get_auth_context(user_id)
+
+    if auth:
+
+        return auth["role"]
+
+
+
+    cursor.execute("""
+
+        SELECT r.role_name
+
+        FROM tfs_user u
+
+        JOIN user_role r ON r.role_id = u.role_id
+
+        WHERE u.user_id = %s AND u.is_active = 1 AND u.is_delete = 1
+
+    """, (user_id,))
+
+    role_row = cursor.fetchone()
+
+    if not role_row:
+
+        return None
+
+    return (role_row["role_name"] or "").lower()
+
+
+
+
+
 # ------------------------
 
 # LIST USERS
 
+# passwords are NOT returned unless include_passwords=true (bulk reveal)
+
+# use /reveal_password for a single user
+
 # ------------------------
 
 @user_bp.route("/list", methods=["POST"])
 
+@auth_context()
+
+@conditional_get("tfs_user")
+
 def list_users():
 
     data, err = validate_request(required=["user_id"])
@@ -284,6 +360,8 @@ def list_users():
 
     user_id = data.get("user_id")
 
+    include_passwords = str(data.get("include_passwords") or "").lower() in ("1", "true", "yes")
+
 
 
     conn = get_db_connection()
@@ -294,39 +372,27 @@ def list_users():
 
     try:
 
-        cursor.execute("""
-
-            SELECT r.role_name
-
-            FROM tfs_user u
-
-            JOIN user_role r ON r.role_id = u.role_id
+        role = _get_requester_role(cursor, user_id)
 
-            WHERE u.user_id = %s AND u.is_active = 1 AND u.is_delete = 1
 
-        """, (user_id,))
 
-        role_row = cursor.fetchone()
-
-
-
-        if not role_row:
+        if role is None:
 
             return api_response(404, "User not found")
 
 
 
-        role = (role_row["role_name"] or "").lower()
+        if role == "agent":
 
+            return api_response(200, "No users available", [])
 
 
-        if role == "agent":
 
-            return api_response(200, "No users available", [])
+        password_col = "u.user_password," if include_passwords else ""
 
 
 
-        query = """
+        query = f"""
 
             SELECT
 
@@ -340,7 +406,7 @@ def list_users():
 
                 u.user_address,
 
-                u.user_password,
+                {password_col}
 
                 u.user_tenure,
 
@@ -376,29 +442,11 @@ def list_users():
 
 
 
-        params = []
-
-
-
         # Role-based filtering
 
-        if role == "qa":
-
-            query += " AND JSON_CONTAINS(COALESCE(u.qa_id, '[]'), %s)"
-
-            params.append(str(user_id))
-
-        elif role == "assistant manager":
-
-            query += " AND JSON_CONTAINS(COALESCE(u.asst_manager_id, '[]'), %s)"
-
-            params.append(str(user_id))
-
-        elif role == "manager":
-
-            query += " AND JSON_CONTAINS(COALESCE(u.project_manager_id, '[]'), %s)"
+        scope_sql, params = _role_scope_filter(role, user_id)
 
-            params.append(str(user_id))
+        query += scope_sql
 
 
 
@@ -478,35 +526,141 @@ def list_users():
 
         
 
-        # Decrypt passwords for frontend display
+        # Bulk reveal (explicit only): decrypt on the crypto pool
 
-        # Handle both encrypted and plain text passwords
+        # Handles both encrypted and plain text passwords
 
-        for user in users:
+        if include_passwords:
 
-            if user.get("user_password"):
+            plain = safe_decrypt_passwords([u.get("user_password") for u in users])
 
-                try:
+            for u, pwd in zip(users, plain):
 
-                    # Try to decrypt (for new encrypted passwords)
+                u["user_password"] = pwd
 
-                    user["user_password"] = decrypt_password(user["user_password"])
 
-                except Exception:
 
-                    # If decryption fails, keep as plain text (existing users)
+        return api_response(200, "Users fetched successfully", users)
 
-                    pass
 
 
+    except Exception as e:
 
-        return api_response(200, "Users fetched successfully", users)
+        return api_response(500, f"Failed to fetch users: {str(e)}")
+
+
+
+    finally:
+
+        try:
+
+            cursor.close()
+
+        except Exception:
+
+            pass
+
+        try:
+
+            conn.close()
+
+        except Exception:
+
+            pass
+
+
+
+
+
+# ------------------------
+
+# REVEAL PASSWORD (single user, on demand)
+
+# ------------------------
+
+@user_bp.route("/reveal_password", methods=["POST"])
+
+@auth_context()
+
+def reveal_password():
+
+    data, err = validate_request(required=["user_id", "target_user_id"])
+
+    if err:
+
+        return err
+
+
+
+    user_id = data.get("user_id")
+
+    target_user_id = data.get("target_user_id")
+
+
+
+    conn = get_db_connection()
+
+    cursor = conn.cursor(dictionary=True)
+
+
+
+    try:
+
+        role = _get_requester_role(cursor, user_id)
+
+
+
+        if role is None:
+
+            return api_response(404, "User not found")
+
+
+
+        if role == "agent":
+
+            return api_response(403, "You are not allowed to view passwords")
+
+
+
+        # same visibility rules as /list
+
+        scope_sql, scope_params = _role_scope_filter(role, user_id)
+
+        cursor.execute(f"""
+
+            SELECT u.user_id, u.user_password
+
+            FROM tfs_user u
+
+            WHERE u.user_id = %s AND u.is_delete = 1
+
+            {scope_sql}
+
+        """, [target_user_id] + scope_params)
+
+        row = cursor.fetchone()
+
+
+
+        if not row:
+
+            return api_response(404, "User not found")
+
+
+
+        return api_response(200, "Password fetched successfully", {
+
+            "user_id": row["user_id"],
+
+            "user_password": safe_decrypt_password(row.get("user_password"))
+
+        })
 
 
 
     except Exception as e:
 
-        return api_response(500, f"Failed to fetch users: {str(e)}")
+        return api_response(500, f"Failed to fetch password: {str(e)}")
 
 
 
@@ -560,7 +714,7 @@ def update_user():
 
     try:
 
-        cursor.execute("SELECT user_id, user_name, profile_picture FROM tfs_user WHERE user_id=%s", (user_id,))
+        cursor.execute("SELECT user_id, user_name, profile_picture, user_tenure FROM tfs_user WHERE user_id=%s", (user_id,))
 
         existing = cursor.fetchone()
 
@@ -686,6 +840,14 @@ def update_user():
 
 
 
+        # bcrypt hash is stale after a password change; re-hashed on next login
+
+        if user_password:
+
+            user_update_cols.append("user_password_hash = NULL")
+
+
+
         if not user_update_cols:
 
             return api_response(400, "No valid fields provided for update")
@@ -714,8 +876,28 @@ def update_user():
 
 
 
+        # tenure changed -> stored tenure_target / billable_hours are recalculated in the background;
+
+        # the job row commits together with the new tenure
+
+        recalc_job_id = None
+
+        if form.get("user_tenure") not in (None, "") and tenure_changed(existing.get("user_tenure"), form.get("user_tenure")):
+
+            recalc_job_id = create_job(cursor, int(user_id), form.get("user_tenure"))
+
+
+
         conn.commit()
 
+
+
+        if recalc_job_id:
+
+            schedule_job(recalc_job_id)
+
+            return api_response(200, "User updated successfully", {"tenure_recalc_job_id": recalc_job_id})
+
         return api_response(200, "User updated successfully")
 
 
@@ -750,6 +932,136 @@ def update_user():
 
 
 
+# ------------------------
+
+# TENURE RECALC JOBS (progress / resume)
+
+# ------------------------
+
+@user_bp.route("/tenure_recalc/status", methods=["POST"])
+
+def tenure_recalc_status():
+
+    data = request.get_json(silent=True) or {}
+
+
+
+    where = "WHERE 1=1"
+
+    params = []
+
+    if data.get("job_id"):
+
+        where += " AND job_id=%s"
+
+        params.append(int(data["job_id"]))
+
+    if data.get("user_id"):
+
+        where += " AND user_id=%s"
+
+        params.append(int(data["user_id"]))
+
+    if data.get("status"):
+
+        where += " AND status=%s"
+
+        params.append(str(data["status"]).strip().lower())
+
+
+
+    conn = get_db_connection()
+
+    cursor = conn.cursor(dictionary=True)
+
+
+
+    try:
+
+        cursor.execute(
+
+            f"""
+
+            SELECT job_id, user_id, user_tenure, status, total_rows, processed_rows,
+
+                   last_tracker_id, error, created_date, updated_date
+
+            FROM tenure_recalc_job
+
+            {where}
+
+            ORDER BY job_id DESC
+
+            LIMIT 100
+
+            """,
+
+            tuple(params),
+
+        )
+
+        jobs = [job_progress(r) for r in cursor.fetchall()]
+
+        return api_response(200, "Tenure recalculation jobs fetched successfully", jobs)
+
+
+
+    except Exception as e:
+
+        return api_response(500, f"Failed to fetch jobs: {str(e)}")
+
+
+
+    finally:
+
+        cursor.close()
+
+        conn.close()
+
+
+
+
+
+@user_bp.route("/tenure_recalc/resume", methods=["POST"])
+
+def tenure_recalc_resume():
+
+    """Re-schedules pending jobs and running jobs whose worker stopped making progress"""
+
+    conn = get_db_connection()
+
+    cursor = conn.cursor(dictionary=True)
+
+
+
+    try:
+
+        job_ids = resumable_job_ids(cursor)
+
+        for job_id in job_ids:
+
+            schedule_job(job_id)
+
+        return api_response(200, "Tenure recalculation jobs resumed", {"job_ids": job_ids})
+
+
+
+    except Exception as e:
+
+        return api_response(500, f"Failed to resume jobs: {str(e)}")
+
+
+
+    finally:
+
+        cursor.close()
+
+        conn.close()
+
+
+
+
+
 # ------------------------
 
 # DELETE USER (soft delete + remove file)
@@ -796,11 +1108,11 @@ def delete_user():
 
             UPDATE tfs_user
 
-            SET is_delete = 0, is_active = 0
+            SET is_delete = 0, is_active = 0, updated_date = %s
 
             WHERE user_id = %s
 
-        """, (user_id,))
+        """, (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), user_id))
 
         conn.commit()
 
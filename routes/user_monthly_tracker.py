@@ -3,69 +3,54 @@
 from flask import Blueprint, request
 from config import get_db_connection
 from utils.response import api_response
-from datetime import datetime
+from utils.auth_token import auth_context, get_role_context
+from utils import data_versions
+from utils import billable_metrics
+from utils.db_router import read_only_route
+from utils.work_calendar import (
+    get_working_days,
+    get_user_leaves,
+    count_working_days,
+    month_range,
+    month_datetime_bounds,
+    month_yyyymm,
+)
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
 
 user_monthly_tracker_bp = Blueprint("user_monthly_tracker", __name__)
 
 # task_work_tracker.date_time is TEXT like "YYYY-MM-DD HH:MM:SS"
-TRACKER_DT = "CAST(twt.date_time AS DATETIME)"
-TRACKER_YEAR_MONTH = f"(YEAR({TRACKER_DT})*100 + MONTH({TRACKER_DT}))"
+# -> month filters use a plain string range (see month_datetime_bounds)
 
 
 def now_str() -> str:
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
-def month_year_to_yyyymm_sql(month_year_col: str) -> str:
-    """
-    Your DB stores month_year like 'JAN2026', 'DEC2025' (MONYYYY).
-    Convert MONYYYY -> integer YYYYMM inside SQL.
-    """
-    return f"""
-    CAST(
-      DATE_FORMAT(
-        STR_TO_DATE(CONCAT('01-', {month_year_col}), '%d-%b%Y'),
-        '%Y%m'
-      ) AS UNSIGNED
-    )
-    """
+def parse_target_numbers(monthly_target, working_days):
+    """-> (Decimal monthly_target, int working_days or None when not given); ValueError if not numeric"""
+    try:
+        target = Decimal(str(monthly_target).strip())
+    except (InvalidOperation, ValueError):
+        raise ValueError("monthly_target must be a number")
+    if not target.is_finite():
+        raise ValueError("monthly_target must be a number")
+    if working_days in [None, ""]:
+        return target, None
+    try:
+        days = int(str(working_days).strip())
+    except ValueError:
+        raise ValueError("working_days must be a whole number")
+    return target, days
 
 
-# ---------------------------
-# Single helper (role_name + agent_role_id)
-# ---------------------------
-def get_role_context(cursor, user_id: int) -> dict:
-    """
-    Returns:
-      {
-        "user_role_id": int|None,
-        "user_role_name": str,
-        "agent_role_id": int|None
-      }
-    """
-    cursor.execute(
-        """
-        SELECT
-            u.role_id AS user_role_id,
-            r.role_name AS user_role_name,
-            (
-                SELECT ur2.role_id
-                FROM user_role ur2
-                WHERE LOWER(TRIM(ur2.role_name)) = 'agent'
-                LIMIT 1
-            ) AS agent_role_id
-        FROM tfs_user u
-        JOIN user_role r ON r.role_id = u.role_id
-        WHERE u.user_id=%s AND u.is_active=1 AND u.is_delete=1
-        """,
-        (int(user_id),),
-    )
-    row = cursor.fetchone() or {}
-    return {
-        "user_role_id": row.get("user_role_id"),
-        "user_role_name": (row.get("user_role_name") or "").strip().lower(),
-        "agent_role_id": row.get("agent_role_id"),
-    }
+def calendar_working_days(cursor, user_id: int, team_id, yyyymm: int) -> int:
+    """Default working_days for a target row: team calendar minus the user's leave"""
+    first, last = month_range(yyyymm)
+    days = get_working_days(cursor, yyyymm, team_id)
+    leaves = get_user_leaves(cursor, [user_id], yyyymm).get(int(user_id))
+    return count_working_days(days, first, last, leaves)
 
 
 # ---------------------------
@@ -81,14 +66,17 @@ def add_user_monthly_target():
         return api_response(400, "month_year is required (MONYYYY e.g. JAN2026)")
     if data.get("monthly_target") in [None, ""]:
         return api_response(400, "monthly_target is required")
-    if data.get("working_days") in [None, ""]:
-        return api_response(400, "working_days is required")
 
     user_id = int(data["user_id"])
     month_year = str(data["month_year"]).strip()  # keep as-is (MONYYYY)
-    monthly_target = str(data["monthly_target"]).strip()  # TEXT in DB
+    yyyymm = month_yyyymm(month_year)
+    if not yyyymm:
+        return api_response(400, "month_year must be MONYYYY (e.g. JAN2026)")
+    try:
+        monthly_target, working_days = parse_target_numbers(data["monthly_target"], data.get("working_days"))
+    except ValueError as e:
+        return api_response(400, str(e))
     extra_assigned_hours = int(data.get("extra_assigned_hours") or 0)
-    working_days = str(data["working_days"]).strip()  # TEXT in DB
     created_date = str(data.get("created_date") or now_str())
 
     conn = get_db_connection()
@@ -98,13 +86,14 @@ def add_user_monthly_target():
         # Validate user exists
         cursor.execute(
             """
-            SELECT user_id
+            SELECT user_id, team_id
             FROM tfs_user
             WHERE user_id=%s AND is_active=1 AND is_delete=1
             """,
             (user_id,),
         )
-        if not cursor.fetchone():
+        user_row = cursor.fetchone()
+        if not user_row:
             return api_response(404, "User not found or inactive")
 
         # Prevent duplicate active (user + month)
@@ -112,22 +101,26 @@ def add_user_monthly_target():
             """
             SELECT user_monthly_tracker_id
             FROM user_monthly_tracker
-            WHERE user_id=%s AND month_year=%s AND is_active=1
+            WHERE user_id=%s AND yyyymm=%s AND is_active=1
             """,
-            (user_id, month_year),
+            (user_id, yyyymm),
         )
         if cursor.fetchone():
             return api_response(409, "Monthly target already exists for this user and month")
 
+        if working_days is None:
+            working_days = calendar_working_days(cursor, user_id, user_row["team_id"], yyyymm)
+
         cursor.execute(
             """
             INSERT INTO user_monthly_tracker
-                (user_id, month_year, monthly_target, extra_assigned_hours, working_days, is_active, created_date)
-            VALUES (%s, %s, %s, %s, %s, 1, %s)
+                (user_id, month_year, yyyymm, monthly_target, extra_assigned_hours, working_days, is_active, created_date)
+            VALUES (%s, %s, %s, %s, %s, %s, 1, %s)
             """,
-            (user_id, month_year, monthly_target, extra_assigned_hours, working_days, created_date),
+            (user_id, month_year, yyyymm, monthly_target, extra_assigned_hours, working_days, created_date),
         )
         conn.commit()
+        data_versions.bump("user_target", user_id)
 
         return api_response(
             201,
@@ -163,20 +156,33 @@ def update_user_monthly_target():
         params.append(int(data["user_id"]))
 
     if "month_year" in data and data["month_year"] not in [None, ""]:
+        yyyymm = month_yyyymm(data["month_year"])
+        if not yyyymm:
+            return api_response(400, "month_year must be MONYYYY (e.g. JAN2026)")
         updates.append("month_year=%s")
         params.append(str(data["month_year"]).strip())  # keep as-is (MONYYYY)
+        updates.append("yyyymm=%s")
+        params.append(yyyymm)
 
     if "monthly_target" in data and data["monthly_target"] not in [None, ""]:
+        try:
+            target, _ = parse_target_numbers(data["monthly_target"], 0)
+        except ValueError as e:
+            return api_response(400, str(e))
         updates.append("monthly_target=%s")
-        params.append(str(data["monthly_target"]).strip())
+        params.append(target)
 
     if "extra_assigned_hours" in data and data["extra_assigned_hours"] not in [None, ""]:
         updates.append("extra_assigned_hours=%s")
         params.append(int(data["extra_assigned_hours"]))
 
     if "working_days" in data and data["working_days"] not in [None, ""]:
+        try:
+            _, days = parse_target_numbers(0, data["working_days"])
+        except ValueError as e:
+            return api_response(400, str(e))
         updates.append("working_days=%s")
-        params.append(str(data["working_days"]).strip())
+        params.append(days)
 
     if not updates:
         return api_response(400, "Nothing to update")
@@ -188,7 +194,7 @@ def update_user_monthly_target():
         # Current row
         cursor.execute(
             """
-            SELECT user_id, month_year
+            SELECT user_id, yyyymm
             FROM user_monthly_tracker
             WHERE user_monthly_tracker_id=%s AND is_active=1
             """,
@@ -222,20 +228,20 @@ def update_user_monthly_target():
                 if ("user_id" in data and data["user_id"] not in [None, ""])
                 else int(current["user_id"])
             )
-            final_month_year = (
-                str(data["month_year"]).strip()
+            final_yyyymm = (
+                month_yyyymm(data["month_year"])
                 if ("month_year" in data and data["month_year"] not in [None, ""])
-                else str(current["month_year"])
+                else current["yyyymm"]
             )
 
             cursor.execute(
                 """
                 SELECT user_monthly_tracker_id
                 FROM user_monthly_tracker
-                WHERE user_id=%s AND month_year=%s AND is_active=1
+                WHERE user_id=%s AND yyyymm=%s AND is_active=1
                   AND user_monthly_tracker_id<>%s
                 """,
-                (final_user_id, final_month_year, umt_id),
+                (final_user_id, final_yyyymm, umt_id),
             )
             if cursor.fetchone():
                 return api_response(409, "Monthly target already exists for this user and month")
@@ -248,6 +254,9 @@ def update_user_monthly_target():
         """
         cursor.execute(query, tuple(params))
         conn.commit()
+        data_versions.bump("user_target", int(current["user_id"]))
+        if "user_id" in data and data["user_id"] not in [None, ""]:
+            data_versions.bump("user_target", int(data["user_id"]))
 
         return api_response(200, "User monthly target updated successfully")
 
@@ -275,6 +284,12 @@ def delete_user_monthly_target():
     cursor = conn.cursor(dictionary=True)
 
     try:
+        cursor.execute(
+            "SELECT user_id FROM user_monthly_tracker WHERE user_monthly_tracker_id=%s",
+            (umt_id,),
+        )
+        owner = cursor.fetchone() or {}
+
         cursor.execute(
             """
             UPDATE user_monthly_tracker
@@ -288,6 +303,9 @@ def delete_user_monthly_target():
         if cursor.rowcount == 0:
             return api_response(404, "Active record not found")
 
+        if owner.get("user_id") is not None:
+            data_versions.bump("user_target", int(owner["user_id"]))
+
         return api_response(200, "User monthly target deleted successfully")
 
     except Exception as e:
@@ -298,33 +316,276 @@ def delete_user_monthly_target():
         conn.close()
 
 
+# ---------------------------
+# BULK UPSERT / COPY FORWARD
+# Relies on the unique (user_id, yyyymm, active_key) key: one active row per user+month.
+# ---------------------------
+BULK_TARGETS_MAX_ROWS = 2000
+
+UPSERT_TARGET_SQL = """
+    INSERT INTO user_monthly_tracker
+        (user_id, month_year, yyyymm, monthly_target, extra_assigned_hours, working_days, is_active, created_date)
+    VALUES (%s, %s, %s, %s, %s, %s, 1, %s)
+    ON DUPLICATE KEY UPDATE
+        monthly_target = VALUES(monthly_target),
+        extra_assigned_hours = VALUES(extra_assigned_hours),
+        working_days = VALUES(working_days)
+"""
+
+
+def parse_month_year(value) -> str | None:
+    """'jan2026' / 'JAN2026' -> 'JAN2026'; None if not MONYYYY"""
+    try:
+        return datetime.strptime(str(value or "").strip(), "%b%Y").strftime("%b%Y").upper()
+    except ValueError:
+        return None
+
+
+def previous_month_year(month_year: str) -> str:
+    first = datetime.strptime(month_year, "%b%Y").replace(day=1)
+    return (first - timedelta(days=1)).strftime("%b%Y").upper()
+
+
+def active_user_ids(cursor, user_ids) -> dict[int, int | None]:
+    """active user_id -> team_id"""
+    ids = sorted({int(u) for u in user_ids})
+    if not ids:
+        return {}
+    in_ph = ",".join(["%s"] * len(ids))
+    cursor.execute(
+        f"SELECT user_id, team_id FROM tfs_user WHERE user_id IN ({in_ph}) AND is_active=1 AND is_delete=1",
+        tuple(ids),
+    )
+    return {int(r["user_id"]): r["team_id"] for r in cursor.fetchall()}
+
+
+@user_monthly_tracker_bp.route("/bulk_upsert", methods=["POST"])
+def bulk_upsert_user_monthly_targets():
+    """
+    body: {"targets": [{user_id, month_year, monthly_target, working_days?, extra_assigned_hours?}, ...]}
+    working_days defaults to the work calendar of the user's team.
+    Existing active (user, month) rows are updated, others inserted. Invalid rows are
+    reported per index (1-based) and skipped.
+    """
+    data = request.get_json(silent=True) or {}
+    targets = data.get("targets")
+    if not isinstance(targets, list) or not targets:
+        return api_response(400, "targets must be a non-empty list")
+    if len(targets) > BULK_TARGETS_MAX_ROWS:
+        return api_response(400, f"At most {BULK_TARGETS_MAX_ROWS} targets per call")
+
+    errors = []
+    rows = {}
+    created_date = now_str()
+    for idx, t in enumerate(targets, start=1):
+        if not isinstance(t, dict):
+            errors.append({"row": idx, "error": "row must be an object"})
+            continue
+        if not str(t.get("user_id") or "").strip().isdigit():
+            errors.append({"row": idx, "error": "user_id is required"})
+            continue
+        month_year = parse_month_year(t.get("month_year"))
+        if not month_year:
+            errors.append({"row": idx, "error": "month_year must be MONYYYY (e.g. JAN2026)"})
+            continue
+        if t.get("monthly_target") in [None, ""]:
+            errors.append({"row": idx, "error": "monthly_target is required"})
+            continue
+        try:
+            extra_assigned_hours = int(t.get("extra_assigned_hours") or 0)
+        except (TypeError, ValueError):
+            errors.append({"row": idx, "error": "extra_assigned_hours must be a number"})
+            continue
+        try:
+            monthly_target, working_days = parse_target_numbers(t["monthly_target"], t.get("working_days"))
+        except ValueError as e:
+            errors.append({"row": idx, "error": str(e)})
+            continue
+
+        user_id = int(str(t["user_id"]).strip())
+        # same user+month twice in one call: last one wins
+        rows[(user_id, month_year)] = (
+            idx,
+            (
+                user_id,
+                month_year,
+                month_yyyymm(month_year),
+                monthly_target,
+                extra_assigned_hours,
+                working_days,
+                created_date,
+            ),
+        )
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        conn.start_transaction()
+        known = active_user_ids(cursor, [uid for uid, _ in rows])
+        params = []
+        for (uid, _), (idx, values) in rows.items():
+            if uid in known:
+                if values[5] is None:
+                    values = values[:5] + (calendar_working_days(cursor, uid, known[uid], values[2]),) + values[6:]
+                params.append(values)
+            else:
+                errors.append({"row": idx, "error": "User not found or inactive"})
+
+        errors.sort(key=lambda e: e["row"])
+        if not params:
+            conn.rollback()
+            return api_response(400, "No valid targets", {"saved": 0, "errors": errors})
+
+        cursor.executemany(UPSERT_TARGET_SQL, params)
+        conn.commit()
+        data_versions.bump_many("user_target", {p[0] for p in params})
+
+        return api_response(
+            200,
+            "Monthly targets saved successfully" if not errors else "Monthly targets saved with errors",
+            {"saved": len(params), "errors": errors},
+        )
+
+    except Exception as e:
+        conn.rollback()
+        return api_response(500, f"Bulk upsert failed: {str(e)}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@user_monthly_tracker_bp.route("/copy_forward", methods=["POST"])
+def copy_forward_user_monthly_targets():
+    """
+    Copies active targets of one month into another in a single INSERT ... SELECT.
+    body (all optional):
+      to_month_year    default current month
+      from_month_year  default month before to_month_year
+      user_ids         limit to these users
+      working_days     override working_days for the new month
+      overwrite        true -> also replace targets already set for to_month_year
+    """
+    data = request.get_json(silent=True) or {}
+
+    to_month = parse_month_year(data.get("to_month_year") or datetime.now().strftime("%b%Y"))
+    if not to_month:
+        return api_response(400, "to_month_year must be MONYYYY (e.g. FEB2026)")
+    from_month = parse_month_year(data.get("from_month_year") or previous_month_year(to_month))
+    if not from_month:
+        return api_response(400, "from_month_year must be MONYYYY (e.g. JAN2026)")
+    if from_month == to_month:
+        return api_response(400, "from_month_year and to_month_year must differ")
+
+    working_days = data.get("working_days")
+    if working_days in [None, ""]:
+        working_days = None
+    else:
+        try:
+            _, working_days = parse_target_numbers(0, working_days)
+        except ValueError as e:
+            return api_response(400, str(e))
+    overwrite = bool(data.get("overwrite"))
+
+    where = "WHERE umt.yyyymm=%s AND umt.is_active=1"
+    where_params = [month_yyyymm(from_month)]
+    user_ids = data.get("user_ids")
+    if user_ids:
+        if not isinstance(user_ids, list):
+            return api_response(400, "user_ids must be a list")
+        ids = sorted({int(u) for u in user_ids if str(u).strip().isdigit()})
+        if not ids:
+            return api_response(400, "user_ids must contain numeric ids")
+        where += f" AND umt.user_id IN ({','.join(['%s'] * len(ids))})"
+        where_params.extend(ids)
+
+    source_sql = f"""
+        FROM user_monthly_tracker umt
+        JOIN tfs_user u ON u.user_id = umt.user_id AND u.is_active = 1 AND u.is_delete = 1
+        {where}
+    """
+    if overwrite:
+        # target table qualified by name: the SELECT reads the same table (as umt)
+        on_duplicate = """
+            user_monthly_tracker.monthly_target = VALUES(monthly_target),
+            user_monthly_tracker.extra_assigned_hours = VALUES(extra_assigned_hours),
+            user_monthly_tracker.working_days = VALUES(working_days)
+        """
+    else:
+        # keep targets already set for the new month
+        on_duplicate = "user_monthly_tracker.user_monthly_tracker_id = user_monthly_tracker.user_monthly_tracker_id"
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        conn.start_transaction()
+        cursor.execute(f"SELECT umt.user_id {source_sql}", tuple(where_params))
+        copied_users = {int(r["user_id"]) for r in cursor.fetchall()}
+        if not copied_users:
+            conn.rollback()
+            return api_response(404, f"No active targets found for {from_month}")
+
+        cursor.execute(
+            f"""
+            INSERT INTO user_monthly_tracker
+                (user_id, month_year, yyyymm, monthly_target, extra_assigned_hours, working_days, is_active, created_date)
+            SELECT umt.user_id, %s, %s, umt.monthly_target, umt.extra_assigned_hours,
+                   COALESCE(%s, umt.working_days), 1, %s
+            {source_sql}
+            ON DUPLICATE KEY UPDATE {on_duplicate}
+            """,
+            tuple([to_month, month_yyyymm(to_month), working_days, now_str()] + where_params),
+        )
+        conn.commit()
+        data_versions.bump_many("user_target", copied_users)
+
+        return api_response(
+            200,
+            "Monthly targets copied successfully",
+            {"from_month_year": from_month, "to_month_year": to_month, "users": len(copied_users)},
+        )
+
+    except Exception as e:
+        conn.rollback()
+        return api_response(500, f"Copy forward failed: {str(e)}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
 # ---------------------------
 # LIST
 # Changes:
 # - month_year optional: if missing -> default current month (MONYYYY) so pending_days works
+# - trackers are aggregated per user inside the month range first, then joined (no row fan-out)
 # - only agent rows (managers/qa won't appear as rows)
 # - monthly_total_target = monthly_target + extra_assigned_hours
 # - pending_days = working_days(from UMT) - distinct worked days till today (month-wise)
 # - do NOT return working_days or working_days_till_today separately
 # ---------------------------
 @user_monthly_tracker_bp.route("/list", methods=["POST"])
+@read_only_route
+@auth_context()
 def list_user_monthly_targets():
     data = request.get_json(silent=True) or {}
 
     logged_in_user_id = data.get("logged_in_user_id")
-    month_year = (data.get("month_year") or "").strip()  # OPTIONAL (MONYYYY)
+    month_year = (data.get("month_year") or "").strip() or datetime.now().strftime("%b%Y").upper()
     filter_user_id = data.get("user_id")  # OPTIONAL
     filter_team_id = data.get("team_id")  # OPTIONAL
 
     if not logged_in_user_id:
         return api_response(400, "logged_in_user_id is required", None)
+    yyyymm = month_yyyymm(month_year)
+    if not yyyymm:
+        return api_response(400, "month_year must be MONYYYY (e.g. JAN2026)", None)
+    month_start, month_end = month_datetime_bounds(yyyymm)
 
     conn = get_db_connection()
     cursor = conn.cursor(dictionary=True)
 
     try:
-        # If month_year is not provided, do not filter by month (show all data)
-
         ctx = get_role_context(cursor, int(logged_in_user_id))
         my_role_name = ctx["user_role_name"]
         agent_role_id = ctx["agent_role_id"]
@@ -366,32 +627,7 @@ def list_user_monthly_targets():
             """
             user_params.extend([mid, mid, mid, mid, mid, mid])
 
-        # Joins: if month_year is provided, filter by month; else, join without month filter
-        if month_year:
-            umt_join = """
-                INNER JOIN user_monthly_tracker umt
-                  ON umt.user_id = u.user_id
-                 AND umt.is_active=1
-                 AND umt.month_year=%s
-            """
-            twt_join = f"""
-                LEFT JOIN task_work_tracker twt
-                  ON twt.user_id = u.user_id
-                 AND twt.is_active=1
-                 AND {TRACKER_YEAR_MONTH} = {month_year_to_yyyymm_sql('%s')}
-            """
-        else:
-            umt_join = """
-                LEFT JOIN user_monthly_tracker umt
-                  ON umt.user_id = u.user_id
-                 AND umt.is_active=1
-            """
-            twt_join = f"""
-                LEFT JOIN task_work_tracker twt
-                  ON twt.user_id = u.user_id
-                 AND twt.is_active=1
-            """
-
+        # trackers of the month, aggregated per visible user before the join
         query = f"""
             SELECT
                 u.user_id,
@@ -399,36 +635,45 @@ def list_user_monthly_targets():
                 t.team_name,
                 umt.user_monthly_tracker_id,
                 umt.month_year,
-                COALESCE(CAST(umt.monthly_target AS DECIMAL(10,2)), 0) AS monthly_target,
+                COALESCE(umt.monthly_target, 0) AS monthly_target,
                 COALESCE(umt.extra_assigned_hours, 0) AS extra_assigned_hours,
                 (
-                    COALESCE(CAST(umt.monthly_target AS DECIMAL(10,2)), 0)
+                    COALESCE(umt.monthly_target, 0)
                     + COALESCE(umt.extra_assigned_hours, 0)
                 ) AS monthly_total_target,
-                COALESCE(SUM(twt.billable_hours), 0) AS total_billable_hours,
-                COALESCE(SUM(twt.production), 0) AS total_production,
-                COUNT(twt.tracker_id) AS tracker_rows,
+                COALESCE(agg.total_billable_hours, 0) AS total_billable_hours,
+                COALESCE(agg.total_production, 0) AS total_production,
+                COALESCE(agg.tracker_rows, 0) AS tracker_rows,
                 GREATEST(
                     (
-                        COALESCE(CAST(umt.monthly_target AS DECIMAL(10,2)), 0)
+                        COALESCE(umt.monthly_target, 0)
                         + COALESCE(umt.extra_assigned_hours, 0)
-                    ) - COALESCE(SUM(twt.billable_hours), 0),
+                    ) - COALESCE(agg.total_billable_hours, 0),
                     0
                 ) AS pending_target
             FROM tfs_user u
             LEFT JOIN team t ON u.team_id = t.team_id
-            {umt_join}
-            {twt_join}
+            INNER JOIN user_monthly_tracker umt
+              ON umt.user_id = u.user_id
+             AND umt.is_active=1
+             AND umt.yyyymm=%s
+            LEFT JOIN (
+                SELECT
+                    twt.user_id,
+                    SUM({billable_metrics.billable_sql()}) AS total_billable_hours,
+                    SUM(twt.production) AS total_production,
+                    COUNT(*) AS tracker_rows
+                FROM task_work_tracker twt
+                WHERE twt.is_active=1
+                  AND twt.date_time >= %s
+                  AND twt.date_time < %s
+                  AND twt.user_id IN (SELECT u.user_id FROM tfs_user u {user_where})
+                GROUP BY twt.user_id
+            ) agg ON agg.user_id = u.user_id
             {user_where}
-            GROUP BY u.user_id, umt.user_monthly_tracker_id
             ORDER BY u.user_name ASC
         """
-        # Params order: if month_year is provided, pass it; else, only user_where params
-        if month_year:
-            final_params = [month_year, month_year]
-        else:
-            final_params = []
-        final_params.extend(user_params)
+        final_params = [yyyymm, month_start, month_end] + user_params + user_params
         cursor.execute(query, tuple(final_params))
         rows = cursor.fetchall()
         return api_response(200, "User monthly targets fetched successfully", rows)
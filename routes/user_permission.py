@@ -1,11 +1,13 @@
 from flask import Blueprint, request
 from utils.response import api_response
 from config import get_db_connection
+from utils.auth_token import auth_context, get_auth_context
 
 permission_bp = Blueprint("permission", __name__, url_prefix="/permission")
 
 
 @permission_bp.route("/user_list", methods=["POST"])
+@auth_context()
 def user_list_with_permissions():
     data = request.get_json() or {}
     logged_in_user_id = data.get("logged_in_user_id")
@@ -18,19 +20,23 @@ def user_list_with_permissions():
     cursor = conn.cursor(dictionary=True)
 
     try:
-        # 1) Get role of logged-in user
-        cursor.execute("""
-            SELECT r.role_name
-            FROM tfs_user u
-            JOIN user_role r ON r.role_id = u.role_id
-            WHERE u.user_id = %s AND u.is_active = 1 AND u.is_delete = 1
-        """, (logged_in_user_id,))
-        role_row = cursor.fetchone()
+        # 1) Get role of logged-in user (token first, DB fallback)
+        auth = get_auth_context(logged_in_user_id)
+        if auth:
+            role = auth["role"]
+        else:
+            cursor.execute("""
+                SELECT r.role_name
+                FROM tfs_user u
+                JOIN user_role r ON r.role_id = u.role_id
+                WHERE u.user_id = %s AND u.is_active = 1 AND u.is_delete = 1
+            """, (logged_in_user_id,))
+            role_row = cursor.fetchone()
 
-        if not role_row:
-            return api_response(404, "User not found")
+            if not role_row:
+                return api_response(404, "User not found")
 
-        role = (role_row["role_name"] or "").lower()
+            role = (role_row["role_name"] or "").lower()
 
         # 2) Block QA and Agent
         if role in ["qa", "agent"]:
@@ -0,0 +1,343 @@
+from flask import Blueprint, request
+from config import get_db_connection
+from utils.response import api_response
+from utils.work_calendar import (
+    calendar_changed,
+    parse_weekend_days,
+    month_range,
+    month_yyyymm,
+    get_working_days,
+    get_user_leaves,
+    count_working_days,
+    working_days_after,
+)
+from datetime import datetime, date
+
+work_calendar_bp = Blueprint("work_calendar", __name__)
+
+
+def now_str() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def parse_dates(value) -> list[date]:
+    """'2026-01-26' or ['2026-01-26', ...] -> sorted unique dates; ValueError if any is invalid"""
+    items = value if isinstance(value, list) else [value]
+    out = set()
+    for v in items:
+        try:
+            out.add(datetime.strptime(str(v).strip(), "%Y-%m-%d").date())
+        except ValueError:
+            raise ValueError(f"Invalid date '{v}', expected YYYY-MM-DD")
+    return sorted(out)
+
+
+def parse_id(data: dict, key: str) -> int | None:
+    """Optional numeric id from the body; None if not sent, ValueError if not a number"""
+    value = data.get(key)
+    if value in [None, ""]:
+        return None
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        raise ValueError(f"{key} must be a number")
+
+
+# -----------------------------
+# HOLIDAYS
+# -----------------------------
+@work_calendar_bp.route("/holiday/add", methods=["POST"])
+def add_holiday():
+    """body: holiday_date (or list), optional team_id (None = all teams), holiday_name"""
+    data = request.get_json(silent=True) or {}
+
+    if data.get("holiday_date") in [None, "", []]:
+        return api_response(400, "holiday_date is required")
+    try:
+        dates = parse_dates(data["holiday_date"])
+        team_id = parse_id(data, "team_id")
+    except ValueError as e:
+        return api_response(400, str(e))
+
+    holiday_name = (data.get("holiday_name") or "").strip() or None
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        cursor.executemany(
+            """
+            INSERT INTO work_holiday (holiday_date, team_id, holiday_name, is_active, created_date)
+            VALUES (%s, %s, %s, 1, %s)
+            """,
+            [(d, team_id, holiday_name, now_str()) for d in dates],
+        )
+        conn.commit()
+        calendar_changed()
+        return api_response(201, "Holiday added successfully", {"count": len(dates)})
+
+    except Exception as e:
+        conn.rollback()
+        return api_response(500, f"Add failed: {str(e)}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@work_calendar_bp.route("/holiday/delete", methods=["POST"])
+def delete_holiday():
+    data = request.get_json(silent=True) or {}
+    if not data.get("holiday_id"):
+        return api_response(400, "holiday_id is required")
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        cursor.execute(
+            "UPDATE work_holiday SET is_active=0 WHERE holiday_id=%s AND is_active=1",
+            (int(data["holiday_id"]),),
+        )
+        conn.commit()
+        if cursor.rowcount == 0:
+            return api_response(404, "Active holiday not found")
+        calendar_changed()
+        return api_response(200, "Holiday deleted successfully")
+
+    except Exception as e:
+        conn.rollback()
+        return api_response(500, f"Delete failed: {str(e)}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@work_calendar_bp.route("/holiday/list", methods=["POST"])
+def list_holidays():
+    """body (optional): month_year (MONYYYY) or year, team_id (also returns company-wide holidays)"""
+    data = request.get_json(silent=True) or {}
+
+    where = "WHERE h.is_active=1"
+    params = []
+
+    if data.get("month_year"):
+        yyyymm = month_yyyymm(data["month_year"])
+        if not yyyymm:
+            return api_response(400, "month_year must be MONYYYY (e.g. JAN2026)")
+        first, last = month_range(yyyymm)
+        where += " AND h.holiday_date BETWEEN %s AND %s"
+        params.extend([first, last])
+    elif data.get("year"):
+        try:
+            year = parse_id(data, "year")
+            first, last = date(year, 1, 1), date(year, 12, 31)
+        except ValueError:
+            return api_response(400, "year must be a year like 2026")
+        where += " AND h.holiday_date BETWEEN %s AND %s"
+        params.extend([first, last])
+
+    try:
+        team_id = parse_id(data, "team_id")
+    except ValueError as e:
+        return api_response(400, str(e))
+    if team_id:
+        where += " AND (h.team_id IS NULL OR h.team_id=%s)"
+        params.append(team_id)
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        cursor.execute(
+            f"""
+            SELECT h.holiday_id, h.holiday_date, h.team_id, t.team_name, h.holiday_name
+            FROM work_holiday h
+            LEFT JOIN team t ON t.team_id = h.team_id
+            {where}
+            ORDER BY h.holiday_date
+            """,
+            tuple(params),
+        )
+        return api_response(200, "Holidays fetched successfully", cursor.fetchall())
+
+    except Exception as e:
+        return api_response(500, f"List failed: {str(e)}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# -----------------------------
+# TEAM WEEKEND
+# -----------------------------
+@work_calendar_bp.route("/weekend/set", methods=["POST"])
+def set_team_weekend():
+    """body: team_id, weekend_days [5, 6] (Monday=0); empty/null -> back to the default weekend"""
+    data = request.get_json(silent=True) or {}
+    if not data.get("team_id"):
+        return api_response(400, "team_id is required")
+    try:
+        team_id = parse_id(data, "team_id")
+    except ValueError as e:
+        return api_response(400, str(e))
+
+    raw = data.get("weekend_days")
+    weekend = parse_weekend_days(",".join(str(d) for d in raw) if isinstance(raw, list) else raw)
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        if raw in [None, "", []]:
+            cursor.execute("DELETE FROM team_work_week WHERE team_id=%s", (team_id,))
+        else:
+            cursor.execute(
+                """
+                INSERT INTO team_work_week (team_id, weekend_days) VALUES (%s, %s)
+                ON DUPLICATE KEY UPDATE weekend_days = VALUES(weekend_days)
+                """,
+                (team_id, ",".join(str(d) for d in weekend)),
+            )
+        conn.commit()
+        calendar_changed()
+        return api_response(200, "Team weekend saved successfully", {"team_id": team_id, "weekend_days": list(weekend)})
+
+    except Exception as e:
+        conn.rollback()
+        return api_response(500, f"Save failed: {str(e)}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# -----------------------------
+# USER LEAVE
+# -----------------------------
+@work_calendar_bp.route("/leave/add", methods=["POST"])
+def add_leave():
+    """body: user_id, leave_dates (date or list)"""
+    data = request.get_json(silent=True) or {}
+    if not data.get("user_id"):
+        return api_response(400, "user_id is required")
+    if data.get("leave_dates") in [None, "", []]:
+        return api_response(400, "leave_dates is required")
+    try:
+        dates = parse_dates(data["leave_dates"])
+        user_id = parse_id(data, "user_id")
+    except ValueError as e:
+        return api_response(400, str(e))
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        cursor.executemany(
+            """
+            INSERT INTO user_leave (user_id, leave_date, is_active, created_date)
+            VALUES (%s, %s, 1, %s)
+            ON DUPLICATE KEY UPDATE is_active = 1
+            """,
+            [(user_id, d, now_str()) for d in dates],
+        )
+        conn.commit()
+        calendar_changed(user_id)
+        return api_response(201, "Leave added successfully", {"count": len(dates)})
+
+    except Exception as e:
+        conn.rollback()
+        return api_response(500, f"Add failed: {str(e)}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@work_calendar_bp.route("/leave/delete", methods=["POST"])
+def delete_leave():
+    """body: user_id, leave_dates (date or list)"""
+    data = request.get_json(silent=True) or {}
+    if not data.get("user_id"):
+        return api_response(400, "user_id is required")
+    if data.get("leave_dates") in [None, "", []]:
+        return api_response(400, "leave_dates is required")
+    try:
+        dates = parse_dates(data["leave_dates"])
+        user_id = parse_id(data, "user_id")
+    except ValueError as e:
+        return api_response(400, str(e))
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        in_ph = ",".join(["%s"] * len(dates))
+        cursor.execute(
+            f"UPDATE user_leave SET is_active=0 WHERE user_id=%s AND leave_date IN ({in_ph})",
+            tuple([user_id] + dates),
+        )
+        conn.commit()
+        calendar_changed(user_id)
+        return api_response(200, "Leave deleted successfully", {"count": cursor.rowcount})
+
+    except Exception as e:
+        conn.rollback()
+        return api_response(500, f"Delete failed: {str(e)}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# -----------------------------
+# MONTH VIEW
+# -----------------------------
+@work_calendar_bp.route("/month", methods=["POST"])
+def month_calendar():
+    """
+    body: month_year (MONYYYY, default current), optional team_id / user_id
+    Working days of the month, how many are left after today and (for a user) leave days.
+    """
+    data = request.get_json(silent=True) or {}
+
+    yyyymm = month_yyyymm(data.get("month_year") or datetime.now().strftime("%b%Y"))
+    if not yyyymm:
+        return api_response(400, "month_year must be MONYYYY (e.g. JAN2026)")
+    first, last = month_range(yyyymm)
+    try:
+        team_id = parse_id(data, "team_id")
+        user_id = parse_id(data, "user_id")
+    except ValueError as e:
+        return api_response(400, str(e))
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        if user_id and not team_id:
+            cursor.execute("SELECT team_id FROM tfs_user WHERE user_id=%s", (user_id,))
+            team_id = (cursor.fetchone() or {}).get("team_id")
+
+        days = get_working_days(cursor, yyyymm, team_id)
+        leaves = get_user_leaves(cursor, [user_id], yyyymm).get(user_id) if user_id else None
+
+        today = date.today()
+        if today < first:
+            remaining = count_working_days(days, first, last, leaves)
+        elif today > last:
+            remaining = 0
+        else:
+            remaining = working_days_after(days, today, last, leaves)
+
+        return api_response(200, "Work calendar fetched successfully", {
+            "month_year": first.strftime("%b%Y").upper(),
+            "team_id": team_id,
+            "user_id": user_id,
+            "working_days": count_working_days(days, first, last, leaves),
+            "remaining_working_days_after_today": remaining,
+            "working_dates": [date.fromordinal(o).isoformat() for o in days],
+            "leave_dates": [date.fromordinal(o).isoformat() for o in (leaves or [])],
+        })
+
+    except Exception as e:
+        return api_response(500, f"Work calendar failed: {str(e)}")
+    finally:
+        cursor.close()
+        conn.close()
@@ -0,0 +1,112 @@
+import os
+
+import pytest
+
+# config reads these at import time
+os.environ.setdefault("AUTH_SECRET_KEY", "test-secret")
+os.environ.setdefault("RESET_SECRET_KEY", "test-reset-secret")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+
+class TransactionError(Exception):
+    """What mysql.connector raises for start_transaction() inside an open transaction"""
+
+
+class FakeCursor:
+    """
+    Stand-in for a mysql.connector cursor.
+    results: result sets popped one per execute(), or a callable (sql, params) -> rows.
+    Executed (sql, params) pairs are kept in .executed.
+    """
+
+    def __init__(self, *results, conn=None):
+        self.results = results[0] if len(results) == 1 and callable(results[0]) else list(results)
+        self.executed = []
+        self.conn = conn
+        self.rowcount = 0
+        self.lastrowid = None
+        self.column_names = ()
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+        if self.conn is not None:
+            self.conn.touch()
+        if callable(self.results):
+            rows = self.results(sql, params)
+        else:
+            rows = self.results.pop(0) if self.results else []
+        self._rows = list(rows or [])
+        self.rowcount = len(self._rows) or 1
+
+    def executemany(self, sql, seq):
+        for params in seq:
+            self.execute(sql, params)
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchmany(self, size=1):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """
+    autocommit=False semantics of mysql.connector: any statement opens an implicit
+    transaction, start_transaction() inside one raises.
+    """
+
+    def __init__(self, cursor: FakeCursor):
+        self._cursor = cursor
+        cursor.conn = self
+        self.in_transaction = False
+        self.commits = 0
+        self.rollbacks = 0
+        self.closed = False
+
+    def touch(self):
+        self.in_transaction = True
+
+    def cursor(self, **kwargs):
+        return self._cursor
+
+    def start_transaction(self):
+        if self.in_transaction:
+            raise TransactionError("Transaction already in progress")
+        self.in_transaction = True
+
+    def commit(self):
+        self.in_transaction = False
+        self.commits += 1
+
+    def rollback(self):
+        self.in_transaction = False
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_cursor():
+    return FakeCursor
+
+
+@pytest.fixture
+def fake_connection():
+    return FakeConnection
+
+
+@pytest.fixture
+def app():
+    from flask import Flask
+
+    return Flask(__name__)
@@ -0,0 +1,59 @@
+import pytest
+
+from routes import tracker
+
+
+@pytest.fixture
+def client(app, monkeypatch, fake_cursor, fake_connection):
+    meta = {"row": None}
+
+    def respond(sql, params):
+        if sql is tracker.ADD_TRACKER_META_SQL:
+            return [meta["row"]] if meta["row"] else []
+        return []
+
+    cursor = fake_cursor(respond)
+    conn = fake_connection(cursor)
+    monkeypatch.setattr(tracker, "get_db_connection", lambda *a, **k: conn)
+    monkeypatch.setattr(tracker, "log_api_call", lambda *args: None)
+    monkeypatch.setattr(tracker, "schedule_tracker_file_inspection", lambda *args: None)
+
+    app.register_blueprint(tracker.tracker_bp, url_prefix="/tracker")
+    c = app.test_client()
+    c.conn, c.cursor, c.meta = conn, cursor, meta
+    return c
+
+
+FORM = {"project_id": "3", "task_id": "5", "user_id": "7", "production": "30", "tenure_target": "40"}
+
+
+def test_unknown_task_rolls_back_the_idempotency_claim(client):
+    resp = client.post("/tracker/add", data=FORM, headers={"Idempotency-Key": "k-1"})
+
+    assert resp.status_code == 404
+    assert any("tracker_idempotency" in sql for sql, _ in client.cursor.executed)
+    assert client.conn.rollbacks == 1
+    assert client.conn.commits == 0
+    assert not client.conn.in_transaction
+
+
+def test_task_of_another_project_rolls_back(client):
+    client.meta["row"] = {"task_project_id": 99, "task_target": 40, "task_name": "T",
+                          "project_code": "P", "user_name": "U"}
+
+    resp = client.post("/tracker/add", data=FORM)
+
+    assert resp.status_code == 400
+    assert client.conn.rollbacks == 1
+    assert client.conn.commits == 0
+
+
+def test_add_commits_once(client):
+    client.meta["row"] = {"task_project_id": 3, "task_target": 40, "task_name": "T",
+                          "project_code": "P", "user_name": "U"}
+
+    resp = client.post("/tracker/add", data=FORM)
+
+    assert resp.status_code == 201, resp.get_json()
+    assert client.conn.commits == 1
+    assert client.conn.rollbacks == 0
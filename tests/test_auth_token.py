@@ -0,0 +1,90 @@
+import pytest
+from flask import g
+from itsdangerous import SignatureExpired, URLSafeTimedSerializer
+
+from utils import auth_token
+
+
+def test_token_round_trip():
+    token = auth_token.issue_token(7, 3, " Manager ")
+    payload = auth_token.load_token(token)
+    assert payload == {"user_id": 7, "role_id": 3, "role": "manager", "sv": auth_token.AUTH_TOKEN_SCOPE_VERSION}
+
+
+def test_older_scope_version_is_rejected(monkeypatch):
+    token = auth_token.issue_token(7, 3, "manager")
+    monkeypatch.setattr(auth_token, "AUTH_TOKEN_SCOPE_VERSION", auth_token.AUTH_TOKEN_SCOPE_VERSION + 1)
+    with pytest.raises(SignatureExpired):
+        auth_token.load_token(token)
+
+
+def _auth(user_id=7):
+    return {"user_id": user_id, "role_id": 3, "role": "manager", "sv": auth_token.AUTH_TOKEN_SCOPE_VERSION}
+
+
+def test_get_auth_context_needs_no_db(app, monkeypatch):
+    import utils.db_router
+
+    def no_db():
+        raise AssertionError("token checks must not touch the database")
+
+    monkeypatch.setattr(utils.db_router, "primary_connection", no_db)
+    with app.test_request_context():
+        g.auth = _auth()
+        assert auth_token.get_auth_context(7) == g.auth
+        assert auth_token.get_auth_context() == g.auth
+        # token of another user is never used
+        assert auth_token.get_auth_context(8) is None
+        assert auth_token.get_auth_context("not-a-number") is None
+
+        g.auth = None
+        assert auth_token.get_auth_context(7) is None
+
+
+def test_auth_context_decorator(app):
+    @app.route("/t", methods=["POST"])
+    @auth_token.auth_context()
+    def view():
+        return {"auth": g.auth}
+
+    client = app.test_client()
+    assert client.post("/t").get_json() == {"auth": None}
+
+    token = auth_token.issue_token(7, 3, "agent")
+    assert client.post("/t", headers={"Authorization": f"Bearer {token}"}).get_json()["auth"]["user_id"] == 7
+    assert client.post("/t", headers={"X-Auth-Token": token}).get_json()["auth"]["role"] == "agent"
+    assert client.post("/t", headers={"Authorization": "Bearer forged"}).status_code == 401
+
+    other_key = URLSafeTimedSerializer("some-other-key").dumps(
+        {"user_id": 7, "role": "admin", "sv": auth_token.AUTH_TOKEN_SCOPE_VERSION}, salt=auth_token.AUTH_SALT
+    )
+    assert client.post("/t", headers={"X-Auth-Token": other_key}).status_code == 401
+
+
+def test_auth_context_required(app):
+    @app.route("/r", methods=["POST"])
+    @auth_token.auth_context(required=True)
+    def view():
+        return {"ok": True}
+
+    assert app.test_client().post("/r").status_code == 401
+
+
+def test_get_role_context_falls_back_to_db(app, fake_cursor, monkeypatch):
+    monkeypatch.setattr(auth_token, "_agent_role_id", 4)
+    cursor = fake_cursor([{"user_role_id": 2, "user_role_name": " QA ", "agent_role_id": 4}])
+    with app.test_request_context():
+        g.auth = None
+        ctx = auth_token.get_role_context(cursor, 9)
+    assert ctx == {"user_role_id": 2, "user_role_name": "qa", "agent_role_id": 4}
+    assert cursor.executed[0][1] == (9,)
+
+
+def test_get_role_context_from_token(app, fake_cursor, monkeypatch):
+    monkeypatch.setattr(auth_token, "_agent_role_id", 4)
+    cursor = fake_cursor()
+    with app.test_request_context():
+        g.auth = _auth()
+        ctx = auth_token.get_role_context(cursor, 7)
+    assert ctx == {"user_role_id": 3, "user_role_name": "manager", "agent_role_id": 4}
+    assert cursor.executed == []
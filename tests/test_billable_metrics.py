@@ -0,0 +1,56 @@
+from decimal import Decimal
+
+import numpy as np
+
+from utils import billable_metrics
+
+
+def test_billable_hours_scalar():
+    assert billable_metrics.billable_hours(30, 40) == 0.75
+    assert billable_metrics.billable_hours(30, 0) == 0.0
+    assert billable_metrics.billable_hours(None, None) == 0.0
+    assert billable_metrics.billable_hours("12.5", Decimal("25")) == 0.5
+
+
+def test_billable_sql_matches_formula():
+    assert billable_metrics.billable_sql() == "COALESCE(twt.production / NULLIF(twt.tenure_target, 0), 0)"
+    assert billable_metrics.billable_sql("p", "t") == "COALESCE(p / NULLIF(t, 0), 0)"
+
+
+def test_to_decimal_rounds_to_four_places():
+    assert billable_metrics.to_decimal(1 / 3) == Decimal("0.3333")
+    assert billable_metrics.to_decimal(0) == Decimal("0.0000")
+
+
+def test_row_billable_zero_target():
+    out = billable_metrics.row_billable(np.array([10.0, 5.0]), np.array([20.0, 0.0]))
+    assert out.tolist() == [0.5, 0.0]
+
+
+def _rows():
+    # (user_id, work_date, production, tenure_target);
+    # deliberately unsorted, two rows on one day for user 1
+    return [
+        (2, "2026-01-02", 40, 40),
+        (1, "2026-01-03", 10, 20),
+        (1, "2026-01-01", 20, 40),
+        (1, "2026-01-01", 5, 0),
+        (2, "2026-01-05 10:00:00", None, 10),
+    ]
+
+
+def test_daily_metrics_groups_and_accumulates_per_user():
+    daily = billable_metrics.daily_metrics(billable_metrics.tracker_columns(_rows()))
+
+    assert daily["user_id"].tolist() == [1, 1, 2, 2]
+    assert [str(d) for d in daily["day"]] == ["2026-01-01", "2026-01-03", "2026-01-02", "2026-01-05"]
+    assert daily["production"].tolist() == [25.0, 10.0, 40.0, 0.0]
+    assert daily["billable"].tolist() == [0.5, 0.5, 1.0, 0.0]
+    assert daily["rows"].tolist() == [2, 1, 1, 1]
+    # running total restarts for every user
+    assert daily["cumulative_billable"].tolist() == [0.5, 1.0, 1.0, 1.0]
+
+
+def test_daily_metrics_empty():
+    daily = billable_metrics.daily_metrics(billable_metrics.tracker_columns([]))
+    assert all(len(v) == 0 for v in daily.values())
@@ -0,0 +1,67 @@
+import pytest
+
+from routes import auth
+
+
+@pytest.fixture
+def client(app, monkeypatch, fake_cursor, fake_connection):
+    logged = []
+    monkeypatch.setattr(auth, "log_api_call", lambda *args: logged.append(args))
+
+    def respond(sql, params):
+        if "FROM tfs_user WHERE user_email IN" in sql:
+            return []  # no existing users
+        if "FROM user_role" in sql:
+            return [{"role_id": 2, "role_name": "Agent"}]
+        if "SELECT user_id, user_email FROM tfs_user" in sql:
+            return [{"user_id": 100 + i, "user_email": e} for i, e in enumerate(params)]
+        return []
+
+    cursor = fake_cursor(respond)
+    conn = fake_connection(cursor)
+    monkeypatch.setattr(auth, "get_db_connection", lambda *a, **k: conn)
+
+    app.register_blueprint(auth.auth_bp, url_prefix="/auth")
+    c = app.test_client()
+    c.conn, c.cursor, c.logged = conn, cursor, logged
+    return c
+
+
+def _user(email, role_id=2):
+    return {"user_name": "New User", "user_email": email, "user_password": "Secret@123", "role_id": role_id}
+
+
+def test_bulk_import_runs_in_one_transaction(client):
+    resp = client.post("/auth/user/bulk", json={
+        "users": [_user("a@example.com"), _user("b@example.com")],
+        "device_id": "d1", "device_type": "web", "logged_in_user_id": 9,
+    })
+
+    assert resp.status_code == 201, resp.get_json()
+    assert resp.get_json()["data"]["inserted"] == 2
+    assert client.conn.commits == 1
+    assert client.conn.rollbacks == 0
+    inserts = [sql for sql, _ in client.cursor.executed if "INSERT INTO tfs_user" in sql]
+    assert len(inserts) == 2
+    assert client.logged == [("bulk_user_import", 9, "d1", "web", client.logged[0][4])]
+
+
+def test_bulk_import_rejected_rows_roll_back(client):
+    resp = client.post("/auth/user/bulk", json={
+        "users": [_user("a@example.com", role_id=77)], "device_id": "d1", "device_type": "web",
+    })
+
+    assert resp.status_code == 400
+    assert client.conn.commits == 0
+    assert client.conn.rollbacks == 1
+    assert client.logged == []
+
+
+def test_bulk_import_validation_needs_no_db(client):
+    resp = client.post("/auth/user/bulk", json={
+        "users": [{"user_email": "bad"}], "all_or_nothing": True, "device_id": "d1", "device_type": "web",
+    })
+
+    assert resp.status_code == 400
+    assert resp.get_json()["data"]["errors"][0]["row"] == 1
+    assert client.cursor.executed == []
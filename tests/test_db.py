@@ -0,0 +1,38 @@
+import pytest
+
+from utils import db
+
+
+def _conn(fake_cursor, fake_connection, rows):
+    cursor = fake_cursor(rows)
+    cursor.column_names = ("user_id", "work_date")
+    return fake_connection(cursor), cursor
+
+
+def test_stream_row_modes(fake_cursor, fake_connection):
+    rows = [(1, "2026-01-01"), (2, "2026-01-02"), (3, "2026-01-03")]
+
+    conn, _ = _conn(fake_cursor, fake_connection, rows)
+    assert list(db.stream(conn, "SELECT 1", batch_size=2)) == rows
+
+    conn, _ = _conn(fake_cursor, fake_connection, rows)
+    assert list(db.stream(conn, "SELECT 1", row="dict"))[0] == {"user_id": 1, "work_date": "2026-01-01"}
+
+    conn, _ = _conn(fake_cursor, fake_connection, rows)
+    named = list(db.stream(conn, "SELECT 1", row="named"))
+    assert (named[2].user_id, named[2].work_date) == (3, "2026-01-03")
+
+
+def test_stream_passes_params_and_rejects_unknown_mode(fake_cursor, fake_connection):
+    conn, cursor = _conn(fake_cursor, fake_connection, [(1, "2026-01-01")])
+    list(db.stream(conn, "SELECT %s", [5]))
+    assert cursor.executed == [("SELECT %s", (5,))]
+
+    conn, _ = _conn(fake_cursor, fake_connection, [(1, "2026-01-01")])
+    with pytest.raises(ValueError):
+        list(db.stream(conn, "SELECT 1", row="json"))
+
+
+def test_query_converts_on_existing_cursor(fake_cursor, fake_connection):
+    _, cursor = _conn(fake_cursor, fake_connection, [(1, "2026-01-01")])
+    assert db.query(cursor, "SELECT 1") == [{"user_id": 1, "work_date": "2026-01-01"}]
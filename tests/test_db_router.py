@@ -0,0 +1,55 @@
+import pytest
+
+from utils import db_router
+
+
+@pytest.fixture
+def router(monkeypatch, fake_cursor, fake_connection):
+    monkeypatch.setenv("DB_REPLICA_HOST", "replica.local")
+    monkeypatch.setitem(db_router._replica_state, "checked_at", 0.0)
+    monkeypatch.setitem(db_router._replica_state, "healthy", False)
+    monkeypatch.setitem(db_router._replica_state, "lag", None)
+    monkeypatch.setitem(db_router._replica_state, "down", False)
+
+    clock = {"now": 1000.0}
+    calls = {"replica": 0}
+
+    def replica_down():
+        calls["replica"] += 1
+        raise ConnectionError("connect timeout")
+
+    monkeypatch.setattr(db_router.time, "monotonic", lambda: clock["now"])
+    monkeypatch.setattr(db_router, "replica_connection", replica_down)
+    monkeypatch.setattr(db_router, "primary_connection", lambda: fake_connection(fake_cursor()))
+    return clock, calls
+
+
+def test_down_replica_is_not_retried_within_the_window(router):
+    clock, calls = router
+
+    assert db_router.get_connection(read_only=True).db_source == "primary"
+    assert calls["replica"] == 1
+    assert db_router._replica_state["down"]
+
+    clock["now"] += db_router.DB_REPLICA_RETRY_SECONDS - 1
+    assert db_router.get_connection(read_only=True).db_source == "primary"
+    assert calls["replica"] == 1
+
+    clock["now"] += 2
+    db_router.get_connection(read_only=True)
+    assert calls["replica"] == 2
+
+
+def test_no_backoff_before_the_first_check(router):
+    clock, _ = router
+    clock["now"] = 1.0  # fresh boot: monotonic clock still small
+    assert not db_router.replica_backing_off()
+
+
+def test_lagging_replica_waits_for_the_next_lag_check(router):
+    clock, _ = router
+    db_router._replica_state.update({"checked_at": clock["now"], "healthy": False, "down": False})
+
+    assert db_router.replica_backing_off()
+    clock["now"] += db_router.DB_REPLICA_LAG_CHECK_SECONDS
+    assert not db_router.replica_backing_off()
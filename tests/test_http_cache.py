@@ -0,0 +1,192 @@
+import gzip
+from datetime import date, timedelta
+
+import pytest
+from flask import Blueprint, g
+
+from utils import http_cache
+from utils.auth_token import auth_context
+from utils.db_router import _track_commits
+from utils.response import RESPONSE_COMPRESS_MIN_BYTES, api_response
+
+
+@pytest.fixture
+def versions(monkeypatch):
+    """Counters / source served instead of the data_version table"""
+    state = {"version": "tfs_user=1", "source": "primary"}
+    monkeypatch.setattr(http_cache, "data_versions_of", lambda names: (state["version"], state["source"]))
+    return state
+
+
+@pytest.fixture
+def client(app):
+    calls = {"n": 0, "body_source": None}
+
+    @app.route("/list", methods=["POST"])
+    @http_cache.conditional_get("tfs_user")
+    def view():
+        calls["n"] += 1
+        if calls["body_source"]:
+            g.setdefault("db_sources", set()).add(calls["body_source"])
+        return api_response(200, "ok", [{"user_id": 1}])
+
+    app.after_request(http_cache.compress_response)
+    c = app.test_client()
+    c.calls = calls
+    return c
+
+
+def test_unknown_data_set_is_rejected():
+    with pytest.raises(ValueError):
+        http_cache.conditional_get("no_such_table")
+
+
+def test_etag_then_304(client, versions):
+    first = client.post("/list", json={"a": 1})
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    again = client.post("/list", json={"a": 1}, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert client.calls["n"] == 1  # view not run for the 304
+
+
+def test_etag_changes_with_counters_and_request(client, versions):
+    etag = client.post("/list", json={"a": 1}).headers["ETag"]
+
+    other_body = client.post("/list", json={"a": 2}, headers={"If-None-Match": etag})
+    assert other_body.status_code == 200
+    assert other_body.headers["ETag"] != etag
+
+    versions["version"] = "tfs_user=2"
+    after_write = client.post("/list", json={"a": 1}, headers={"If-None-Match": etag})
+    assert after_write.status_code == 200
+    assert after_write.headers["ETag"] != etag
+
+
+def test_no_etag_when_body_read_from_replica_but_counters_from_primary(client, versions):
+    client.calls["body_source"] = "replica"
+    resp = client.post("/list", json={})
+    assert resp.status_code == 200
+    assert "ETag" not in resp.headers
+
+    # counters read on the replica too -> safe to tag
+    versions["source"] = "replica"
+    assert "ETag" in client.post("/list", json={}).headers
+
+
+def test_version_failure_serves_normally(client, monkeypatch):
+    def fail(names):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(http_cache, "data_versions_of", fail)
+    resp = client.post("/list", json={}, headers={"If-None-Match": 'W/"anything"'})
+    assert resp.status_code == 200
+    assert "ETag" not in resp.headers
+
+
+def test_etag_changes_with_the_day(client, versions, monkeypatch):
+    etag = client.post("/list", json={}).headers["ETag"]
+
+    class Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return date.today() + timedelta(days=1)
+
+    monkeypatch.setattr(http_cache, "date", Tomorrow)
+    resp = client.post("/list", json={}, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+
+
+def test_etag_varies_on_view_resolved_input(app, versions):
+    resolved = {"month": "Jan2026"}
+
+    @app.route("/month", methods=["POST"])
+    @http_cache.conditional_get("tfs_user", vary=lambda: resolved["month"])
+    def month_view():
+        return api_response(200, "ok", resolved["month"])
+
+    client = app.test_client()
+    etag = client.post("/month", json={}).headers["ETag"]
+    resolved["month"] = "Feb2026"
+    assert client.post("/month", json={}, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_invalid_token_gets_401_not_304(app, versions):
+    @app.route("/auth_list", methods=["POST"])
+    @auth_context()
+    @http_cache.conditional_get("tfs_user")
+    def auth_list():
+        return api_response(200, "ok", [])
+
+    client = app.test_client()
+    etag = client.post("/auth_list", json={}).headers["ETag"]
+    resp = client.post("/auth_list", json={}, headers={"If-None-Match": etag, "Authorization": "Bearer junk"})
+    assert resp.status_code == 401
+
+
+def test_bump_data_versions_one_statement(fake_cursor):
+    cursor = fake_cursor()
+    http_cache.bump_data_versions(cursor, "task", "project", "task")
+    assert len(cursor.executed) == 1
+    sql, params = cursor.executed[0]
+    assert "ON DUPLICATE KEY UPDATE" in sql
+    assert params[0::2] == ("project", "task")
+
+    http_cache.bump_data_versions(cursor)
+    assert len(cursor.executed) == 1
+
+
+def test_request_commit_bumps_in_its_own_transaction(app, fake_cursor, fake_connection):
+    bp = Blueprint("project", __name__)
+
+    @bp.route("/save", methods=["POST"])
+    def save():
+        return api_response(200, "ok")
+
+    app.register_blueprint(bp, url_prefix="/project")
+    cursor = fake_cursor()
+    conn = fake_connection(cursor)
+
+    with app.test_request_context("/project/save", method="POST"):
+        _track_commits(conn)
+        cursor.execute("UPDATE project SET project_name=%s", ("x",))
+        conn.commit()
+        assert g.db_wrote
+
+    assert conn.commits == 1
+    bump_sql, bump_params = cursor.executed[-1]
+    assert "INSERT INTO data_version" in bump_sql
+    assert bump_params[0::2] == ("project",)
+
+
+def test_api_call_logs_are_not_versioned():
+    assert "api_call_logs" not in http_cache.VERSIONED_DATA
+
+
+def test_blueprint_data_sets_have_counters():
+    for names in http_cache.BLUEPRINT_DATA.values():
+        assert set(names) <= set(http_cache.VERSIONED_DATA)
+
+
+def test_compress_response(app):
+    big = "x" * (RESPONSE_COMPRESS_MIN_BYTES + 10)
+
+    @app.route("/text")
+    def text():
+        return big
+
+    app.after_request(http_cache.compress_response)
+    client = app.test_client()
+
+    resp = client.get("/text", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(resp.data).decode() == big
+
+    plain = client.get("/text")
+    assert "Content-Encoding" not in plain.headers
+    assert plain.data.decode() == big
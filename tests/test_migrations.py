@@ -0,0 +1,88 @@
+import re
+from pathlib import Path
+
+import pytest
+
+from utils.work_calendar import month_yyyymm
+
+# No MySQL here: these check the patterns the migrations filter on against the
+# Python parsers the routes use for the same values.
+
+MIGRATIONS = Path(__file__).resolve().parent.parent / "migrations"
+
+
+def _sql(name: str) -> str:
+    return (MIGRATIONS / name).read_text()
+
+
+def _sql_regexes(sql: str) -> set[str]:
+    # '...' literals after REGEXP, with the SQL backslash escaping undone
+    return {m.replace("\\\\", "\\") for m in re.findall(r"REGEXP '([^']*)'", sql)}
+
+
+@pytest.mark.parametrize("value, ok", [
+    ("JAN2026", True),
+    (" feb2026 ", True),
+    ("Dec1999", True),
+    ("JANUARY2026", False),
+    ("2026-01", False),
+    ("JAN26", False),
+    ("", False),
+])
+def test_009_month_pattern_matches_month_parser(value, ok):
+    sql = _sql("009_user_monthly_tracker_typed.sql")
+    month_patterns = {p for p in _sql_regexes(sql) if "JAN" in p}
+    assert len(month_patterns) == 1
+    pattern = month_patterns.pop()
+
+    assert bool(re.search(pattern, value.strip().upper())) is ok
+    if ok:
+        assert month_yyyymm(value.strip().upper()) > 0
+
+
+def test_009_quarantine_accepts_umt_rows():
+    sql = _sql("009_user_monthly_tracker_typed.sql")
+    quarantine = sql[sql.index("LIKE user_monthly_tracker;"):sql.index("INSERT INTO user_monthly_tracker_quarantine")]
+    # the generated column and the unique key copied by LIKE would reject SELECT umt.*
+    assert "DROP INDEX uq_umt_user_month_active" in quarantine
+    assert "MODIFY active_key TINYINT NULL" in quarantine
+
+
+def _clean_ids(value) -> str:
+    # the REPLACE chain of migrations 002 / 004
+    return str(value).replace("[", "").replace("]", "").replace('"', "").replace(" ", "")
+
+
+@pytest.mark.parametrize("value, legacy", [
+    ("78", True),
+    ("78,81", True),
+    ("[78]", True),
+    ('["78","81"]', True),
+    ("[78, 81]", True),
+    ("", False),
+    ("abc", False),
+    ("[]", False),
+    ("78,,81", False),
+])
+def test_002_id_list_pattern_matches_route_parser(value, legacy):
+    from routes.project import _int_ids
+
+    sql = _sql("002_project_member.sql")
+    patterns = _sql_regexes(sql)
+    assert patterns == {"^[0-9]+(,[0-9]+)*$"}
+    cleaned = _clean_ids(value)
+    backfilled = [int(x) for x in cleaned.split(",")] if re.search(patterns.pop(), cleaned) else []
+    assert bool(backfilled) is legacy
+    if backfilled:
+        assert backfilled == _int_ids(value)
+    for role in ("manager", "asst_manager", "qa", "team"):
+        assert f"'{role}'" in sql
+
+
+def test_004_backfills_csv_task_teams():
+    sql = _sql("004_task_team.sql")
+    assert _sql_regexes(sql) == _sql_regexes(_sql("002_project_member.sql"))
+    assert "JSON_VALID" not in sql  # CSV values are not valid JSON
+    pattern = _sql_regexes(sql).pop()
+    for value in ("78,81", "[78, 81]", '["78","81"]'):
+        assert re.search(pattern, _clean_ids(value))
@@ -0,0 +1,87 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from routes import tracker
+from utils import work_calendar
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    tracker._month_summary_cache.clear()
+    work_calendar._month_cache.clear()
+    yield
+    tracker._month_summary_cache.clear()
+    work_calendar._month_cache.clear()
+
+
+def _respond(sql, params):
+    if "FROM tfs_user u" in sql and "LEFT JOIN user_monthly_tracker" in sql:
+        return [
+            {"user_id": 1, "user_name": "Asha", "team_id": None, "month_year": "Jan2025",
+             "user_monthly_tracker_id": 11, "monthly_target": Decimal("100"), "extra_assigned_hours": Decimal("10"),
+             "working_days": 23},
+            {"user_id": 2, "user_name": "Ravi", "team_id": None, "month_year": "Jan2025",
+             "user_monthly_tracker_id": None, "monthly_target": 0, "extra_assigned_hours": 0, "working_days": None},
+        ]
+    if "GROUP BY twt.user_id" in sql:
+        return [{"user_id": 1, "billable": 42.123456, "last_work_date": "2025-01-30"}]
+    if "SELECT twt.user_id, LEFT(twt.date_time, 10)" in sql:
+        # (user_id, work_date, production, tenure_target)
+        return [(1, "2025-01-02", 30, 40), (1, "2025-01-02", 10, 20), (1, "2025-01-03", 20, 40)]
+    return []
+
+
+def test_month_summary_groups_per_user_in_sql(fake_cursor):
+    cursor = fake_cursor(_respond)
+
+    rows = tracker.compute_month_summary(cursor, [2, 1, 1], "Jan2025")
+
+    assert [r["user_id"] for r in rows] == [1, 2]
+    first = rows[0]
+    assert first["total_billable_hours_month"] == Decimal("42.1235")
+    assert first["monthly_total_target"] == Decimal("110")
+    assert first["pending_days"] == 0  # past month
+    assert first["daily_required_hours"] is None
+    assert rows[1]["pending_days"] is None  # no target row
+
+    scans = [sql for sql, _ in cursor.executed if "FROM task_work_tracker" in sql]
+    assert len(scans) == 1 and "SUM(" in scans[0]
+
+    # second call is served from the per-user cache
+    cursor.executed.clear()
+    tracker.compute_month_summary(cursor, [1, 2], "Jan2025")
+    assert cursor.executed == []
+
+
+def test_daily_rows_python_streams_rows_into_numpy(fake_cursor, fake_connection):
+    cursor = fake_cursor(_respond)
+    conn = fake_connection(cursor)
+
+    rows = tracker._daily_rows_python(conn, cursor, "WHERE twt.is_active != 0", [], "Jan2025")
+
+    assert [r["work_date"] for r in rows] == [date(2025, 1, 3), date(2025, 1, 2)]
+    assert rows[1]["total_billable_hours_day"] == Decimal("1.2500")
+    assert rows[1]["trackers_count_day"] == 2
+    assert rows[0]["cumulative_billable_hours_till_day"] == Decimal("1.7500")
+    assert rows[0]["monthly_total_target"] == Decimal("110")
+
+
+def test_view_filters_the_month_by_string_range(app, monkeypatch, fake_cursor, fake_connection):
+    from utils import http_cache
+
+    cursor = fake_cursor(lambda sql, params: [])
+    conn = fake_connection(cursor)
+    monkeypatch.setattr(tracker, "get_db_connection", lambda *a, **k: conn)
+    monkeypatch.setattr(http_cache, "data_versions_of", lambda names: ("v", "primary"))
+    monkeypatch.setattr(tracker, "get_role_context", lambda cursor, user_id: {"user_role_name": "admin"})
+    app.register_blueprint(tracker.tracker_bp, url_prefix="/tracker")
+
+    resp = app.test_client().post("/tracker/view", json={"logged_in_user_id": 1, "month_year": "feb2026"})
+
+    assert resp.status_code == 200, resp.get_json()
+    sql, params = next((sql, p) for sql, p in cursor.executed if "FROM task_work_tracker twt" in sql)
+    assert "twt.date_time >= %s AND twt.date_time < %s" in sql
+    assert "YEAR(" not in sql and "MONTH(" not in sql
+    assert params[:2] == ("2026-02-01 00:00:00", "2026-03-01 00:00:00")
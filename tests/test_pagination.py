@@ -0,0 +1,106 @@
+import pytest
+
+from utils import pagination
+
+
+def test_cursor_round_trip():
+    token = pagination.encode_cursor(12345)
+    assert "=" not in token
+    assert pagination.decode_cursor(token) == 12345
+    assert pagination.encode_cursor(None) is None
+
+
+def test_decode_cursor_accepts_plain_ids_and_empty():
+    assert pagination.decode_cursor("42") == 42
+    assert pagination.decode_cursor(7) == 7
+    assert pagination.decode_cursor("") is None
+    assert pagination.decode_cursor(None) is None
+
+
+def test_decode_cursor_rejects_garbage():
+    with pytest.raises(ValueError):
+        pagination.decode_cursor("not-a-cursor!")
+
+
+def test_is_paginated_is_opt_in():
+    assert not pagination.is_paginated({})
+    assert not pagination.is_paginated({"limit": "", "cursor": None})
+    assert pagination.is_paginated({"limit": 10})
+    assert pagination.is_paginated({"cursor": "abc"})
+
+
+def test_get_page_params_limit():
+    assert pagination.get_page_params({}) == (pagination.DEFAULT_PAGE_LIMIT, None)
+    assert pagination.get_page_params({"limit": 0}, default_limit=20) == (20, None)
+    assert pagination.get_page_params({"limit": pagination.MAX_PAGE_LIMIT})[0] == pagination.MAX_PAGE_LIMIT
+    assert pagination.get_page_params({"limit": "5", "cursor": "9"}) == (5, 9)
+
+
+@pytest.mark.parametrize("limit", [-5, pagination.MAX_PAGE_LIMIT + 1, 10_000])
+def test_get_page_params_rejects_out_of_range_limit(limit):
+    with pytest.raises(ValueError, match="between 1 and"):
+        pagination.get_page_params({"limit": limit})
+
+
+def test_get_page_params_rejects_non_numeric_limit():
+    with pytest.raises(ValueError):
+        pagination.get_page_params({"limit": "ten"})
+
+
+def test_keyset_clause():
+    params = []
+    assert pagination.keyset_clause("t.task_id", None, params) == ""
+    assert params == []
+    assert pagination.keyset_clause("t.task_id", 50, params) == " AND t.task_id < %s"
+    assert pagination.keyset_clause("t.task_id", 50, params, descending=False) == " AND t.task_id > %s"
+    assert params == [50, 50]
+
+
+def test_page_result_uses_extra_row_for_has_more():
+    rows = [{"id": i} for i in (9, 8, 7)]
+    page = pagination.page_result(rows, 2, "id")
+    assert page["rows"] == [{"id": 9}, {"id": 8}]
+    assert page["has_more"] is True
+    assert pagination.decode_cursor(page["next_cursor"]) == 8
+
+    last = pagination.page_result(rows[:2], 2, "id")
+    assert last["has_more"] is False
+    assert last["next_cursor"] is None
+
+
+def test_cached_total(fake_cursor):
+    pagination._count_cache.clear()
+    cursor = fake_cursor([{"total": 12}], [{"total": 13}])
+    sql = "SELECT COUNT(*) AS total FROM task WHERE project_id=%s"
+
+    assert pagination.cached_total(cursor, sql, [1], version="v1") == (12, True)
+    assert pagination.cached_total(cursor, sql, [1], version="v1") == (12, False)
+    assert pagination.cached_total(cursor, sql, [1], version="v1", exact=True) == (13, True)
+    assert len(cursor.executed) == 2
+
+
+def test_pmt_total_follows_project_changes(app, monkeypatch, fake_cursor, fake_connection):
+    from routes import project_monthly_tracker as pmt
+    from utils import data_versions
+
+    pagination._count_cache.clear()
+    cursor = fake_cursor(lambda sql, params: [{"total": 5}] if "COUNT(*)" in sql else [])
+    conn = fake_connection(cursor)
+    monkeypatch.setattr(pmt, "get_db_connection", lambda *a, **k: conn)
+    app.register_blueprint(pmt.project_monthly_tracker_bp, url_prefix="/pmt")
+    client = app.test_client()
+
+    def counts():
+        return sum(1 for sql, _ in cursor.executed if "COUNT(*)" in sql)
+
+    body = {"project_name": "Atlas"}
+    assert client.post("/pmt/list", json=body).get_json()["data"]["total_is_exact"] is True
+    assert client.post("/pmt/list", json=body).get_json()["data"]["total_is_exact"] is False
+    assert counts() == 1
+
+    # a renamed project can change what the name search counts
+    data_versions.bump("project", 1)
+    assert client.post("/pmt/list", json=body).get_json()["data"]["total_is_exact"] is True
+    assert counts() == 2
+
+    assert client.post("/pmt/list", json={"limit": pagination.MAX_PAGE_LIMIT + 1}).status_code == 400
@@ -0,0 +1,37 @@
+import pytest
+
+from routes import project
+
+
+@pytest.mark.parametrize("value, ids", [
+    (78, [78]),
+    ("78", [78]),
+    ("78,81", [78, 81]),
+    (" 78 , 81 ", [78, 81]),
+    ("[78]", [78]),
+    ('["78","81"]', [78, 81]),
+    ("[78, 81]", [78, 81]),
+    ([78, "81", "82,83"], [78, 81, 82, 83]),
+    ("", []),
+    (None, []),
+    ("abc", []),
+])
+def test_int_ids_accepts_legacy_forms(value, ids):
+    assert project._int_ids(value) == ids
+
+
+def test_sync_project_members_keeps_csv_and_bracketed_managers(fake_cursor, fake_connection):
+    cursor = fake_cursor([{"user_id": 4}])
+    fake_connection(cursor)
+
+    affected = project.sync_project_members(cursor, 10, "[5]", '["6","7"]', "8,9", [])
+
+    inserts = [params for sql, params in cursor.executed if sql.startswith("INSERT INTO project_member")]
+    assert sorted(inserts) == [
+        (10, 5, "manager"),
+        (10, 6, "asst_manager"),
+        (10, 7, "asst_manager"),
+        (10, 8, "team"),
+        (10, 9, "team"),
+    ]
+    assert affected == {4, 5, 6, 7, 8, 9}
@@ -0,0 +1,48 @@
+import pytest
+
+import config
+from utils import tenure_recalc
+
+
+@pytest.fixture
+def job_run(monkeypatch, fake_cursor, fake_connection):
+    chunks = [{"upto": 12, "n": 2}, {"upto": None, "n": 0}]
+
+    def respond(sql, params):
+        if "SELECT * FROM tenure_recalc_job" in sql:
+            return [{"job_id": 1, "user_id": 5, "user_tenure": 0.8, "last_tracker_id": 0, "processed_rows": 0}]
+        if "SELECT MAX(tracker_id)" in sql:
+            return [chunks.pop(0)]
+        return []
+
+    cursor = fake_cursor(respond)
+    conn = fake_connection(cursor)
+    monkeypatch.setattr(config, "get_db_connection", lambda *a, **k: conn)
+    return conn, cursor
+
+
+def test_run_job_applies_chunks_and_finishes(job_run):
+    conn, cursor = job_run
+
+    tenure_recalc.run_job(1)
+
+    statements = [sql for sql, _ in cursor.executed]
+    assert not any("status='failed'" in sql for sql in statements)
+    assert any("status='done'" in sql for sql in statements)
+    tracker_updates = [p for sql, p in cursor.executed if "UPDATE task_work_tracker" in sql]
+    assert len(tracker_updates) == 1
+    assert tracker_updates[0][-3:] == (5, 0, 12)
+    # claim, one chunk, done
+    assert conn.commits == 3
+    assert conn.closed
+
+
+def test_create_job_does_not_commit(fake_cursor, fake_connection):
+    cursor = fake_cursor([], [{"total": 40}], [])
+    conn = fake_connection(cursor)
+    cursor.lastrowid = 7
+
+    assert tenure_recalc.create_job(cursor, 5, "0.8") == 7
+    assert conn.commits == 0
+    assert "status='superseded'" in cursor.executed[0][0]
+    assert cursor.executed[2][1][:3] == (5, 0.8, 40)
@@ -0,0 +1,48 @@
+import pytest
+
+from routes import user_monthly_tracker as umt
+
+
+@pytest.fixture
+def client(app, monkeypatch, fake_cursor, fake_connection):
+    def respond(sql, params):
+        if "FROM tfs_user WHERE user_id IN" in sql:
+            return [{"user_id": 5, "team_id": 3}]  # user 6 is inactive
+        return []
+
+    cursor = fake_cursor(respond)
+    conn = fake_connection(cursor)
+    monkeypatch.setattr(umt, "get_db_connection", lambda *a, **k: conn)
+
+    app.register_blueprint(umt.user_monthly_tracker_bp, url_prefix="/user_monthly_tracker")
+    c = app.test_client()
+    c.conn, c.cursor = conn, cursor
+    return c
+
+
+def test_bulk_upsert_reads_and_writes_in_one_transaction(client):
+    resp = client.post("/user_monthly_tracker/bulk_upsert", json={"targets": [
+        {"user_id": 5, "month_year": "jan2026", "monthly_target": "160"},
+        {"user_id": 6, "month_year": "JAN2026", "monthly_target": "160", "working_days": 20},
+    ]})
+
+    assert resp.status_code == 200, resp.get_json()
+    body = resp.get_json()["data"]
+    assert body["saved"] == 1
+    assert body["errors"] == [{"row": 2, "error": "User not found or inactive"}]
+    assert client.conn.commits == 1
+    assert client.conn.rollbacks == 0
+    upserts = [p for sql, p in client.cursor.executed if "INSERT INTO user_monthly_tracker" in sql]
+    assert len(upserts) == 1
+    assert upserts[0][:3] == (5, "JAN2026", 202601)
+    assert upserts[0][5] > 0  # working_days from the team calendar
+
+
+def test_bulk_upsert_without_valid_rows_rolls_back(client):
+    resp = client.post("/user_monthly_tracker/bulk_upsert", json={"targets": [
+        {"user_id": 6, "month_year": "JAN2026", "monthly_target": "160", "working_days": 20},
+    ]})
+
+    assert resp.status_code == 400
+    assert client.conn.commits == 0
+    assert client.conn.rollbacks == 1
@@ -0,0 +1,109 @@
+from array import array
+from datetime import date
+
+import pytest
+
+from utils import work_calendar
+
+
+def test_month_yyyymm():
+    assert work_calendar.month_yyyymm("JAN2026") == 202601
+    assert work_calendar.month_yyyymm(" Dec2025 ") == 202512
+    assert work_calendar.month_yyyymm("2026-01") is None
+    assert work_calendar.month_yyyymm(None) is None
+
+
+def test_month_range_and_bounds():
+    assert work_calendar.month_range(202602) == (date(2026, 2, 1), date(2026, 2, 28))
+    assert work_calendar.month_range(202802) == (date(2028, 2, 1), date(2028, 2, 29))
+    assert work_calendar.month_datetime_bounds(202512) == ("2025-12-01 00:00:00", "2026-01-01 00:00:00")
+
+
+def test_parse_weekend_days():
+    assert work_calendar.parse_weekend_days("6,5,5") == (5, 6)
+    assert work_calendar.parse_weekend_days("0, 7, x") == (0,)
+    assert work_calendar.parse_weekend_days(None) == ()
+
+
+def _days(*dates):
+    return array("i", sorted(d.toordinal() for d in dates))
+
+
+def test_count_working_days_minus_leave_on_working_days():
+    days = _days(date(2026, 1, 1), date(2026, 1, 2), date(2026, 1, 5), date(2026, 1, 6))
+    # 2026-01-03 is not a working day, so that leave does not count
+    leaves = _days(date(2026, 1, 3), date(2026, 1, 5))
+    assert work_calendar.count_working_days(days, date(2026, 1, 1), date(2026, 1, 31)) == 4
+    assert work_calendar.count_working_days(days, date(2026, 1, 1), date(2026, 1, 31), leaves) == 3
+    assert work_calendar.count_working_days(days, date(2026, 1, 2), date(2026, 1, 5)) == 2
+    assert work_calendar.count_working_days(days, date(2026, 1, 6), date(2026, 1, 1)) == 0
+
+
+def test_working_days_after():
+    days = _days(date(2026, 1, 1), date(2026, 1, 2), date(2026, 1, 5))
+    assert work_calendar.working_days_after(days, date(2026, 1, 1), date(2026, 1, 31)) == 2
+    assert work_calendar.working_days_after(days, date(2026, 1, 5), date(2026, 1, 31)) == 0
+
+
+def test_get_working_days_skips_weekends_and_holidays(fake_cursor):
+    cursor = fake_cursor(
+        [{"weekend_days": "5,6"}],
+        [{"holiday_date": date(2026, 1, 26)}],
+    )
+    # team id unlikely to be cached by other tests
+    days = work_calendar.get_working_days(cursor, 202601, team_id=987654)
+
+    assert len(days) == 21  # 22 weekdays in January 2026, minus one holiday
+    assert date(2026, 1, 26).toordinal() not in days
+    assert date(2026, 1, 3).toordinal() not in days  # Saturday
+
+    # second call is served from the month cache
+    assert work_calendar.get_working_days(cursor, 202601, team_id=987654) is days
+    assert len(cursor.executed) == 2
+
+
+def test_get_user_leaves_groups_by_user(fake_cursor):
+    cursor = fake_cursor([
+        {"user_id": 1, "leave_date": date(2026, 1, 5)},
+        {"user_id": 1, "leave_date": date(2026, 1, 6)},
+        {"user_id": 2, "leave_date": date(2026, 1, 7)},
+    ])
+    leaves = work_calendar.get_user_leaves(cursor, [2, 1, 1], 202601)
+
+    assert list(leaves[1]) == [date(2026, 1, 5).toordinal(), date(2026, 1, 6).toordinal()]
+    assert list(leaves[2]) == [date(2026, 1, 7).toordinal()]
+    assert cursor.executed[0][1][2:] == (1, 2)
+    assert work_calendar.get_user_leaves(cursor, [], 202601) == {}
+
+
+@pytest.mark.parametrize("path, body, field", [
+    ("/holiday/add", {"holiday_date": "2026-01-26", "team_id": "abc"}, "team_id"),
+    ("/holiday/list", {"team_id": "1x"}, "team_id"),
+    ("/weekend/set", {"team_id": "abc", "weekend_days": [5, 6]}, "team_id"),
+    ("/leave/add", {"user_id": "abc", "leave_dates": "2026-01-05"}, "user_id"),
+    ("/leave/delete", {"user_id": "abc", "leave_dates": "2026-01-05"}, "user_id"),
+    ("/month", {"month_year": "JAN2026", "user_id": "abc"}, "user_id"),
+])
+def test_routes_reject_non_numeric_ids_before_db(app, monkeypatch, path, body, field):
+    from routes import work_calendar as routes
+
+    def no_db(*a, **k):
+        raise AssertionError("no DB call expected")
+
+    monkeypatch.setattr(routes, "get_db_connection", no_db)
+    app.register_blueprint(routes.work_calendar_bp, url_prefix="/work_calendar")
+
+    resp = app.test_client().post(f"/work_calendar{path}", json=body)
+
+    assert resp.status_code == 400
+    assert field in resp.get_json()["message"]
+
+
+def test_holiday_list_rejects_bad_year(app, monkeypatch):
+    from routes import work_calendar as routes
+
+    monkeypatch.setattr(routes, "get_db_connection", lambda *a, **k: None)
+    app.register_blueprint(routes.work_calendar_bp, url_prefix="/work_calendar")
+
+    resp = app.test_client().post("/work_calendar/holiday/list", json={"year": "20x6"})
+    assert resp.status_code == 400
@@ -1,8 +1,9 @@
-from config import get_db_connection
+from utils.db_router import primary_connection
 from datetime import datetime
 
 def log_api_call(api_name, user_id, device_id, device_type, api_call_time=None):
-    conn = get_db_connection()
+    # always the primary, also from read-only (replica) routes; not a read-your-writes trigger
+    conn = primary_connection()
     cursor = conn.cursor()
     try:
         if api_call_time is None:
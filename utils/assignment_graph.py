@@ -0,0 +1,128 @@
+import hashlib
+import json
+
+from utils.cache import TTLCache
+from utils import data_versions
+
+# Per-user "projects -> tasks" graph used by the tracker entry form.
+# Stored compact: ((project_id, project_name, ((task_id, task_name, task_target), ...)), ...)
+# Entries are keyed on the user's assignment version, so a membership change
+# only rebuilds the graphs of the users it touched.
+
+ASSIGNMENT_CACHE_TTL = 600
+_graph_cache = TTLCache(ttl_seconds=ASSIGNMENT_CACHE_TTL, max_entries=5000)
+
+# role -> project_member.member_role
+ROLE_MEMBER_SCOPE = {
+    "qa": "qa",
+    "project manager": "manager",
+    "manager": "manager",
+    "assistant manager": "asst_manager",
+    "agent": "team",
+}
+ADMIN_ROLES = ("admin", "super admin")
+
+
+def invalidate_users(user_ids):
+    """Call after commit when project/task membership changed for these users"""
+    ids = {int(u) for u in (user_ids or []) if str(u).strip().isdigit()}
+    if ids:
+        data_versions.bump_many("assignment", ids)
+    else:
+        data_versions.bump("assignment")
+
+
+def _version_for(user_id: int, role: str) -> int:
+    # admins see every project, so any change anywhere invalidates them
+    if role in ADMIN_ROLES:
+        return data_versions.get("assignment")
+    return data_versions.get("assignment", user_id)
+
+
+def _build(cursor, user_id: int, role: str, assigned_only: bool):
+    params = []
+    member_join = ""
+    task_filter = ""
+
+    if assigned_only:
+        member_join = """
+            JOIN project_member pm
+              ON pm.project_id = p.project_id AND pm.user_id = %s AND pm.member_role = 'team'
+        """
+        params.append(user_id)
+        task_filter = " AND EXISTS (SELECT 1 FROM task_team tt WHERE tt.task_id = t.task_id AND tt.user_id = %s)"
+    elif role not in ADMIN_ROLES:
+        member_join = """
+            JOIN project_member pm
+              ON pm.project_id = p.project_id AND pm.user_id = %s AND pm.member_role = %s
+        """
+        params.extend([user_id, ROLE_MEMBER_SCOPE.get(role, "team")])
+        if role == "agent":
+            task_filter = " AND EXISTS (SELECT 1 FROM task_team tt WHERE tt.task_id = t.task_id AND tt.user_id = %s)"
+
+    task_params = [user_id] if task_filter else []
+
+    cursor.execute(
+        f"""
+        SELECT
+            p.project_id,
+            p.project_name,
+            t.task_id,
+            t.task_name,
+            t.task_target
+        FROM project p
+        {member_join}
+        LEFT JOIN task t
+            ON t.project_id = p.project_id
+            AND t.is_active = 1
+            {task_filter}
+        WHERE p.is_active = 1
+        ORDER BY p.project_name, t.task_name
+        """,
+        tuple(params + task_params),
+    )
+
+    projects = {}
+    order = []
+    for row in cursor.fetchall():
+        pid = row["project_id"]
+        if pid not in projects:
+            projects[pid] = (row["project_name"], [])
+            order.append(pid)
+        if row.get("task_id"):
+            projects[pid][1].append((row["task_id"], row["task_name"], row["task_target"]))
+
+    return tuple((pid, projects[pid][0], tuple(projects[pid][1])) for pid in order)
+
+
+def to_dropdown(graph) -> list[dict]:
+    """Compact graph -> response shape of dropdown 'projects with tasks'"""
+    return [
+        {
+            "project_id": pid,
+            "project_name": name,
+            "tasks": [{"task_id": tid, "label": label, "task_target": target} for tid, label, target in tasks],
+        }
+        for pid, name, tasks in graph
+    ]
+
+
+def get_assignment_graph(cursor, user_id: int, role: str, assigned_only: bool = False):
+    """
+    Returns (graph, etag); etag is the bare tag, sent as a weak ETag.
+    assigned_only=True: projects/tasks the user is a team member of (ignores role).
+    """
+    user_id = int(user_id)
+    role = (role or "").strip().lower()
+    version = _version_for(user_id, role)
+    key = (user_id, "assigned" if assigned_only else role, version)
+
+    cached = _graph_cache.get(key)
+    if cached is not None:
+        return cached
+
+    graph = _build(cursor, user_id, role, assigned_only)
+    digest = hashlib.sha1(json.dumps(graph, default=str).encode()).hexdigest()[:16]
+    value = (graph, f"ag-{digest}")
+    _graph_cache.set(key, value)
+    return value
@@ -0,0 +1,169 @@
+from functools import wraps
+
+from flask import request, g
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+
+from config import AUTH_SECRET_KEY, AUTH_TOKEN_TTL_SECONDS, AUTH_TOKEN_SCOPE_VERSION
+from utils.response import api_response
+
+# Signed login token: {"user_id", "role_id", "role", "sv"} as of login, checked by
+# signature, expiry and scope version only (no DB access).
+#
+# It is a lookup shortcut, not an authorization boundary: routes still take
+# logged_in_user_id from the body and use the token only when it belongs to that user.
+# A role change reaches the token at the next login (AUTH_TOKEN_TTL_SECONDS at most);
+# bumping AUTH_TOKEN_SCOPE_VERSION invalidates every issued token at once.
+
+AUTH_SALT = "tfshrms-auth"
+serializer = URLSafeTimedSerializer(AUTH_SECRET_KEY)
+
+
+def issue_token(user_id: int, role_id, role_name: str) -> str:
+    payload = {
+        "user_id": int(user_id),
+        "role_id": role_id,
+        "role": (role_name or "").strip().lower(),
+        "sv": AUTH_TOKEN_SCOPE_VERSION,
+    }
+    return serializer.dumps(payload, salt=AUTH_SALT)
+
+
+def load_token(token: str) -> dict:
+    """Raises SignatureExpired / BadSignature (also for tokens of an older scope version)"""
+    payload = serializer.loads(token, salt=AUTH_SALT, max_age=AUTH_TOKEN_TTL_SECONDS)
+    if not isinstance(payload, dict) or payload.get("sv") != AUTH_TOKEN_SCOPE_VERSION:
+        raise SignatureExpired("Token scope version is outdated", payload=payload)
+    return payload
+
+
+def _token_from_request() -> str | None:
+    header = request.headers.get("Authorization") or ""
+    if header.lower().startswith("bearer "):
+        return header[7:].strip() or None
+    return request.headers.get("X-Auth-Token") or None
+
+
+def auth_context(required: bool = False):
+    """
+    Route decorator: verifies the login token (signature + expiry + scope version, no DB)
+    and exposes it as g.auth = {"user_id", "role_id", "role", "sv"}.
+
+    required=False keeps old clients working: no token -> g.auth is None.
+    A token that is present but invalid is always rejected.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            g.auth = None
+            token = _token_from_request()
+
+            if not token:
+                if required:
+                    return api_response(401, "Authorization token is required")
+                return fn(*args, **kwargs)
+
+            try:
+                payload = load_token(token)
+            except SignatureExpired:
+                return api_response(401, "Token expired")
+            except BadSignature:
+                return api_response(401, "Invalid token")
+
+            g.auth = payload
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_auth_context(user_id=None) -> dict | None:
+    """
+    Token context for the current request, or None.
+    When user_id is given, only returns the context if it belongs to that user.
+    """
+    auth = g.get("auth")
+    if not auth:
+        return None
+
+    if user_id is not None:
+        try:
+            if int(user_id) != int(auth.get("user_id")):
+                return None
+        except (TypeError, ValueError):
+            return None
+
+    return auth
+
+
+_agent_role_id = None
+
+
+def get_agent_role_id(cursor):
+    """role_id of 'agent' (static lookup, cached per process)"""
+    global _agent_role_id
+    if _agent_role_id is None:
+        cursor.execute(
+            """
+            SELECT role_id
+            FROM user_role
+            WHERE LOWER(TRIM(role_name)) = 'agent'
+            LIMIT 1
+            """
+        )
+        row = cursor.fetchone() or {}
+        _agent_role_id = row.get("role_id")
+    return _agent_role_id
+
+
+def role_context_from_token(cursor, user_id) -> dict | None:
+    """
+    Same shape as get_role_context(), built from the token.
+    None when the request has no usable token for user_id.
+    """
+    auth = get_auth_context(user_id)
+    if not auth:
+        return None
+    return {
+        "user_role_id": auth.get("role_id"),
+        "user_role_name": auth.get("role") or "",
+        "agent_role_id": get_agent_role_id(cursor),
+    }
+
+
+# fallback when the request has no usable token
+ROLE_CONTEXT_SQL = """
+    SELECT
+        u.role_id AS user_role_id,
+        r.role_name AS user_role_name,
+        (
+            SELECT ur2.role_id
+            FROM user_role ur2
+            WHERE LOWER(TRIM(ur2.role_name)) = 'agent'
+            LIMIT 1
+        ) AS agent_role_id
+    FROM tfs_user u
+    JOIN user_role r ON r.role_id = u.role_id
+    WHERE u.user_id=%s AND u.is_active=1 AND u.is_delete=1
+"""
+
+
+def get_role_context(cursor, user_id: int) -> dict:
+    """
+    Returns:
+      {
+        "user_role_id": int|None,
+        "user_role_name": str,
+        "agent_role_id": int|None
+      }
+    From the login token when usable, otherwise one DB lookup (cursor(dictionary=True)).
+    """
+    ctx = role_context_from_token(cursor, user_id)
+    if ctx:
+        return ctx
+
+    cursor.execute(ROLE_CONTEXT_SQL, (int(user_id),))
+    row = cursor.fetchone() or {}
+    return {
+        "user_role_id": row.get("user_role_id"),
+        "user_role_name": (row.get("user_role_name") or "").strip().lower(),
+        "agent_role_id": row.get("agent_role_id"),
+    }
@@ -0,0 +1,104 @@
+import numpy as np
+from decimal import Decimal
+
+# Single definition of billable hours:
+#   billable = production / tenure_target   (0 when tenure_target is 0 / NULL)
+# Row, daily, cumulative and monthly numbers all come from here so /view_daily,
+# the month summary and stored task_work_tracker.billable_hours agree. SQL aggregates
+# use billable_sql(), the same formula as a column expression.
+#
+# Batch functions take parallel arrays (one entry per tracker row) and group with
+# a stable sort + np.add.reduceat, so a whole month is a handful of vector ops.
+
+BILLABLE_DECIMALS = 4
+
+
+def billable_hours(production, tenure_target) -> float:
+    """Scalar version for a single tracker row (add / update)"""
+    production = float(production or 0)
+    tenure_target = float(tenure_target or 0)
+    return production / tenure_target if tenure_target else 0.0
+
+
+def billable_sql(production: str = "twt.production", tenure_target: str = "twt.tenure_target") -> str:
+    """billable_hours() as a SQL expression over the given columns (for SUM(...) etc.)"""
+    return f"COALESCE({production} / NULLIF({tenure_target}, 0), 0)"
+
+
+def to_decimal(value) -> Decimal:
+    """float -> Decimal rounded like the SQL ROUND(..., 4) it replaces"""
+    return Decimal(f"{float(value):.{BILLABLE_DECIMALS}f}")
+
+
+def tracker_columns(rows) -> dict:
+    """
+    Tracker rows as tuples (user_id, work_date 'YYYY-MM-DD', production, tenure_target),
+    e.g. utils.db.stream(..., row="tuple")
+    -> {"user_id": int64, "day": datetime64[D], "production": float64, "tenure_target": float64}
+    """
+    rows = list(rows)
+    n = len(rows)
+    return {
+        "user_id": np.fromiter((int(r[0]) for r in rows), dtype=np.int64, count=n),
+        "day": np.array([str(r[1])[:10] for r in rows], dtype="datetime64[D]"),
+        "production": np.fromiter((float(r[2] or 0) for r in rows), dtype=np.float64, count=n),
+        "tenure_target": np.fromiter((float(r[3] or 0) for r in rows), dtype=np.float64, count=n),
+    }
+
+
+def row_billable(production: np.ndarray, tenure_target: np.ndarray) -> np.ndarray:
+    out = np.zeros(len(production), dtype=np.float64)
+    np.divide(production, tenure_target, out=out, where=tenure_target != 0)
+    return out
+
+
+def _group_starts(*keys: np.ndarray) -> np.ndarray:
+    """Start index of every run of equal keys (arrays already sorted by those keys)"""
+    n = len(keys[0])
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    change = np.zeros(n, dtype=bool)
+    change[0] = True
+    for k in keys:
+        change[1:] |= k[1:] != k[:-1]
+    return np.flatnonzero(change)
+
+
+def daily_metrics(cols: dict) -> dict:
+    """
+    Per (user, day), ordered by user then day:
+      user_id, day, production, billable, rows, cumulative_billable (running per user)
+    """
+    if len(cols["user_id"]) == 0:
+        return {
+            "user_id": np.zeros(0, dtype=np.int64),
+            "day": np.zeros(0, dtype="datetime64[D]"),
+            "production": np.zeros(0),
+            "billable": np.zeros(0),
+            "rows": np.zeros(0, dtype=np.int64),
+            "cumulative_billable": np.zeros(0),
+        }
+
+    order = np.lexsort((cols["day"], cols["user_id"]))
+    users = cols["user_id"][order]
+    days = cols["day"][order]
+    billable = row_billable(cols["production"], cols["tenure_target"])[order]
+
+    starts = _group_starts(users, days)
+    day_users = users[starts]
+    day_billable = np.add.reduceat(billable, starts)
+
+    # running total per user = global cumsum minus the total before the user's first day
+    cumulative = np.cumsum(day_billable)
+    user_starts = _group_starts(day_users)
+    user_sizes = np.diff(np.append(user_starts, len(day_users)))
+    offsets = np.repeat(cumulative[user_starts] - day_billable[user_starts], user_sizes)
+
+    return {
+        "user_id": day_users,
+        "day": days[starts],
+        "production": np.add.reduceat(cols["production"][order], starts),
+        "billable": day_billable,
+        "rows": np.diff(np.append(starts, len(users))),
+        "cumulative_billable": cumulative - offsets,
+    }
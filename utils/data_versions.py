@@ -0,0 +1,38 @@
+import threading
+import time
+
+# In-process change counters, e.g. ("tracker", user_id) -> 7
+# Writers bump after commit; readers use them as cache keys / ETag parts.
+# NOTE: per worker process; caches built on these must also use a TTL.
+
+_versions = {}
+_lock = threading.Lock()
+_started_at = int(time.time())
+
+
+def bump(namespace: str, key=None) -> int:
+    with _lock:
+        k = (namespace, key)
+        _versions[k] = _versions.get(k, 0) + 1
+        # namespace-wide counter too (for "anything in this table changed")
+        if key is not None:
+            _versions[(namespace, None)] = _versions.get((namespace, None), 0) + 1
+        return _versions[k]
+
+
+def bump_many(namespace: str, keys) -> None:
+    for key in set(keys or []):
+        if key is not None:
+            bump(namespace, key)
+
+
+def get(namespace: str, key=None) -> int:
+    with _lock:
+        return _versions.get((namespace, key), 0)
+
+
+def token(*namespaces: str) -> str:
+    """Compact version string across namespaces (process start + counters)"""
+    with _lock:
+        parts = [str(_versions.get((ns, None), 0)) for ns in namespaces]
+    return f"{_started_at}-" + "-".join(parts)
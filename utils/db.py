@@ -0,0 +1,75 @@
+from collections import namedtuple
+
+# Small data-access helpers on top of mysql.connector connections.
+# Adoptable route by route; routes keep owning conn/cursor lifetime.
+#
+#   stream: unbuffered cursor, rows fetched in batches (large reads / exports)
+#   query:  plain fetch on an existing cursor(dictionary=False)
+#
+# Row modes: "dict" (same shape as cursor(dictionary=True)), "tuple", "named" (namedtuple)
+# All statements use %s placeholders like the rest of the code.
+#
+# No prepared-statement cache: every request checks out a fresh pooled connection and the
+# pool resets the session on return, so a prepared statement never got a second execute.
+
+ROW_MODES = ("dict", "tuple", "named")
+STREAM_BATCH_SIZE = 1000
+
+_named_types = {}
+
+
+def _named_type(columns):
+    key = tuple(columns)
+    row_type = _named_types.get(key)
+    if row_type is None:
+        row_type = namedtuple("Row", key, rename=True)
+        _named_types[key] = row_type
+    return row_type
+
+
+def _row_converter(columns, mode: str):
+    if mode not in ROW_MODES:
+        raise ValueError(f"row mode must be one of {ROW_MODES}")
+    if mode == "tuple":
+        return tuple
+    if mode == "named":
+        row_type = _named_type(columns)
+        return lambda r: row_type(*r)
+    cols = tuple(columns)
+    return lambda r: dict(zip(cols, r))
+
+
+# ---------------- STREAMING READS ---------------- #
+def stream(conn, sql: str, params=(), row: str = "tuple", batch_size: int = STREAM_BATCH_SIZE):
+    """
+    Generator over an unbuffered cursor. Rows are pulled from the server batch by batch,
+    so memory stays flat for big result sets.
+    NOTE: consume fully (or close the generator) before running another query on conn.
+    """
+    cursor = conn.cursor(buffered=False)
+    try:
+        cursor.execute(sql, tuple(params))
+        convert = _row_converter(cursor.column_names, row)
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            for r in batch:
+                yield convert(r)
+    finally:
+        # drain anything left so the connection is usable again
+        try:
+            cursor.fetchall()
+        except Exception:
+            pass
+        cursor.close()
+
+
+def query(cursor, sql: str, params=(), row: str = "dict") -> list:
+    """Plain fetch in tuple/named mode on an existing cursor(dictionary=False)"""
+    cursor.execute(sql, tuple(params))
+    rows = cursor.fetchall()
+    if row == "tuple":
+        return rows
+    convert = _row_converter(cursor.column_names, row)
+    return [convert(r) for r in rows]
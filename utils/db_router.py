@@ -0,0 +1,267 @@
+import os
+import threading
+import time
+from functools import wraps
+
+import mysql.connector
+from mysql.connector import pooling
+from mysql.connector.errors import PoolError
+
+from utils.cache import TTLCache
+
+# Primary / read-replica routing behind config.get_db_connection().
+#
+#  - separate connection pools for primary and replica (direct connect when a pool is full)
+#  - routes marked @read_only_route read from the replica ...
+#  - ... unless it lags more than DB_REPLICA_MAX_LAG_SECONDS, is unreachable,
+#    or the requesting user wrote within DB_READ_YOUR_WRITES_SECONDS
+#  - an unreachable replica is not connected to again for DB_REPLICA_RETRY_SECONDS,
+#    a lagging one not before its next lag check (no connect timeout per request)
+#  - without DB_REPLICA_HOST everything goes to the primary (old behaviour)
+#
+# Replica lag is read with SHOW REPLICA STATUS (needs REPLICATION CLIENT); if it cannot
+# be read the replica is treated as lagging. Lag and recent writers are per process.
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_REPLICA_POOL_SIZE = int(os.getenv("DB_REPLICA_POOL_SIZE", str(DB_POOL_SIZE)))
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+DB_REPLICA_LAG_CHECK_SECONDS = float(os.getenv("DB_REPLICA_LAG_CHECK_SECONDS", "5"))
+DB_READ_YOUR_WRITES_SECONDS = int(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "30"))
+DB_REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+_replica_state = {"checked_at": 0.0, "healthy": False, "lag": None, "down": False}
+_replica_state_lock = threading.Lock()
+
+_recent_writers = TTLCache(ttl_seconds=DB_READ_YOUR_WRITES_SECONDS, max_entries=10000)
+
+
+def _primary_config() -> dict:
+    return {
+        "host": os.getenv("DB_HOST"),
+        "port": int(os.getenv("DB_PORT") or 3306),
+        "user": os.getenv("DB_USERNAME"),
+        "password": os.getenv("DB_PASSWORD"),
+        "database": os.getenv("DB_DATABASE"),
+    }
+
+
+def _replica_config() -> dict | None:
+    host = os.getenv("DB_REPLICA_HOST")
+    if not host:
+        return None
+    primary = _primary_config()
+    return {
+        "host": host,
+        "port": int(os.getenv("DB_REPLICA_PORT") or primary["port"]),
+        "user": os.getenv("DB_REPLICA_USERNAME") or primary["user"],
+        "password": os.getenv("DB_REPLICA_PASSWORD") or primary["password"],
+        "database": os.getenv("DB_REPLICA_DATABASE") or primary["database"],
+    }
+
+
+def replica_configured() -> bool:
+    return _replica_config() is not None
+
+
+def _get_pool(name: str, cfg: dict, size: int):
+    pool = _pools.get(name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(name)
+            if pool is None:
+                pool = pooling.MySQLConnectionPool(pool_name=f"tfs_{name}", pool_size=size, **cfg)
+                _pools[name] = pool
+    return pool
+
+
+def _connect(name: str, cfg: dict, size: int):
+    if size <= 0:
+        return mysql.connector.connect(**cfg)
+    try:
+        return _get_pool(name, cfg, size).get_connection()
+    except PoolError:
+        # pool exhausted: don't fail the request, use a short-lived direct connection
+        return mysql.connector.connect(**cfg)
+
+
+def primary_connection():
+    return _connect("primary", _primary_config(), DB_POOL_SIZE)
+
+
+def replica_connection():
+    return _connect("replica", _replica_config(), DB_REPLICA_POOL_SIZE)
+
+
+# ---------- replica lag
+
+def _read_replica_lag(conn):
+    """Seconds behind the source, None when replication is not running / not readable"""
+    cursor = conn.cursor(dictionary=True)
+    try:
+        for sql, col in (
+            ("SHOW REPLICA STATUS", "Seconds_Behind_Source"),
+            ("SHOW SLAVE STATUS", "Seconds_Behind_Master"),
+        ):
+            try:
+                cursor.execute(sql)
+                row = cursor.fetchone()
+                cursor.fetchall()
+            except mysql.connector.Error:
+                continue
+            if not row:
+                return None
+            return row.get(col)
+        return None
+    finally:
+        cursor.close()
+
+
+def replica_usable(conn) -> bool:
+    """Lag is checked at most every DB_REPLICA_LAG_CHECK_SECONDS per process"""
+    now = time.monotonic()
+    if now - _replica_state["checked_at"] < DB_REPLICA_LAG_CHECK_SECONDS:
+        return _replica_state["healthy"]
+
+    with _replica_state_lock:
+        if now - _replica_state["checked_at"] < DB_REPLICA_LAG_CHECK_SECONDS:
+            return _replica_state["healthy"]
+        try:
+            lag = _read_replica_lag(conn)
+        except Exception as e:
+            print("DB REPLICA LAG CHECK FAILED:", str(e))
+            lag = None
+        _replica_state["lag"] = lag
+        _replica_state["healthy"] = lag is not None and float(lag) <= DB_REPLICA_MAX_LAG_SECONDS
+        _replica_state["down"] = False
+        _replica_state["checked_at"] = now
+        return _replica_state["healthy"]
+
+
+def _mark_replica_down():
+    with _replica_state_lock:
+        _replica_state.update({"checked_at": time.monotonic(), "healthy": False, "lag": None, "down": True})
+
+
+def replica_backing_off() -> bool:
+    """Last check found the replica down / lagging and its retry window is still open"""
+    checked_at = _replica_state["checked_at"]
+    if not checked_at or _replica_state["healthy"]:
+        return False
+    window = DB_REPLICA_RETRY_SECONDS if _replica_state["down"] else DB_REPLICA_LAG_CHECK_SECONDS
+    return time.monotonic() - checked_at < window
+
+
+def replica_status() -> dict:
+    return {
+        "configured": replica_configured(),
+        "healthy": _replica_state["healthy"],
+        "lag_seconds": _replica_state["lag"],
+    }
+
+
+# ---------- request routing (read-only routes, read-your-writes)
+
+def read_only_route(fn):
+    """
+    Marks a Flask view as read-only: its get_db_connection() calls may use the replica.
+    Anything that writes inside such a view must ask for get_db_connection(read_only=False).
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        from flask import g
+        g.db_read_only = True
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def _request_user_id():
+    from flask import g, request
+
+    auth = g.get("auth")
+    if auth and auth.get("user_id"):
+        return int(auth["user_id"])
+    body = request.get_json(silent=True) or {}
+    user_id = body.get("logged_in_user_id") or request.form.get("logged_in_user_id")
+    try:
+        return int(user_id) if user_id else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _track_commits(conn):
+    """
+    Flags the request as a write (g.db_wrote) when it commits on this connection.
+    The ETag write counters of the request's data sets are bumped in the same
+    transaction, right before the commit (utils/http_cache.py).
+    """
+    from flask import g
+    from utils.http_cache import bump_request_data_versions
+
+    commit = conn.commit
+
+    def tracked_commit(*args, **kwargs):
+        bump_request_data_versions(conn)
+        commit(*args, **kwargs)
+        g.db_wrote = True
+
+    conn.commit = tracked_commit
+    return conn
+
+
+def note_request_write(response):
+    """
+    after_request hook: after a committed write the user's reads stay on the primary
+    for DB_READ_YOUR_WRITES_SECONDS, so they see their own change.
+    """
+    from flask import g
+
+    if g.get("db_wrote") and response.status_code < 400:
+        user_id = _request_user_id()
+        if user_id:
+            _recent_writers.set(user_id, True)
+    return response
+
+
+def _note_source(conn, source: str, in_request: bool):
+    """conn.db_source + g.db_sources: which servers the request read from (ETag checks)"""
+    conn.db_source = source
+    if in_request:
+        from flask import g
+
+        g.setdefault("db_sources", set()).add(source)
+    return conn
+
+
+def get_connection(read_only=None):
+    """
+    read_only=None -> decided by the current route (@read_only_route); outside a
+    request (background jobs) the primary is used.
+    """
+    from flask import g, has_request_context
+
+    in_request = has_request_context()
+    if read_only is None:
+        read_only = bool(in_request and g.get("db_read_only"))
+
+    if read_only and replica_configured():
+        user_id = _request_user_id() if in_request else None
+        if not (user_id and _recent_writers.get(user_id)) and not replica_backing_off():
+            conn = None
+            try:
+                conn = replica_connection()
+                if replica_usable(conn):
+                    return _note_source(conn, "replica", in_request)
+            except Exception as e:
+                print("DB REPLICA UNAVAILABLE, using primary:", str(e))
+                _mark_replica_down()
+            if conn is not None:
+                conn.close()
+
+    conn = primary_connection()
+    if in_request:
+        _track_commits(conn)
+    return _note_source(conn, "primary", in_request)
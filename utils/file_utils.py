@@ -1,7 +1,10 @@
 import base64
+import hashlib
 import os
+import threading
 import uuid
 import mimetypes
+from concurrent.futures import ThreadPoolExecutor
 from config import UPLOAD_FOLDER, UPLOAD_SUBDIRS
 import re
 from werkzeug.utils import secure_filename
@@ -137,3 +140,103 @@ def save_uploaded_file(file_storage, upload_subdir: str, custom_filename: str) -
     file_storage.save(full_path)
 
     return filename
+
+
+# ---------- parallel multi-file uploads
+
+FILE_IO_MAX_WORKERS = int(os.getenv("FILE_IO_MAX_WORKERS", "8"))
+_file_executor = None
+_file_executor_lock = threading.Lock()
+
+
+def get_file_executor() -> ThreadPoolExecutor:
+    global _file_executor
+    if _file_executor is None:
+        with _file_executor_lock:
+            if _file_executor is None:
+                _file_executor = ThreadPoolExecutor(max_workers=FILE_IO_MAX_WORKERS, thread_name_prefix="file-io")
+    return _file_executor
+
+
+def save_uploaded_file_with_meta(file_storage, upload_subdir: str, custom_filename: str, chunk_size: int = 1024 * 1024) -> dict:
+    """
+    Like save_uploaded_file, but streams to disk while hashing.
+    Returns {"file_name", "original_name", "file_size", "sha256", "mime_type"}.
+    """
+    if not file_storage or file_storage.filename == "":
+        return None
+
+    filename = secure_filename(custom_filename)
+
+    if not is_allowed_file(filename):
+        raise ValueError("Unsupported file type")
+
+    target_dir = os.path.join(UPLOAD_FOLDER, upload_subdir)
+    os.makedirs(target_dir, exist_ok=True)
+    full_path = os.path.join(target_dir, filename)
+
+    digest = hashlib.sha256()
+    size = 0
+    stream = file_storage.stream
+    try:
+        stream.seek(0)
+    except Exception:
+        pass
+
+    try:
+        with open(full_path, "wb") as out:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+    except Exception:
+        if os.path.exists(full_path):
+            os.remove(full_path)
+        raise
+
+    return {
+        "file_name": filename,
+        "original_name": file_storage.filename,
+        "file_size": size,
+        "sha256": digest.hexdigest(),
+        "mime_type": file_storage.mimetype or mimetypes.guess_type(filename)[0] or "application/octet-stream",
+    }
+
+
+def save_uploaded_files_parallel(items, upload_subdir: str) -> list[dict]:
+    """
+    items: [(file_storage, custom_filename), ...]
+    Saves all files on the file I/O pool; result order matches items.
+    All-or-nothing: if any file fails, the ones already written are removed and the error is raised.
+    """
+    items = list(items or [])
+    if not items:
+        return []
+    if len(items) == 1:
+        fs, name = items[0]
+        return [save_uploaded_file_with_meta(fs, upload_subdir, name)]
+
+    futures = [get_file_executor().submit(save_uploaded_file_with_meta, fs, upload_subdir, name) for fs, name in items]
+
+    results, first_error = [], None
+    for fut in futures:
+        try:
+            results.append(fut.result())
+        except Exception as e:
+            results.append(None)
+            first_error = first_error or e
+
+    if first_error:
+        target_dir = os.path.join(UPLOAD_FOLDER, upload_subdir)
+        for meta in results:
+            if meta:
+                try:
+                    os.remove(os.path.join(target_dir, meta["file_name"]))
+                except OSError:
+                    pass
+        raise first_error
+
+    return results
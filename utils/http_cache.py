@@ -0,0 +1,184 @@
+import hashlib
+from datetime import date, datetime
+from functools import wraps
+
+from flask import current_app, g, make_response, request
+
+from utils.response import maybe_compress
+
+# Conditional GET for list endpoints + response compression middleware.
+#
+# @conditional_get("tfs_user", ...) computes a weak ETag *before* the view runs from the
+# write counters of the data sets the response depends on (table data_version,
+# migrations/012_data_version.sql), mixed with the request itself (path, body, token),
+# today's date (views default to the current month / count days from today) and
+# anything else the view resolves on its own (vary=).
+# A matching If-None-Match gets a 304 without running the list query.
+#
+# Counters are bumped in the writer's own transaction, right before its commit:
+#   - request commits on a primary connection (utils.db_router._track_commits), for the
+#     data sets of the request's blueprint, and
+#   - background writers (bump_data_versions before their commit).
+# Reading them is one primary-key lookup per data set, no table scans.
+# api_call_logs has no counter: every request appends to it, so its list is not cached.
+#
+# Replica reads: the counters are read on the connection the view's reads would use
+# (get_db_connection() routing). The replica applies a write before its counter bump,
+# so a counter read there never runs ahead of the data it describes. If the counters
+# came from the primary but the body was read from the replica, no ETag is sent.
+#
+# The list endpoints are POST (filters in the body). Browsers never revalidate POST
+# responses on their own: the frontend keeps the last ETag per request body and sends it
+# as If-None-Match explicitly. Answering 304 there (RFC 9110 would give 412 for a failed
+# precondition on POST) is deliberate, since these POSTs are safe reads.
+
+# data sets with a counter row; must match the seed rows of migrations/012_data_version.sql
+VERSIONED_DATA = (
+    "tfs_user",
+    "project",
+    "task",
+    "task_work_tracker",
+    "tracker_file_meta",
+    "user_monthly_tracker",
+    "project_monthly_tracker",
+    "work_calendar",
+)
+
+# blueprint -> data sets its committed writes can change (blueprints not listed bump all)
+BLUEPRINT_DATA = {
+    "auth": ("tfs_user",),
+    "user": ("tfs_user",),
+    "password_reset": ("tfs_user",),
+    "project": ("project",),
+    "task": ("task",),
+    "tracker": ("task_work_tracker",),
+    "user_monthly_tracker": ("user_monthly_tracker",),
+    "project_monthly_tracker": ("project_monthly_tracker",),
+    "work_calendar": ("work_calendar",),
+}
+
+BUMP_SQL = """
+    INSERT INTO data_version (name, version, updated_date)
+    VALUES {values}
+    ON DUPLICATE KEY UPDATE version = data_version.version + 1, updated_date = VALUES(updated_date)
+"""
+
+
+def bump_data_versions(cursor, *names):
+    """
+    Bumps counters in the caller's transaction, one statement for all names.
+    Call it right before the commit: the counter rows stay locked until then.
+    """
+    names = sorted(set(names))
+    if not names:
+        return
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    params = []
+    for name in names:
+        params.extend((name, now))
+    cursor.execute(BUMP_SQL.format(values=",".join(["(%s, 1, %s)"] * len(names))), tuple(params))
+
+
+def bump_request_data_versions(conn):
+    """Counters of the current request's blueprint, in the transaction conn is about to commit"""
+    names = BLUEPRINT_DATA.get(request.blueprint, VERSIONED_DATA)
+    cursor = conn.cursor()
+    try:
+        bump_data_versions(cursor, *names)
+    except Exception as e:
+        # the write itself still commits; lists may serve a stale 304 until the next bump
+        print("DATA VERSION BUMP FAILED:", str(e), " names=", names)
+    finally:
+        cursor.close()
+
+
+def data_versions_of(names) -> tuple[str, str]:
+    """(version string, 'primary' | 'replica') read on the view's read connection"""
+    from utils.db_router import get_connection
+
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        in_ph = ",".join(["%s"] * len(names))
+        cursor.execute(f"SELECT name, version FROM data_version WHERE name IN ({in_ph})", tuple(names))
+        found = {r["name"]: r["version"] for r in cursor.fetchall()}
+    finally:
+        cursor.close()
+        conn.close()
+    version = "|".join(f"{n}={found.get(n, 0)}" for n in names)
+    return version, getattr(conn, "db_source", "primary")
+
+
+def request_fingerprint() -> str:
+    return "|".join((
+        request.path,
+        request.query_string.decode("latin-1"),
+        request.headers.get("Authorization") or request.headers.get("X-Auth-Token") or "",
+        request.get_data(cache=True, as_text=True),
+    ))
+
+
+def version_tag(*names, vary=None) -> tuple[str, str]:
+    """(opaque tag for W/"..." ETags, source of the counters)"""
+    version, source = data_versions_of(names)
+    extra = vary() if vary else ""
+    tag = hashlib.sha1(
+        f"{version}|{date.today().isoformat()}|{extra}|{request_fingerprint()}".encode()
+    ).hexdigest()[:32]
+    return tag, source
+
+
+def _cache_headers(response, tag: str):
+    response.set_etag(tag, weak=True)
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.vary.add("Authorization")
+    return response
+
+
+def conditional_get(*names, vary=None):
+    """
+    View decorator: weak ETag on 200 responses, 304 when If-None-Match matches.
+    names: VERSIONED_DATA entries whose changes alter the response.
+    vary:  optional () -> str for inputs the view resolves itself (e.g. a default month).
+    POST views: the client must send If-None-Match itself (see module comment).
+    Put it below @read_only_route (counters follow the view's routing) and below
+    @auth_context (an invalid or expired token gets its 401, never a 304).
+    """
+    for n in names:
+        if n not in VERSIONED_DATA:
+            raise ValueError(f"No version counter for {n}")
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                tag, source = version_tag(*names, vary=vary)
+            except Exception as e:
+                # no version -> serve normally, never a wrong 304
+                print("ETAG VERSION FAILED:", str(e))
+                return fn(*args, **kwargs)
+
+            if request.if_none_match.contains_weak(tag):
+                return _cache_headers(current_app.response_class(status=304), tag)
+
+            response = make_response(fn(*args, **kwargs))
+            # body from a replica that may lag the primary's counters -> no ETag
+            stale_risk = source == "primary" and "replica" in g.get("db_sources", ())
+            if response.status_code == 200 and not stale_risk:
+                _cache_headers(response, tag)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+# ---------- app-wide after_request hook
+
+def compress_response(response):
+    """Compression for responses not built by api_response (which compresses itself)"""
+    if response.status_code in (204, 304) or not response.mimetype:
+        return response
+    if response.mimetype == "application/json" or response.mimetype.startswith("text/"):
+        return maybe_compress(response)
+    return response
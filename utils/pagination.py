@@ -0,0 +1,100 @@
+import base64
+import json
+
+from utils.cache import TTLCache
+
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+
+
+def encode_cursor(value) -> str | None:
+    if value is None:
+        return None
+    raw = json.dumps(value, default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Opaque cursor -> key value; also accepts a plain id for convenience"""
+    if token in (None, ""):
+        return None
+    if isinstance(token, int) or (isinstance(token, str) and token.isdigit()):
+        return int(token)
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def is_paginated(data: dict) -> bool:
+    """Pagination is opt-in so existing clients keep getting full lists"""
+    return any(data.get(k) not in (None, "") for k in ("limit", "cursor"))
+
+
+def get_page_params(data: dict, default_limit: int = DEFAULT_PAGE_LIMIT) -> tuple[int, object]:
+    """
+    Returns (limit, after) from request body:
+      limit  -> 1..MAX_PAGE_LIMIT (ValueError outside, never silently clamped)
+      cursor -> next_cursor from the previous page (or a raw id)
+    """
+    try:
+        limit = int(data.get("limit") or default_limit)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be a number")
+    if not 1 <= limit <= MAX_PAGE_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_LIMIT}")
+    return limit, decode_cursor(data.get("cursor"))
+
+
+def keyset_clause(column: str, after, params: list, descending: bool = True) -> str:
+    """
+    ' AND <column> < %s' (or '>') for the next page, '' for the first page.
+    column must be a unique, indexed key (usually the primary key).
+    """
+    if after is None:
+        return ""
+    params.append(after)
+    return f" AND {column} {'<' if descending else '>'} %s"
+
+
+def page_result(rows: list, limit: int, key: str) -> dict:
+    """
+    rows must be fetched with LIMIT limit + 1.
+    Returns {"rows", "limit", "has_more", "next_cursor"}.
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1][key]) if has_more and rows else None
+    return {
+        "rows": rows,
+        "limit": limit,
+        "has_more": has_more,
+        "next_cursor": next_cursor,
+    }
+
+
+# ---------- totals for paginated lists
+# Exact COUNT(*) on every page is the expensive part of most list calls.
+# Totals are cached per (count query, params, data version) for a short TTL;
+# clients that really need an exact number send exact_count=true.
+
+COUNT_CACHE_TTL = 60
+_count_cache = TTLCache(ttl_seconds=COUNT_CACHE_TTL, max_entries=2000)
+
+
+def cached_total(cursor, count_sql: str, params, version: str = "", exact: bool = False) -> tuple[int, bool]:
+    """
+    count_sql must select a single column aliased "total".
+    Returns (total, is_exact). A cached value is reported as not exact.
+    """
+    key = (count_sql, tuple(params), version)
+    if not exact:
+        cached = _count_cache.get(key)
+        if cached is not None:
+            return cached, False
+
+    cursor.execute(count_sql, tuple(params))
+    total = int((cursor.fetchone() or {}).get("total") or 0)
+    _count_cache.set(key, total)
+    return total, True
@@ -1,4 +1,107 @@
-from flask import jsonify
+import dataclasses
+import decimal
+import gzip
+import os
+import uuid
+from datetime import date
+
+from flask import current_app, jsonify, request
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to flask.jsonify
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# api_response() serializer:
+#   RESPONSE_JSON_ENGINE=auto   -> orjson when installed, else flask.jsonify
+#   RESPONSE_JSON_ENGINE=flask  -> always flask.jsonify
+# The orjson path keeps the wire format of Flask's default provider (sorted keys,
+# Decimal/UUID as strings, dates as HTTP dates), so clients see the same JSON.
+#
+# Bodies of RESPONSE_COMPRESS_MIN_BYTES or more are sent br / gzip encoded when the
+# client accepts it. bench_response.py compares both engines on tracker/user list shapes.
+
+RESPONSE_JSON_ENGINE = os.getenv("RESPONSE_JSON_ENGINE", "auto").strip().lower()
+RESPONSE_COMPRESS_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "2048"))
+RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "5"))
+RESPONSE_BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "4"))
+
+
+def _json_default(o):
+    # same conversions as flask.json.provider.DefaultJSONProvider
+    if isinstance(o, date):
+        return http_date(o)
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def use_fast_json() -> bool:
+    return orjson is not None and RESPONSE_JSON_ENGINE != "flask"
+
+
+def dumps_fast(obj) -> bytes:
+    return orjson.dumps(
+        obj,
+        default=_json_default,
+        option=(
+            orjson.OPT_SORT_KEYS
+            | orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_SERIALIZE_NUMPY
+        ),
+    )
+
+
+def accepted_encoding() -> str | None:
+    """'br' / 'gzip' from Accept-Encoding (br preferred when brotli is installed)"""
+    accept = request.headers.get("Accept-Encoding", "").lower()
+    if brotli is not None and "br" in accept:
+        return "br"
+    if "gzip" in accept:
+        return "gzip"
+    return None
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=RESPONSE_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=RESPONSE_GZIP_LEVEL)
+
+
+def maybe_compress(response):
+    """Encodes a buffered response in place when it is big enough and the client accepts it"""
+    if response.direct_passthrough or response.is_streamed or "Content-Encoding" in response.headers:
+        return response
+    body = response.get_data()
+    response.vary.add("Accept-Encoding")
+    if len(body) < RESPONSE_COMPRESS_MIN_BYTES:
+        return response
+    encoding = accepted_encoding()
+    if not encoding:
+        return response
+    response.set_data(compress_body(body, encoding))
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def json_response(payload: dict, status: int):
+    if use_fast_json():
+        response = current_app.response_class(dumps_fast(payload), status=status, mimetype="application/json")
+    else:
+        response = jsonify(payload)
+    return maybe_compress(response)
+
 
 def api_response(status, message, data=None):
     response = {
@@ -8,4 +111,4 @@ def api_response(status, message, data=None):
     if data is not None:
         response["data"] = data
 
-    return jsonify(response), status
+    return json_response(response, status), status
@@ -2,6 +2,8 @@ import bcrypt
 
 import hashlib
 
+import hmac
+
 import base64
 
 from cryptography.fernet import Fernet
@@ -12,6 +14,14 @@ from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
 import os
 
+import threading
+
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.cache import TTLCache
+
 
 
 # Use a hardcoded key for now (in production, this should be from environment)
@@ -22,6 +32,72 @@ cipher_suite = Fernet(ENCRYPTION_KEY)
 
 
 
+# Shared worker pool for CPU-heavy crypto (bulk decrypt, bcrypt)
+
+CRYPTO_MAX_WORKERS = int(os.getenv("CRYPTO_MAX_WORKERS", "4"))
+
+_crypto_executor = None
+
+_crypto_executor_lock = threading.Lock()
+
+
+
+def get_crypto_executor() -> ThreadPoolExecutor:
+
+    """Lazily create the bounded thread pool used for crypto work"""
+
+    global _crypto_executor
+
+    if _crypto_executor is None:
+
+        with _crypto_executor_lock:
+
+            if _crypto_executor is None:
+
+                _crypto_executor = ThreadPoolExecutor(
+
+                    max_workers=CRYPTO_MAX_WORKERS,
+
+                    thread_name_prefix="crypto"
+
+                )
+
+    return _crypto_executor
+
+
+
+# Separate pool for bulk hashing (user import) so it never queues ahead of logins
+
+BULK_CRYPTO_MAX_WORKERS = int(os.getenv("BULK_CRYPTO_MAX_WORKERS", "2"))
+
+_bulk_crypto_executor = None
+
+
+
+def get_bulk_crypto_executor() -> ThreadPoolExecutor:
+
+    """Lazily create the bounded thread pool used for bulk bcrypt work"""
+
+    global _bulk_crypto_executor
+
+    if _bulk_crypto_executor is None:
+
+        with _crypto_executor_lock:
+
+            if _bulk_crypto_executor is None:
+
+                _bulk_crypto_executor = ThreadPoolExecutor(
+
+                    max_workers=BULK_CRYPTO_MAX_WORKERS,
+
+                    thread_name_prefix="crypto-bulk"
+
+                )
+
+    return _bulk_crypto_executor
+
+
+
 def get_encryption_key():
 
     """Get encryption key (for future use with environment variables)"""
@@ -30,11 +106,109 @@ def get_encryption_key():
 
 
 
+# bcrypt cost: fixed via BCRYPT_ROUNDS, otherwise tuned to BCRYPT_TARGET_MS per hash
+
+BCRYPT_ROUNDS = os.getenv("BCRYPT_ROUNDS")
+
+BCRYPT_TARGET_MS = int(os.getenv("BCRYPT_TARGET_MS", "250"))
+
+BCRYPT_MIN_ROUNDS = 10
+
+BCRYPT_MAX_ROUNDS = 14
+
+BCRYPT_TIMEOUT_SECONDS = 10
+
+_bcrypt_rounds = None
+
+
+
+# successful logins only, keyed on HMAC(process secret, hash + password) so a password
+
+# change invalidates and a leaked key is useless outside this process
+
+LOGIN_CACHE_TTL_SECONDS = int(os.getenv("LOGIN_CACHE_TTL_SECONDS", "60"))
+
+_login_cache = TTLCache(ttl_seconds=LOGIN_CACHE_TTL_SECONDS)
+
+_login_cache_secret = os.urandom(32)
+
+
+
+def get_bcrypt_rounds() -> int:
+
+    """
+
+    Cost factor for new hashes.
+
+    Measured once per process: highest rounds that stays under BCRYPT_TARGET_MS.
+
+    """
+
+    global _bcrypt_rounds
+
+    if _bcrypt_rounds is not None:
+
+        return _bcrypt_rounds
+
+
+
+    if BCRYPT_ROUNDS:
+
+        _bcrypt_rounds = max(4, min(31, int(BCRYPT_ROUNDS)))
+
+        return _bcrypt_rounds
+
+
+
+    rounds = BCRYPT_MIN_ROUNDS
+
+    start = time.perf_counter()
+
+    bcrypt.hashpw(b"calibration", bcrypt.gensalt(rounds))
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+
+
+    # each extra round doubles the cost
+
+    while rounds < BCRYPT_MAX_ROUNDS and elapsed_ms * 2 <= BCRYPT_TARGET_MS:
+
+        rounds += 1
+
+        elapsed_ms *= 2
+
+
+
+    _bcrypt_rounds = rounds
+
+    return _bcrypt_rounds
+
+
+
+def bcrypt_needs_rehash(hashed) -> bool:
+
+    """True when the stored hash uses a lower cost than the current tuned cost"""
+
+    if isinstance(hashed, bytes):
+
+        hashed = hashed.decode()
+
+    try:
+
+        return int(hashed.split("$")[2]) < get_bcrypt_rounds()
+
+    except (IndexError, ValueError):
+
+        return True
+
+
+
 def hash_password(password: str) -> bytes:
 
     """Hash password using bcrypt (for authentication)"""
 
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt())
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(get_bcrypt_rounds()))
 
 
 
@@ -42,10 +216,52 @@ def verify_password(password: str, hashed: bytes) -> bool:
 
     """Verify password against bcrypt hash"""
 
+    if isinstance(hashed, str):
+
+        hashed = hashed.encode()
+
     return bcrypt.checkpw(password.encode(), hashed)
 
 
 
+def verify_password_pooled(password: str, hashed) -> bool:
+
+    """
+
+    verify_password on the bounded crypto pool (bcrypt releases the GIL).
+
+    Recent successful checks are answered from the login cache.
+
+    Raises concurrent.futures.TimeoutError when no worker frees up within BCRYPT_TIMEOUT_SECONDS.
+
+    """
+
+    if isinstance(hashed, bytes):
+
+        hashed = hashed.decode()
+
+
+
+    cache_key = hmac.new(_login_cache_secret, f"{hashed}\0{password}".encode(), hashlib.sha256).hexdigest()
+
+    if _login_cache.get(cache_key):
+
+        return True
+
+
+
+    future = get_crypto_executor().submit(verify_password, password, hashed)
+
+    ok = future.result(timeout=BCRYPT_TIMEOUT_SECONDS)
+
+    if ok:
+
+        _login_cache.set(cache_key, True)
+
+    return ok
+
+
+
 def encrypt_password(password: str) -> str:
 
     """
@@ -152,6 +368,30 @@ def safe_decrypt_password(encrypted_password: str) -> str:
 
 
 
+def safe_decrypt_passwords(encrypted_passwords, min_batch: int = 32) -> list:
+
+    """
+
+    Batch version of safe_decrypt_password (explicit bulk reveal only)
+
+    Small batches run inline, larger ones are spread over the crypto pool.
+
+    Result order matches input order.
+
+    """
+
+    values = list(encrypted_passwords or [])
+
+    if len(values) < min_batch:
+
+        return [safe_decrypt_password(v) for v in values]
+
+
+
+    return list(get_crypto_executor().map(safe_decrypt_password, values))
+
+
+
 def sha256_hash(text: str) -> str:
 
     """
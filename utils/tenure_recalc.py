@@ -0,0 +1,214 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from utils import billable_metrics, data_versions
+from utils.http_cache import bump_data_versions
+
+# Recalculates tenure_target / billable_hours of a user's tracker rows after their
+# user_tenure changed (same math as tracker.calculate_targets + utils.billable_metrics).
+# Rows go in tracker_id order, TENURE_RECALC_CHUNK_SIZE per committed UPDATE, and the
+# job row (tenure_recalc_job) keeps the resume point and progress.
+#
+# A newer tenure change for the same user supersedes the running job; a job whose
+# worker died (no progress for TENURE_RECALC_STALE_MINUTES) can be resumed.
+
+TENURE_RECALC_CHUNK_SIZE = int(os.getenv("TENURE_RECALC_CHUNK_SIZE", "500"))
+TENURE_RECALC_STALE_MINUTES = int(os.getenv("TENURE_RECALC_STALE_MINUTES", "10"))
+
+_recalc_executor = None
+_recalc_executor_lock = threading.Lock()
+
+
+def get_recalc_executor():
+    # one worker: jobs run one after another, never competing with each other for row locks
+    global _recalc_executor
+    if _recalc_executor is None:
+        with _recalc_executor_lock:
+            if _recalc_executor is None:
+                _recalc_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tenure-recalc")
+    return _recalc_executor
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def tenure_changed(old_tenure, new_tenure) -> bool:
+    try:
+        return round(float(old_tenure or 0), 4) != round(float(new_tenure or 0), 4)
+    except (TypeError, ValueError):
+        return False
+
+
+def create_job(cursor, user_id: int, user_tenure) -> int:
+    """
+    Supersedes open jobs of the user and inserts a pending one.
+    Runs in the caller's transaction (commit together with the tenure change),
+    then schedule_job() after the commit.
+    """
+    now = _now()
+    cursor.execute(
+        """
+        UPDATE tenure_recalc_job
+        SET status='superseded', updated_date=%s
+        WHERE user_id=%s AND status IN ('pending', 'running')
+        """,
+        (now, int(user_id)),
+    )
+    cursor.execute(
+        "SELECT COUNT(*) AS total FROM task_work_tracker WHERE user_id=%s",
+        (int(user_id),),
+    )
+    total = int((cursor.fetchone() or {}).get("total") or 0)
+    cursor.execute(
+        """
+        INSERT INTO tenure_recalc_job
+            (user_id, user_tenure, status, total_rows, processed_rows, last_tracker_id, created_date, updated_date)
+        VALUES (%s, %s, 'pending', %s, 0, 0, %s, %s)
+        """,
+        (int(user_id), float(user_tenure), total, now, now),
+    )
+    return cursor.lastrowid
+
+
+def _claim_job(conn, cursor, job_id: int) -> dict | None:
+    """pending (or stale running) -> running; None when another worker owns it or it is finished"""
+    stale_before = (datetime.now() - timedelta(minutes=TENURE_RECALC_STALE_MINUTES)).strftime("%Y-%m-%d %H:%M:%S")
+    cursor.execute(
+        """
+        UPDATE tenure_recalc_job
+        SET status='running', updated_date=%s
+        WHERE job_id=%s
+          AND (status='pending' OR (status='running' AND updated_date < %s))
+        """,
+        (_now(), int(job_id), stale_before),
+    )
+    if cursor.rowcount != 1:
+        conn.commit()
+        return None
+    cursor.execute("SELECT * FROM tenure_recalc_job WHERE job_id=%s", (int(job_id),))
+    job = cursor.fetchone()
+    conn.commit()
+    return job
+
+
+def run_job(job_id: int):
+    """Worker body; safe to call again for the same job (continues after last_tracker_id)"""
+    from config import get_db_connection
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        job = _claim_job(conn, cursor, job_id)
+        if not job:
+            return
+
+        user_id = int(job["user_id"])
+        tenure = float(job["user_tenure"])
+        last_id = int(job["last_tracker_id"] or 0)
+        processed = int(job["processed_rows"] or 0)
+
+        while True:
+            # the chunk bounds are read in the same transaction as its UPDATE
+            conn.start_transaction()
+            cursor.execute(
+                """
+                SELECT MAX(tracker_id) AS upto, COUNT(*) AS n
+                FROM (
+                    SELECT tracker_id
+                    FROM task_work_tracker
+                    WHERE user_id=%s AND tracker_id > %s
+                    ORDER BY tracker_id
+                    LIMIT %s
+                ) chunk
+                """,
+                (user_id, last_id, TENURE_RECALC_CHUNK_SIZE),
+            )
+            chunk = cursor.fetchone() or {}
+            if not chunk.get("n"):
+                break
+            upto = int(chunk["upto"])
+
+            cursor.execute(
+                f"""
+                UPDATE task_work_tracker
+                SET tenure_target = ROUND(COALESCE(actual_target, 0) * %s, 2),
+                    billable_hours = {billable_metrics.billable_sql("production", "ROUND(COALESCE(actual_target, 0) * %s, 2)")},
+                    updated_date = %s
+                WHERE user_id=%s AND tracker_id > %s AND tracker_id <= %s
+                """,
+                (tenure, tenure, _now(), user_id, last_id, upto),
+            )
+            processed += int(chunk["n"])
+            last_id = upto
+            # progress + resume point in the same transaction as the rows;
+            # a superseded job stops here without applying its chunk
+            cursor.execute(
+                """
+                UPDATE tenure_recalc_job
+                SET processed_rows=%s, last_tracker_id=%s, updated_date=%s
+                WHERE job_id=%s AND status='running'
+                """,
+                (processed, last_id, _now(), int(job_id)),
+            )
+            if cursor.rowcount != 1:
+                conn.rollback()
+                return
+            bump_data_versions(cursor, "task_work_tracker")
+            conn.commit()
+            data_versions.bump("tracker", user_id)
+
+        cursor.execute(
+            "UPDATE tenure_recalc_job SET status='done', updated_date=%s WHERE job_id=%s AND status='running'",
+            (_now(), int(job_id)),
+        )
+        conn.commit()
+
+    except Exception as e:
+        try:
+            conn.rollback()
+            cursor.execute(
+                "UPDATE tenure_recalc_job SET status='failed', error=%s, updated_date=%s WHERE job_id=%s",
+                (str(e)[:255], _now(), int(job_id)),
+            )
+            conn.commit()
+        except Exception:
+            pass
+        print("TENURE RECALC FAILED:", str(e), " job_id=", job_id)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def schedule_job(job_id: int):
+    """Never raises; an unscheduled job stays pending and can be resumed"""
+    try:
+        get_recalc_executor().submit(run_job, int(job_id))
+    except Exception as e:
+        print("TENURE RECALC NOT SCHEDULED:", str(e), " job_id=", job_id)
+
+
+def resumable_job_ids(cursor) -> list[int]:
+    """Pending jobs + running jobs without progress for TENURE_RECALC_STALE_MINUTES"""
+    stale_before = (datetime.now() - timedelta(minutes=TENURE_RECALC_STALE_MINUTES)).strftime("%Y-%m-%d %H:%M:%S")
+    cursor.execute(
+        """
+        SELECT job_id
+        FROM tenure_recalc_job
+        WHERE status='pending' OR (status='running' AND updated_date < %s)
+        ORDER BY job_id
+        """,
+        (stale_before,),
+    )
+    return [int(r["job_id"]) for r in cursor.fetchall()]
+
+
+def job_progress(row: dict) -> dict:
+    total = int(row.get("total_rows") or 0)
+    processed = int(row.get("processed_rows") or 0)
+    row["progress_pct"] = 100.0 if row.get("status") == "done" else (
+        round(min(processed, total) * 100.0 / total, 1) if total else 0.0
+    )
+    return row
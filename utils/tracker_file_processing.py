@@ -0,0 +1,172 @@
+import csv
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
+# Background inspection of uploaded tracker files (csv / xlsx):
+# row counts + sha256 go to tracker_file_meta, read back by /tracker/view.
+# Parsing runs in a process pool so big sheets don't hold the GIL of the web worker;
+# the request only schedules the job and returns.
+
+TRACKER_PARSE_WORKERS = int(os.getenv("TRACKER_PARSE_WORKERS", "2"))
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_parse_executor = None
+_parse_executor_lock = threading.Lock()
+
+
+def get_parse_executor():
+    global _parse_executor
+    if _parse_executor is None:
+        with _parse_executor_lock:
+            if _parse_executor is None:
+                try:
+                    # spawn: never fork a threaded web worker
+                    _parse_executor = ProcessPoolExecutor(
+                        max_workers=TRACKER_PARSE_WORKERS,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                except Exception as e:
+                    print("TRACKER PARSE: process pool unavailable, using threads:", str(e))
+                    _parse_executor = ThreadPoolExecutor(
+                        max_workers=TRACKER_PARSE_WORKERS, thread_name_prefix="tracker-parse"
+                    )
+    return _parse_executor
+
+
+# ---------- parsing (runs in the worker process; no DB / Flask here)
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _count_csv_rows(path: str) -> int:
+    """Non-empty data rows (first non-empty row is the header)"""
+    rows = 0
+    with open(path, newline="", encoding="utf-8-sig", errors="replace") as f:
+        for row in csv.reader(f):
+            if any(cell.strip() for cell in row):
+                rows += 1
+    return max(rows - 1, 0)
+
+
+def _count_xlsx_rows(path: str) -> tuple[int, int]:
+    """(data rows over all sheets, sheet count); read-only mode streams rows"""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        total = 0
+        for ws in wb.worksheets:
+            rows = 0
+            for values in ws.iter_rows(values_only=True):
+                if any(v is not None and str(v).strip() != "" for v in values):
+                    rows += 1
+            total += max(rows - 1, 0)
+        return total, len(wb.worksheets)
+    finally:
+        wb.close()
+
+
+def inspect_tracker_file(path: str) -> dict:
+    file_type = path.rsplit(".", 1)[-1].lower() if "." in path else ""
+    meta = {
+        "file_type": file_type,
+        "file_size": os.path.getsize(path),
+        "sha256": _sha256_file(path),
+        "row_count": None,
+        "sheet_count": None,
+        "status": "skipped",
+        "error": None,
+    }
+
+    if file_type == "csv":
+        meta["row_count"] = _count_csv_rows(path)
+        meta["status"] = "done"
+    elif file_type == "xlsx":
+        try:
+            meta["row_count"], meta["sheet_count"] = _count_xlsx_rows(path)
+            meta["status"] = "done"
+        except ImportError:
+            meta["error"] = "openpyxl not installed"
+    return meta
+
+
+# ---------- scheduling + result storage (web process)
+
+def _store_result(tracker_id: int, tracker_file: str, future):
+    from config import get_db_connection
+    from utils.http_cache import bump_data_versions
+
+    try:
+        meta = future.result()
+    except Exception as e:
+        meta = {"status": "failed", "error": str(e)[:255]}
+
+    conn = None
+    cursor = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            INSERT INTO tracker_file_meta
+                (tracker_id, tracker_file, file_type, file_size, sha256, row_count, sheet_count,
+                 status, error, processed_date)
+            VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+            ON DUPLICATE KEY UPDATE
+                file_type=VALUES(file_type), file_size=VALUES(file_size), sha256=VALUES(sha256),
+                row_count=VALUES(row_count), sheet_count=VALUES(sheet_count),
+                status=VALUES(status), error=VALUES(error), processed_date=VALUES(processed_date)
+            """,
+            (
+                tracker_id,
+                tracker_file,
+                meta.get("file_type"),
+                meta.get("file_size"),
+                meta.get("sha256"),
+                meta.get("row_count"),
+                meta.get("sheet_count"),
+                meta["status"],
+                meta.get("error"),
+                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            ),
+        )
+        bump_data_versions(cursor, "tracker_file_meta")
+        conn.commit()
+    except Exception as e:
+        print("TRACKER FILE META SAVE FAILED:", str(e), " tracker_id=", tracker_id)
+    finally:
+        if cursor is not None:
+            cursor.close()
+        if conn is not None:
+            conn.close()
+
+
+def schedule_tracker_file_inspection(tracker_id: int, tracker_file: str):
+    """Call after commit. Never raises; the upload is already stored."""
+    if not tracker_file:
+        return
+    from config import UPLOAD_FOLDER, UPLOAD_SUBDIRS
+    from utils.file_utils import get_file_executor
+
+    tracker_file = os.path.basename(str(tracker_file))
+    path = os.path.join(UPLOAD_FOLDER, UPLOAD_SUBDIRS["TRACKER_FILES"], tracker_file)
+    try:
+        future = get_parse_executor().submit(inspect_tracker_file, path)
+        # DB write on the file-io threads, not the pool's management thread
+        future.add_done_callback(
+            lambda f: get_file_executor().submit(_store_result, int(tracker_id), tracker_file, f)
+        )
+    except Exception as e:
+        print("TRACKER FILE INSPECTION NOT SCHEDULED:", str(e), " tracker_id=", tracker_id)
@@ -0,0 +1,138 @@
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+
+from utils.cache import TTLCache
+from utils import data_versions
+
+# Working-day calendar: weekends (global or per team) minus holidays (global or per team),
+# per user leave on top. Month calendars are cached as sorted arrays of date ordinals,
+# so "working days left after X" is two bisects instead of SQL date math.
+#
+# Tables: work_holiday, team_work_week, user_leave (migrations/010_work_calendar.sql)
+
+# Monday=0 ... Sunday=6
+DEFAULT_WEEKEND_DAYS = tuple(
+    int(d) for d in os.getenv("WORK_WEEKEND_DAYS", "5,6").split(",") if d.strip().isdigit()
+)
+CALENDAR_CACHE_TTL = 3600
+_month_cache = TTLCache(ttl_seconds=CALENDAR_CACHE_TTL, max_entries=2000)
+
+
+def calendar_changed(user_id=None):
+    """Call after commit when holidays / weekends (user_id=None) or a user's leave changed"""
+    data_versions.bump("work_calendar", user_id)
+
+
+def parse_weekend_days(value) -> tuple:
+    """'5,6' -> (5, 6); invalid parts are ignored"""
+    days = {int(p) for p in str(value or "").split(",") if p.strip().isdigit() and 0 <= int(p) <= 6}
+    return tuple(sorted(days))
+
+
+def month_yyyymm(month_year) -> int | None:
+    """MONYYYY ('JAN2026' / 'Jan2026') -> 202601; None if not parseable"""
+    try:
+        dt = datetime.strptime(str(month_year or "").strip(), "%b%Y")
+    except ValueError:
+        return None
+    return dt.year * 100 + dt.month
+
+
+def month_range(yyyymm: int) -> tuple[date, date]:
+    """202601 -> (date(2026,1,1), date(2026,1,31))"""
+    year, month = divmod(int(yyyymm), 100)
+    first = date(year, month, 1)
+    last = (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return first, last
+
+
+def month_datetime_bounds(yyyymm: int) -> tuple[str, str]:
+    """
+    202601 -> ('2026-01-01 00:00:00', '2026-02-01 00:00:00')
+    task_work_tracker.date_time is TEXT, so a plain string range works (no CAST).
+    """
+    first, last = month_range(yyyymm)
+    return first.strftime("%Y-%m-%d 00:00:00"), (last + timedelta(days=1)).strftime("%Y-%m-%d 00:00:00")
+
+
+def _team_weekend(cursor, team_id) -> tuple:
+    if team_id:
+        cursor.execute("SELECT weekend_days FROM team_work_week WHERE team_id=%s", (int(team_id),))
+        row = cursor.fetchone()
+        if row and row.get("weekend_days") is not None:
+            return parse_weekend_days(row["weekend_days"])
+    return DEFAULT_WEEKEND_DAYS
+
+
+def get_working_days(cursor, yyyymm: int, team_id=None) -> array:
+    """Sorted ordinals of the working days of one month for a team (None = company-wide)"""
+    team_id = int(team_id) if team_id else None
+    key = (int(yyyymm), team_id, data_versions.get("work_calendar"))
+    cached = _month_cache.get(key)
+    if cached is not None:
+        return cached
+
+    first, last = month_range(yyyymm)
+    weekend = set(_team_weekend(cursor, team_id))
+
+    cursor.execute(
+        """
+        SELECT holiday_date
+        FROM work_holiday
+        WHERE is_active = 1
+          AND holiday_date BETWEEN %s AND %s
+          AND (team_id IS NULL OR team_id = %s)
+        """,
+        (first, last, team_id),
+    )
+    holidays = {r["holiday_date"].toordinal() for r in cursor.fetchall() if r.get("holiday_date")}
+
+    days = array("i", (
+        o for o in range(first.toordinal(), last.toordinal() + 1)
+        if date.fromordinal(o).weekday() not in weekend and o not in holidays
+    ))
+    _month_cache.set(key, days)
+    return days
+
+
+def get_user_leaves(cursor, user_ids, yyyymm: int) -> dict:
+    """user_id -> sorted array of leave-day ordinals in the month (one query for all users)"""
+    ids = sorted({int(u) for u in (user_ids or [])})
+    if not ids:
+        return {}
+    first, last = month_range(yyyymm)
+    in_ph = ",".join(["%s"] * len(ids))
+    cursor.execute(
+        f"""
+        SELECT user_id, leave_date
+        FROM user_leave
+        WHERE is_active = 1
+          AND leave_date BETWEEN %s AND %s
+          AND user_id IN ({in_ph})
+        ORDER BY user_id, leave_date
+        """,
+        tuple([first, last] + ids),
+    )
+    leaves = {}
+    for r in cursor.fetchall():
+        leaves.setdefault(int(r["user_id"]), array("i")).append(r["leave_date"].toordinal())
+    return leaves
+
+
+def count_working_days(days: array, start: date, end: date, leaves: array = None) -> int:
+    """Working days in [start, end], minus leave days that fall on working days"""
+    if start > end:
+        return 0
+    lo, hi = start.toordinal(), end.toordinal()
+    total = bisect_right(days, hi) - bisect_left(days, lo)
+    if leaves:
+        working = set(days[bisect_left(days, lo):bisect_right(days, hi)])
+        total -= sum(1 for o in leaves[bisect_left(leaves, lo):bisect_right(leaves, hi)] if o in working)
+    return total
+
+
+def working_days_after(days: array, after: date, month_end: date, leaves: array = None) -> int:
+    """Working days strictly after `after` until month end"""
+    return count_working_days(days, after + timedelta(days=1), month_end, leaves)